@@ -0,0 +1,41 @@
+"""
+Benchmark of pyaxie_fanout.fan_out against the serial loop used before for guild-wide reads.
+Every account read is simulated by a sleep of the usual game API latency, no request is sent.
+Usage : python bench/fan_out_bench.py [latency_in_sec]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import pyaxie_fanout
+
+LATENCY = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+SCHOLARS = [10, 50, 100, 200]
+PARALLELISM = [1, 8, 16, 32]
+
+
+def fake_read(address):
+	time.sleep(LATENCY)
+	if address == 'bad':
+		raise ValueError('bad address')
+	return address
+
+
+def timed(fn):
+	start = time.perf_counter()
+	res = fn()
+	return time.perf_counter() - start, res
+
+
+if __name__ == '__main__':
+	print('Simulated latency per account : {} sec'.format(LATENCY))
+	print('scholars | ' + ' | '.join('parallelism {:>2}'.format(p) for p in PARALLELISM))
+	for n in SCHOLARS:
+		addresses = ['0x{:040x}'.format(i) for i in range(n - 1)] + ['bad']
+		times = list()
+		for p in PARALLELISM:
+			t, res = timed(lambda: pyaxie_fanout.fan_out(fake_read, addresses, p))
+			assert res[:-1] == addresses[:-1] and isinstance(res[-1], ValueError)
+			times.append(t)
+		print('{:>8} | '.format(n) + ' | '.join('{:>12.2f}s'.format(t) for t in times))
@@ -0,0 +1,131 @@
+"""
+Benchmark of pyaxie_pipeline.MassPipeline against the sequential payout loop used before.
+Both run the real payout code of pyaxie, the game API and the chain are simulated by sleeps, nothing is signed or sent.
+Usage : python bench/pipeline_bench.py [scholars]
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import pyaxie_pipeline
+
+from pyaxie import pyaxie, ItemSnapshot
+from pyaxie_async import AsyncPyaxie
+
+SCHOLARS = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+SNAPSHOT_LATENCY = 0.05
+SIGNATURE_LATENCY = 0.1
+BROADCAST_LATENCY = 0.02
+CONFIRMATION_LATENCY = 1.0
+MANAGER = '0x' + 'f' * 40
+
+
+class FakeNonces(object):
+
+	def __init__(self):
+		self.next = dict()
+		self.lock = threading.Lock()
+
+	def prefetch(self, addresses):
+		with self.lock:
+			for address in addresses:
+				self.next.setdefault(address, 0)
+
+	def allocate(self, address, count=1):
+		with self.lock:
+			nonce = self.next.setdefault(address, 0)
+			self.next[address] += count
+			return nonce
+
+	def resync(self, address):
+		pass
+
+
+class FakeConfirmations(object):
+
+	def submit(self, txn):
+		future = Future()
+		threading.Timer(CONFIRMATION_LATENCY, future.set_result, [True]).start()
+		return future
+
+
+class FakeAccount(pyaxie):
+
+	def __init__(self, i, nonces):
+		# The network parts of pyaxie are replaced, everything else is the real code
+		self.name = 'scholar{}'.format(i)
+		self.ronin_address = '0x{:040x}'.format(i + 1)
+		self.personal_ronin = '0x{:040x}'.format(i + 100001)
+		self.payout_percentage = 0.6
+		self.config = {'personal': {'ronin_address': MANAGER}}
+		self.nonces = nonces
+		self.confirmations = FakeConfirmations()
+
+	def get_item_snapshot(self, address='', max_age=None):
+		time.sleep(SNAPSHOT_LATENCY)
+		return ItemSnapshot({'total': 500, 'last_claimed_item_at': 0, 'blockchain_related': {'balance': 100}})
+
+	def get_claim_signature(self):
+		time.sleep(SIGNATURE_LATENCY)
+		return {'amount': 400, 'timestamp': 0, 'signature': '0x'}
+
+	def sign_claim_transaction(self, signature, nonce):
+		return ('claim', self.ronin_address, nonce)
+
+	def sign_transfer_transaction(self, to_address, amount, nonce):
+		return ('transfer', self.ronin_address, nonce)
+
+	def send_transaction(self, signed_txn):
+		time.sleep(BROADCAST_LATENCY)
+		return '{}:{}:{}'.format(*signed_txn)
+
+	def invalidate_item_snapshot(self, address=''):
+		pass
+
+
+class FakeAsyncPyaxie(AsyncPyaxie):
+
+	def __init__(self, account):
+		self.account = account
+
+	async def get_item_snapshot(self, address='', max_age=None):
+		await asyncio.sleep(SNAPSHOT_LATENCY)
+		return ItemSnapshot({'total': 500, 'last_claimed_item_at': 0, 'blockchain_related': {'balance': 100}})
+
+
+def run_sequential(scholars):
+	# The old loop : one payout after the other
+	nonces = FakeNonces()
+	accounts = [FakeAccount(i, nonces) for i in range(scholars)]
+	start = time.perf_counter()
+	results = [account.payout() for account in accounts]
+	elapsed = time.perf_counter() - start
+	assert all(not r.startswith('Error') for txns in results for r in txns)
+	return elapsed
+
+
+def run_pipeline(scholars):
+	pyaxie_pipeline.AsyncPyaxie = FakeAsyncPyaxie
+	nonces = FakeNonces()
+	accounts = [FakeAccount(i, nonces) for i in range(scholars)]
+	pipeline = pyaxie_pipeline.MassPipeline(accounts, pyaxie_pipeline.PAYOUT)
+	start = time.perf_counter()
+	jobs = asyncio.get_event_loop().run_until_complete(pipeline.run())
+	elapsed = time.perf_counter() - start
+	assert all(job.success for job in jobs)
+	assert all(nonces.next[account.ronin_address] == 3 for account in accounts)
+	return elapsed, pipeline
+
+
+if __name__ == '__main__':
+	print('Simulated latencies : snapshot {}s, signature {}s, broadcast {}s, confirmation {}s'.format(
+		SNAPSHOT_LATENCY, SIGNATURE_LATENCY, BROADCAST_LATENCY, CONFIRMATION_LATENCY))
+	elapsed, pipeline = run_pipeline(SCHOLARS)
+	sequential = run_sequential(SCHOLARS)
+	print('{} payouts : pipeline {:.2f}s, sequential loop {:.2f}s'.format(SCHOLARS, elapsed, sequential))
+	print(pipeline.summary())
@@ -0,0 +1,80 @@
+"""
+Benchmark of pyaxie_rpc.BatchRPC against one JSON-RPC request per call, for the guild-wide reads
+(nonces, receipts and SLP balances). A local mock RPC server answers every HTTP request after a
+simulated latency and counts them, nothing is sent to the Ronin chain.
+Usage : python bench/rpc_batch_bench.py [latency_in_sec]
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import pyaxie_rpc
+import pyaxie_transport
+
+LATENCY = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+SCHOLARS = [10, 50, 100, 200]
+SLP_CONTRACT = '0xa8754b9fa15fc18bb59458815510e40a12cd2014'
+RESULTS = {'eth_getTransactionCount': '0x2a', 'eth_getTransactionReceipt': {'status': '0x1'}, 'eth_call': '0x' + '0' * 62 + '64'}
+
+
+class MockRPC(BaseHTTPRequestHandler):
+	requests = 0
+
+	def do_POST(self):
+		body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+		MockRPC.requests += 1
+		time.sleep(LATENCY)
+		calls = body if isinstance(body, list) else [body]
+		res = [{"jsonrpc": "2.0", "id": c['id'], "result": RESULTS[c['method']]} for c in reversed(calls)]
+		data = json.dumps(res if isinstance(body, list) else res[0]).encode()
+		self.send_response(200)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(data)))
+		self.end_headers()
+		self.wfile.write(data)
+
+	def log_message(self, *args):
+		pass
+
+
+def one_by_one(rpc, addresses, txns):
+	for address in addresses:
+		rpc.call('eth_getTransactionCount', [address, 'pending'])
+	for txn in txns:
+		rpc.call('eth_getTransactionReceipt', [txn])
+	for address in addresses:
+		rpc.call('eth_call', [{'to': SLP_CONTRACT, 'data': pyaxie_rpc.BALANCE_OF + address[2:].rjust(64, '0')}, 'latest'])
+
+
+def batched(rpc, addresses, txns):
+	assert set(rpc.get_transaction_counts(addresses).values()) == {42}
+	assert set(rpc.get_transaction_receipts(txns).values()) == {1}
+	assert all(balances == {'SLP': 100} for balances in rpc.get_balances({'SLP': SLP_CONTRACT}, addresses).values())
+
+
+def timed(fn, *args):
+	MockRPC.requests = 0
+	start = time.perf_counter()
+	fn(*args)
+	return time.perf_counter() - start, MockRPC.requests
+
+
+if __name__ == '__main__':
+	server = ThreadingHTTPServer(('127.0.0.1', 0), MockRPC)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	rpc = pyaxie_rpc.BatchRPC(pyaxie_transport.Transport(), 'http://127.0.0.1:{}'.format(server.server_address[1]))
+
+	print('Simulated latency per HTTP request : {} sec'.format(LATENCY))
+	print('scholars | one by one           | batched')
+	for n in SCHOLARS:
+		addresses = ['0x{:040x}'.format(i + 1) for i in range(n)]
+		txns = ['0x{:064x}'.format(i + 1) for i in range(3 * n)]
+		t1, r1 = timed(one_by_one, rpc, addresses, txns)
+		t2, r2 = timed(batched, rpc, addresses, txns)
+		print('{:>8} | {:>6.2f}s {:>5} requests | {:>6.2f}s {:>3} requests'.format(n, t1, r1, t2, r2))
+	server.shutdown()
@@ -4,10 +4,17 @@ import discord
 import yaml
 import os
 import sys
+import time
 
 from web3 import Web3
 from datetime import datetime
 from pyaxie import pyaxie
+from pyaxie_registry import AccountRegistry
+from pyaxie_async import AsyncPyaxie, run_blocking
+from pyaxie_pipeline import MassPipeline, CLAIM, PAYOUT
+from pyaxie_outbox import get_outbox
+from pyaxie_router import Router, THREAD, BACKGROUND
+from pyaxie_scheduler import PrefetchScheduler, SNAPSHOT, RANK_MMR, BALANCES, PRICE, format_age
 from datetime import timedelta
 from pprint import pprint
 
@@ -16,14 +23,17 @@ client = discord.Client(intents=discord.Intents.all())
 current_time = now.strftime("%d/%m/%Y %H:%M:%S")
 
 
-def create_info_message(pyax):
+async def create_info_message(pyax):
     """
     Create a message for the SLP infos (bot command : $wen)
-    :param pyax: a pyaxie object with scholar informations
+    :param pyax: an AsyncPyaxie object with scholar informations
     :return: The response with the infos
     """
-    balance = pyax.get_claimed_slp()
-    last_claim = pyax.get_last_claim()
+    # Warm datas of the prefetch scheduler first, the game API only if they are missing
+    snapshot = scheduler.get(pyax.ronin_address, SNAPSHOT)[0] or await pyax.get_item_snapshot()
+    slp_price = scheduler.get('slp', PRICE)[0] or await pyax.get_price('slp')
+    balance = snapshot.balance
+    last_claim = snapshot.last_claimed_item_at
 
     try:
         if datetime.utcnow() + timedelta(days=-14) < datetime.fromtimestamp(last_claim):
@@ -41,35 +51,68 @@ def create_info_message(pyax):
 
         perc = 1 if pyax.ronin_address == config['personal']['ronin_address'] else pyax.payout_percentage
 
-        unclaimed = pyax.get_unclaimed_slp()
+        unclaimed = snapshot.unclaimed
         total = int(balance + unclaimed)
         response += "\nBalance : **" + str(balance) + " SLP**" + \
                     "\nUnclaimed : **" + str(unclaimed) + " SLP**" + \
                     "\nAfter we split, you'll have : **" + str(int(total * perc)) + " SLP** or **" + str(
-            int((total * pyax.get_price('slp') * perc))) + "$**" + \
-                    "\nApproximate daily ratio : **" + str(pyax.get_daily_slp()) + " SLP**\n---"
+            int((total * slp_price * perc))) + "$**" + \
+                    "\nApproximate daily ratio : **" + str(await pyax.get_daily_slp(snapshot)) + " SLP**" + \
+                    "\nUpdated **" + format_age(time.time() - snapshot.fetched_at) + "** ago\n---"
     except ValueError as e:
         return "Error creating message : " + str(e)
     return response
 
 
+def format_pipeline_result(job):
+    """
+    Create the message of a scholar after a mass claim or payout
+    :param job: Finished PipelineJob
+    :return: The message
+    """
+    if job.snapshot is None or (job.error and not job.txns):
+        return "**{} : {}**\n".format(job.name, job.error)
+    msg = ""
+    if job.claiming:
+        msg += "**{} SLP claimed for {} !** Transaction hash : {} \n".format(job.snapshot.unclaimed, job.name, job.claim_result)
+    for to, amount, tx in job.transfer_results:
+        msg += "Sent **{} SLP**\nFrom : **{}**\nTo : **{}**\nTransaction : <https://explorer.roninchain.com/tx/{}>\n".format(
+            amount, job.account.ronin_address, to, tx)
+    return msg
+
+
+async def send_axies_gallery(out, account, axies, per_sheet=25):
+    """
+    Send axies as gallery sheets while they arrive : every per_sheet axies, their links with the picture of their sheet
+    :param out: Outbox of the channel
+    :param account: Pyaxie object building the sheets
+    :param axies: Async iterator of axies
+    :param per_sheet: Number of axies per sheet
+    """
+    async def send_sheet(chunk, number):
+        for axie_ids, buffer in await run_blocking(account.get_axies_gallery, chunk, per_sheet):
+            await out.send("\n".join(account.axie_link(int(axie_id)) for axie_id in axie_ids),
+                           files=[discord.File(buffer, filename='axies_{}.png'.format(number))])
+
+    chunk = list()
+    sheets = 0
+    async for axie in axies:
+        chunk.append(axie['id'])
+        if len(chunk) == per_sheet:
+            sheets += 1
+            await send_sheet(chunk, sheets)
+            chunk = list()
+    if chunk:
+        await send_sheet(chunk, sheets + 1)
+
+
 def get_account_from_id(id):
     """
     Get a pyaxie object depending on config
     :param id: discord_id
     :return: Scholar account or Manager account or None
     """
-    scholar = None
-    id = int(id)
-    if id == config['personal']['discord_id']:
-        scholar = pyaxie(config['personal']['ronin_address'], config['personal']['private_key'])
-    else:
-        for sch in config['scholars']:
-            if config['scholars'][sch]['discord_id'] == id:
-                scholar = pyaxie(config['scholars'][sch]['ronin_address'], config['scholars'][sch]['private_key'])
-                scholar.name = str(client.get_user(config['scholars'][sch]['discord_id'])).split('#', -1)[0]
-                break
-    return scholar
+    return registry.get_by_discord_id(id)
 
 
 def get_account_from_ronin(ronin_address):
@@ -78,16 +121,7 @@ def get_account_from_ronin(ronin_address):
     :param id: ronin address
     :return: Scholar account or Manager account or None
     """
-    scholar = None
-    if ronin_address == config['personal']['ronin_address']:
-        scholar = pyaxie(config['personal']['ronin_address'], config['personal']['private_key'])
-    else:
-        for sch in config['scholars']:
-            if config['scholars'][sch]['ronin_address'] == ronin_address:
-                scholar = pyaxie(config['scholars'][sch]['ronin_address'], config['scholars'][sch]['private_key'])
-                scholar.name = str(client.get_user(config['scholars'][sch]['discord_id'])).split('#', -1)[0]
-                break
-    return scholar
+    return registry.get_by_ronin(ronin_address)
 
 
 def log(message="", end="\n"):
@@ -105,451 +139,419 @@ def log(message="", end="\n"):
 @client.event
 async def on_ready():
     print('\nWe are logged in as {0.user}'.format(client))
+    if (config.get('prefetch') or {}).get('enabled', True):
+        scheduler.start()
+
+
+def is_manager(message):
+    return message.author.id == config['personal']['discord_id']
+
+
+async def send_texts(message, texts):
+    async with get_outbox(message.channel, config) as out:
+        for text in texts:
+            await out.send(text)
+
+
+router = Router(is_manager, send_texts)
 
 
 @client.event
 async def on_message(message):
-    if message.author == client.user or message.content[0] != '$':
+    global config
+    if message.author == client.user or not message.content.startswith('$'):
         return
-    # TODO make this configurable
-    with open(config_file, "r") as file:
-        config = yaml.safe_load(file)
+    config = registry.reload_if_changed()
 
-        scholar = get_account_from_id(message.author.id)
-        if scholar is None:
-            print("\nNon scholar tried to use the bot : " + message.author.name + " : " + str(
-                message.author.id) + " at " + now.strftime("%d/%m/%Y %H:%M:%S"))
-            return await message.channel.send(
-                "You are not part of the scholarship. Check with your manager to be added to the bot.")
-
-    ##############################
-    # Send the list of commands  #
-    ##############################
-    if message.content == "$help":
-        # TODO only send commands to manager if they have the role
-        # TODO: this needs to be translated
-        await message.channel.send("\n\n**Commands for everybody :**\n" +
-                                   "\n`$infos` = Send all the infos about your account  " +
-                                   # "\n`$qr` = Send your QR code  " +
-                                   "\n`$axies` = Send the list of axies of your account" +
-                                   # TODO(igaskin) this second argument should be manager only
-                                   # "\n`$axies 506011891353903121` = Send axies list of given discord ID" +
-                                   "\n`$profile` = Send the link of your Axie Infinity profile" +
-                                   # "\n`$all_profile` = Send a link of every Axie account in the scholarship" +
-                                   "\n`$self_payout` = To claim and payout for yourself. Send to the personal address you gave to your manager.")
-
-                                   # TODO(igaskin): hide this for managers only
-                                   # "\n\n**Commands for manager :**\n" +
-                                   # "\n`$claim 506011891353903121` = Claim for the given discord ID (Manager only)  " +
-                                   # "\n`$all_claim` = Claim for all the scholars (Manager only)  " +
-                                   # "\n`$payout` = Send the available SLP to manager and scholars  " +
-                                   # "\n`$payout me` = Send all scholarship SLP directly to manager account with no split" +
-                                   # "\n`$transfer 0xfrom_address 0xto_address amount` = Transfer amount SLP from from_address to to_address" +
-                                   # "\n`$account_balance ronin_address` = Balance of specified account" +
-                                   # "\n`$all_account_balance` = Balance of all the accounts in the scholarship" +
-                                   # "\n`$all_address` = Get all the addresses in the scholarship")
+    if get_account_from_id(message.author.id) is None:
+        print("\nNon scholar tried to use the bot : " + message.author.name + " : " + str(
+            message.author.id) + " at " + now.strftime("%d/%m/%Y %H:%M:%S"))
+        return await message.channel.send(
+            "You are not part of the scholarship. Check with your manager to be added to the bot.")
+    await router.dispatch(message)
+
+
+##############################
+# Send the list of commands  #
+##############################
+@router.command("$help", timeout=10)
+async def help_command(message, args):
+    # TODO only send commands to manager if they have the role
+    # TODO: this needs to be translated
+    await message.channel.send("\n\n**Commands for everybody :**\n" +
+                               "\n`$infos` = Send all the infos about your account  " +
+                               # "\n`$qr` = Send your QR code  " +
+                               "\n`$axies` = Send the list of axies of your account" +
+                               # TODO(igaskin) this second argument should be manager only
+                               # "\n`$axies 506011891353903121` = Send axies list of given discord ID" +
+                               "\n`$profile` = Send the link of your Axie Infinity profile" +
+                               # "\n`$all_profile` = Send a link of every Axie account in the scholarship" +
+                               "\n`$self_payout` = To claim and payout for yourself. Send to the personal address you gave to your manager.")
+
+                               # TODO(igaskin): hide this for managers only
+                               # "\n\n**Commands for manager :**\n" +
+                               # "\n`$claim 506011891353903121` = Claim for the given discord ID (Manager only)  " +
+                               # "\n`$all_claim` = Claim for all the scholars (Manager only)  " +
+                               # "\n`$payout` = Send the available SLP to manager and scholars  " +
+                               # "\n`$payout me` = Send all scholarship SLP directly to manager account with no split" +
+                               # "\n`$transfer 0xfrom_address 0xto_address amount` = Transfer amount SLP from from_address to to_address" +
+                               # "\n`$account_balance ronin_address` = Balance of specified account" +
+                               # "\n`$all_account_balance` = Balance of all the accounts in the scholarship" +
+                               # "\n`$all_address` = Get all the addresses in the scholarship")
+
+
+##############################
+# Send a QR code             #
+##############################
+@router.command("$qr")
+async def qr_command(message, args):
+    print("\nGet QR code for : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
+        "%d/%m/%Y %H:%M:%S"))
+    try:
+        qr_path = await run_blocking(get_account_from_id(message.author.id).get_qr_code)
+        await message.author.send("\nHello " + message.author.name + " ! 😃 \nHere is your new QR Code to login : ")
+        await message.author.send(file=discord.File(qr_path))
+        os.remove(qr_path)
+    except ValueError as e:
+        await message.channel.send("Error getting QR code : " + str(e))
+
+
+##################################
+# Get all infos about the author #
+##################################
+@router.command("$infos")
+async def infos_command(message, args):
+    if config['url_api'] == '':
+        return await message.channel.send(
+            "No api_url set in secret.yaml. You have to FIND and add it by yourself as it is private and I can't make it public.")
+    scholar = get_account_from_id(message.author.id)
+    if args:
+        if not args[0].isnumeric():
+            return await message.channel.send("Error in ID. Example: $infos 496061891353903121")
+        scholar = get_account_from_id(args[0])
+
+    if scholar is None:
+        return await message.channel.send("Error: No scholar found with this ID")
+
+    aio = AsyncPyaxie(scholar)
+    rank_mmr = scheduler.get(scholar.ronin_address, RANK_MMR)[0] or await aio.get_rank_mmr()
+    balances = scheduler.get(scholar.ronin_address, BALANCES)[0]
+    print("\nGet infos for : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
+        "%d/%m/%Y %H:%M:%S"))
+    try:
+        imgline = await run_blocking(scholar.get_axies_imageline)
+        await message.channel.send(
+            "\nHere are the infos for **" + scholar.name + "** account [**" + scholar.ronin_address + "**] \n" +
+            "NB of axies : **" + str(balances['axies'] if balances else await aio.get_number_of_axies()) + "**\n---\n" +
+            "Claim status : {}\n".format((await create_info_message(aio)).replace("\n", "", 1)) +
+            "MMR : **{}** 🥇\n".format(rank_mmr['mmr']) +
+            "Rank : **{}** 🎖️".format(rank_mmr['rank']), file=discord.File(imgline, filename=scholar.name + '.png'))
+    except ValueError as e:
+        await message.channel.send("Error getting infos : " + str(e))
 
-        return
 
-    ##############################
-    # Send a QR code             #
-    ##############################
-    if message.content == "$qr":
-        print("\nGet QR code for : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
-            "%d/%m/%Y %H:%M:%S"))
-        try:
-            qr_path = scholar.get_qr_code()
-            await message.author.send("\nHello " + message.author.name + " ! 😃 \nHere is your new QR Code to login : ")
-            await message.author.send(file=discord.File(qr_path))
-            os.remove(qr_path)
-        except ValueError as e:
-            await message.channel.send("Error getting QR code : " + str(e))
-        return
+##################################
+# Claim for the current scholars #
+##################################
+@router.command("$claim", timeout=300, shielded=True)
+async def claim_command(message, args):
+    if config['url_api'] == '':
+        return await message.channel.send(
+            "No api_url set in secret.yaml. You have to FIND and add it by yourself as it is private and I can't make it public.")
 
-    ##################################
-    # Get all infos about the author #
-    ##################################
-    if "$infos" in message.content:
-        if config['url_api'] == '':
+    print("\nClaim, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
+        "%d/%m/%Y %H:%M:%S"))
+    try:
+        if not args:
             return await message.channel.send(
-                "No api_url set in secret.yaml. You have to FIND and add it by yourself as it is private and I can't make it public.")
-        if "$infos " in message.content:
-            try:
-                id = message.content.split(" ")[1]
-                if id.isnumeric():
-                    scholar = get_account_from_id(id)
-                else:
-                    return await message.channel.send("Error in ID. Example: $infos 496061891353903121")
-            except ValueError as e:
-                await message.channel.send("Error : " + str(e))
-                return e
+                "You have to specify the discord ID of the scholar you want to claim for.\n" +
+                "Example: `$claim 506011891353903121`")
 
+        scholar = get_account_from_id(args[0])
         if scholar is None:
-            return await message.channel.send("Error: No scholar found with this ID")
+            return await message.channel.send("The Discord ID you specified is not in the scholarship.\n")
 
-        rank_mmr = scholar.get_rank_mmr()
-        print("\nGet infos for : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
-            "%d/%m/%Y %H:%M:%S"))
-        try:
-            imgline = scholar.get_axies_imageline()
+        aio = AsyncPyaxie(scholar)
+        amount = await aio.get_unclaimed_slp()
+        if amount > 0:
             await message.channel.send(
-                "\nHere are the infos for **" + scholar.name + "** account [**" + scholar.ronin_address + "**] \n" +
-                "NB of axies : **" + str(scholar.get_number_of_axies()) + "**\n---\n" +
-                "Claim status : {}\n".format(create_info_message(scholar).replace("\n", "", 1)) +
-                "MMR : **{}** 🥇\n".format(rank_mmr['mmr']) +
-                "Rank : **{}** 🎖️".format(rank_mmr['rank']), file=discord.File(imgline))
-        except ValueError as e:
-            await message.channel.send("Error getting infos : " + str(e))
-        return
+                "{} SLP claimed for {} !\nTransaction hash of the claim : {} ".format(amount, scholar.name,
+                                                                                      str(await aio.claim_slp())))
+            scheduler.invalidate(scholar.ronin_address)
+        else:
+            await message.channel.send("No SLP to claim for {} at this moment !\n".format(message.author.name))
 
-    ##################################
-    # Claim for the current scholars #
-    ##################################
-    if "$claim" in message.content:
-        if config['url_api'] == '':
+    except ValueError as e:
+        await message.channel.send("Error while claiming : " + str(e))
+
+
+##############################
+# Claim for all scholars     #
+##############################
+@router.command("$all_claim", policy=BACKGROUND, timeout=3600, manager_only=True, shielded=True)
+async def all_claim_command(message, args):
+    print("\nAll claim, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
+        "%d/%m/%Y %H:%M:%S"))
+    await message.channel.send("\nClaiming for all scholars... This can take some time.\n")
+
+    async with get_outbox(message.channel, config) as out:
+        async def send_result(job):
+            await out.send(format_pipeline_result(job) + "--------\n")
+
+        pipeline = MassPipeline(registry.scholars(), CLAIM, config.get('pipeline'), send_result)
+        await pipeline.run()
+        scheduler.invalidate()
+        await out.send("\n--- END OF CLAIM ---\n" + pipeline.summary())
+
+
+##############################
+# Payout                     #
+##############################
+@router.command("$self_payout", policy=BACKGROUND, timeout=600, shielded=True)
+async def self_payout_command(message, args):
+    print("\nPayout, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
+        "%d/%m/%Y %H:%M:%S"))
+    scholar = get_account_from_id(message.author.id)
+    await message.channel.send("\nSelf payout for **" + message.author.name + "**. Please wait...\n")
+    if not args:
+        to_address = scholar.personal_ronin
+    else:
+        to_address = args[0].replace('ronin:', '0x')
+        if not Web3.isAddress(to_address):
             return await message.channel.send(
-                "No api_url set in secret.yaml. You have to FIND and add it by yourself as it is private and I can't make it public.")
-
-        print("\nClaim, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
-            "%d/%m/%Y %H:%M:%S"))
-        try:
-            if message.content == "$claim":
-                return await message.channel.send(
-                    "You have to specify the discord ID of the scholar you want to claim for.\n" +
-                    "Example: `$claim 506011891353903121`")
-
-            to_id = message.content.split(' ')[1]
-            scholar = get_account_from_id(to_id)
-            if scholar is None:
-                return await message.channel.send("The Discord ID you specified is not in the scholarship.\n")
-
-            amount = scholar.get_unclaimed_slp()
-            if amount > 0:
-                await message.channel.send(
-                    "{} SLP claimed for {} !\nTransaction hash of the claim : {} ".format(amount, scholar.name,
-                                                                                          str(scholar.claim_slp())))
-            else:
-                await message.channel.send("No SLP to claim for {} at this moment !\n".format(message.author.name))
-
-        except ValueError as e:
-            await message.channel.send("Error while claiming : " + str(e))
+                "\nError in the address, make sure you try to send to the right one.\n")
+
+    if to_address == scholar.ronin_address:
+        return await message.channel.send("Your from_address and to_address are the same.")
+
+    aio = AsyncPyaxie(scholar)
+    tx = await aio.payout()
+    scheduler.invalidate(scholar.ronin_address)
+    claimed = await aio.get_claimed_slp()
+    msg = "Sent **{} SLP**\nFrom : **{}**\nTo : **{}**\nTransaction : <https://explorer.roninchain.com/tx/{}>\n".format(
+        claimed * (1 - scholar.payout_percentage), scholar.ronin_address, config['personal']['ronin_address'],
+        tx[0])
+    msg += "-----\nSent **{} SLP**\nFrom : **{}**\nTo : **{}**\nTansaction : <https://explorer.roninchain.com/tx/{}>\n".format(
+        claimed * scholar.payout_percentage, scholar.ronin_address, to_address, tx[1])
+    await message.channel.send(msg)
+
+
+@router.command("$payout", policy=BACKGROUND, timeout=3600, manager_only=True, shielded=True)
+async def payout_command(message, args):
+    if args:
+        # Only `$payout` alone pays the scholars, like before the router : `$payout me` stays disabled
         return
+    print("\nPayout, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
+        "%d/%m/%Y %H:%M:%S"))
+    await message.channel.send("\nPayout for all scholar ! This can take some time.\n")
+    async with get_outbox(message.channel, config) as out:
+        async def send_result(job):
+            await out.send(format_pipeline_result(job) + "\n-------------\n")
+
+        pipeline = MassPipeline(registry.scholars(), PAYOUT, config.get('pipeline'), send_result)
+        await pipeline.run()
+        scheduler.invalidate()
+        await out.send("\n\n--- END OF PAYOUT ---\n" + pipeline.summary())
+
+
+##############################################
+# Transfer SLP from an account to another    #
+##############################################
+@router.command("$transfer", "$transfer_id", timeout=300, manager_only=True, shielded=True)
+async def transfer_command(message, args):
+    print("\nTransfer, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
+        "%d/%m/%Y %H:%M:%S"))
+    by_id = message.content.startswith("$transfer_id")
+    if len(args) < 3 or ("0x" not in args[0] and not args[0].isnumeric()) or \
+            ("0x" not in args[1] and not args[1].isnumeric()) or not args[2].isnumeric():
+        return await message.channel.send(
+            "Error in the command. Should look like this : $transfer 0xfrom_address 0xto_address 100")
 
-    ##############################
-    # Claim for all scholars     #
-    ##############################
-    if message.content == "$all_claim":
-        print("\nAll claim, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
-            "%d/%m/%Y %H:%M:%S"))
-        if message.author.id != config['personal']['discord_id']:
-            return await message.channel.send("This command is only available for manager")
+    try:
+        scholar = get_account_from_id(args[0]) if by_id else get_account_from_ronin(args[0])
+        scholar2 = get_account_from_id(args[1]) if by_id else get_account_from_ronin(args[1])
+        if scholar is None:
+            return await message.channel.send(
+                "The from address or discord ID that you specified is not in the scholarship.")
 
-        await message.channel.send("\nClaiming for all scholars... This can take some time.\n")
+        if scholar2 is None and not by_id:
+            ronin_address = args[1]
+        else:
+            ronin_address = scholar2.ronin_address
 
         try:
-            l = list()
-            for account in config['scholars']:
-                scholar = pyaxie(config['scholars'][account]['ronin_address'],
-                                 config['scholars'][account]['private_key'])
-                amount = scholar.get_unclaimed_slp()
-                if datetime.utcnow() + timedelta(days=-14) < datetime.fromtimestamp(
-                        scholar.get_last_claim()) or amount < 0:
-                    l.append("**No SLP to claim for {} at this moment** \n".format(scholar.name))
-                else:
-                    l.append("**{} SLP claimed for {} !** Transaction hash : {} \n".format(amount, scholar.name,
-                                                                                           str(scholar.claim_slp())))
+            tx = await AsyncPyaxie(scholar).transfer_slp(ronin_address, int(args[2]))
         except ValueError as e:
-            return await message.channel.send("Error getting QR code : " + str(e))
-        return await message.channel.send("--------\n".join(l))
-
-    ##############################
-    # Payout for all scholars    #
-    ##############################
-    if "payout" in message.content:
-        print("\nPayout, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
-            "%d/%m/%Y %H:%M:%S"))
-        # Self payout for scholars
-        if "$self_payout" in message.content:
-            await message.channel.send("\nSelf payout for **" + message.author.name + "**. Please wait...\n")
-            if not ' ' in message.content:
-                to_address = scholar.personal_ronin
-            else:
-                to_address = message.content.split(' ')[1].replace('ronin:', '0x')
-                if not Web3.isAddress(to_address):
-                    return await message.channel.send(
-                        "\nError in the address, make sure you try to send to the right one.\n")
-
-            if to_address == scholar.ronin_address:
-                return await message.channel.send("Your from_address and to_address are the same.")
-
-            tx = scholar.payout()
-            claimed = scholar.get_claimed_slp()
-            msg = "Sent **{} SLP**\nFrom : **{}**\nTo : **{}**\nTransaction : <https://explorer.roninchain.com/tx/{}>\n".format(
-                claimed * (1 - scholar.payout_percentage), scholar.ronin_address, config['personal']['ronin_address'],
-                tx[0])
-            msg += "-----\nSent **{} SLP**\nFrom : **{}**\nTo : **{}**\nTansaction : <https://explorer.roninchain.com/tx/{}>\n".format(
-                claimed * scholar.payout_percentage, scholar.ronin_address, to_address, tx[1])
-            return await message.channel.send(msg)
-
-        # Payout for all scholars
-        if message.content == "$payout":
-            await message.channel.send("\nPayout for all scholar ! This can take some time.\n")
-            if message.author.id != config['personal']['discord_id']:
-                return await message.channel.send("This command is only available for manager")
-            try:
-                for account in config['scholars']:
-                    scholar = pyaxie(config['scholars'][account]['ronin_address'],
-                                     config['scholars'][account]['private_key'])
-                    unclaimed = scholar.get_unclaimed_slp()
-                    claimed = scholar.get_claimed_slp()
-
-                    if datetime.utcnow() + timedelta(days=-14) < datetime.fromtimestamp(
-                            scholar.get_last_claim()) or unclaimed <= 0:
-                        await message.channel.send("**No SLP to claim for {} at this moment** \n".format(scholar.name))
-
-                    if claimed <= 0:
-                        await message.channel.send("**No SLP to send for {} account.**\n".format(scholar.name))
-                    elif "me" in message.content:
-                        tx = scholar.transfer_slp(config['personal']['ronin_address'], claimed)
-                        await message.channel.send(
-                            "**All the {} SLP are sent to you !**\n Transaction : <https://explorer.roninchain.com/tx/{}> \n".format(
-                                claimed, str(tx)))
-                    else:
-                        res = scholar.payout()
-                        msg = "Sent **{} SLP**\nFrom : **{}**\nTo : **{}**\nTransaction : <https://explorer.roninchain.com/tx/{}>\n".format(
-                            claimed * (1 - scholar.payout_percentage), scholar.ronin_address,
-                            config['personal']['ronin_address'], res[0])
-                        msg += "-----\nSent **{} SLP**\nFrom : **{}**\nTo : **{}**\nTransaction : <https://explorer.roninchain.com/tx/{}>\n".format(
-                            claimed * scholar.payout_percentage, scholar.ronin_address, scholar.personal_ronin, res[1])
-                        await message.channel.send(msg)
-
-                    await message.channel.send("\n-------------\n")
-                await message.channel.send("\n\n--- END OF PAYOUT ---")
-            except ValueError as e:
-                await message.channel.send("Error while paying out : " + str(e))
-        return
+            return e
+        scheduler.invalidate(scholar.ronin_address)
+        scheduler.invalidate(ronin_address)
+        await message.channel.send(
+            "Sent **{} SLP**\nFrom : ** {}\n**To : ** {}** \nTransaction : <https://explorer.roninchain.com/tx/{}>\n".format(
+                args[2], args[0], ronin_address, tx))
+    except ValueError as e:
+        await message.channel.send("Error while transfering SLP : " + str(e))
 
-    ##############################################
-    # Transfer SLP from an account to another    #
-    ##############################################
-    if "$transfer" in message.content and " " in message.content:
-        print("\nTransfer, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
-            "%d/%m/%Y %H:%M:%S"))
-        if message.author.id != config['personal']['discord_id']:
-            return await message.channel.send("This command is only available for manager")
 
-        cmd = message.content.split(' ')
-        if ("0x" not in cmd[1] and not cmd[1].isnumeric()) or ("0x" not in cmd[2] and not cmd[2].isnumeric()) or not \
-        cmd[3].isnumeric():
-            return await message.channel.send(
-                "Error in the command. Should look like this : $transfer 0xfrom_address 0xto_address 100")
+##############################################
+# Get list of axie of the account            #
+##############################################
+@router.command("$axies", policy=BACKGROUND, timeout=600)
+async def axies_command(message, args):
+    print("\nAxie list, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
+        "%d/%m/%Y %H:%M:%S"))
+    scholar = get_account_from_id(message.author.id)
+    if args:
+        if not args[0].isnumeric():
+            return await message.channel.send("Error in ID. Example: $axies 496061891353903121")
+        scholar = get_account_from_id(args[0])
 
+    if scholar is None:
+        return await message.channel.send("Error: No scholar found with this ID")
+
+    try:
+        await message.channel.send("\nHere is the axie list for " + scholar.name + " account :\n")
+        axies = await AsyncPyaxie(scholar).get_axie_list()
+        if isinstance(axies, Exception):
+            raise axies
+        images = await run_blocking(scholar.download_axie_images, [axie['id'] for axie in axies])
         try:
-            scholar = get_account_from_id(cmd[1]) if cmd[0] == "$transfer_id" else get_account_from_ronin(cmd[1])
-            scholar2 = get_account_from_id(cmd[2]) if cmd[0] == "$transfer_id" else get_account_from_ronin(cmd[2])
-            if scholar is None:
-                return await message.channel.send(
-                    "The from address or discord ID that you specified is not in the scholarship.")
-
-            if scholar2 is None and cmd[0] != "$transfer_id":
-                ronin_address = cmd[2]
-            else:
-                ronin_address = scholar2.ronin_address
-
-            try:
-                tx = scholar.transfer_slp(ronin_address, int(cmd[3]))
-            except ValueError as e:
-                return e
-            await message.channel.send(
-                "Sent **{} SLP**\nFrom : ** {}\n**To : ** {}** \nTransaction : <https://explorer.roninchain.com/tx/{}>\n".format(
-                    cmd[3], cmd[1], ronin_address, tx))
-        except ValueError as e:
-            await message.channel.send("Error while transfering SLP : " + str(e))
-        return
+            async with get_outbox(message.channel, config) as out:
+                for axie in axies:
+                    await out.send(scholar.axie_link(int(axie['id'])), files=[discord.File(images[str(axie['id'])])])
+        finally:
+            scholar.release_axie_images(images.values())
+    except ValueError as e:
+        await message.channel.send("Error while getting axies : " + str(e))
 
-    ##############################################
-    # Get list of axie of the account            #
-    ##############################################
-    if "$axies" in message.content:
-        print("\nAxie list, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
-            "%d/%m/%Y %H:%M:%S"))
-        if message.content == "$axies":
-            scholar = get_account_from_id(message.author.id)
-        elif "$axies " in message.content:
-            try:
-                id = message.content.split(" ")[1]
-                if id.isnumeric():
-                    scholar = get_account_from_id(id)
-                else:
-                    return await message.channel.send("Error in ID. Example: $axies 496061891353903121")
-            except ValueError as e:
-                await message.channel.send("Error : " + str(e))
-                return e
 
-        if scholar is None:
-            return await message.channel.send("Error: No scholar found with this ID")
+@router.command("$all_axies", policy=BACKGROUND, timeout=1800)
+async def all_axies_command(message, args):
+    scholar = get_account_from_id(message.author.id)
+    if args:
+        axie_class = args[0]
+        if axie_class.lower() not in ["reptile", "plant", "dusk", "aquatic", "bird", "dawn", "beast", "bug"]:
+            return await message.channel.send(
+                axie_class + " is not a class. Class list : Reptile, Plant, Dusk, Aquatic, Bird, Dawn, Beast, Bug ")
 
+        print(
+            "\nListing of all " + axie_class + " axies in the scholarship, asked by : " + message.author.name + " : " + str(
+                message.author.id) + " at " + now.strftime("%d/%m/%Y %H:%M:%S"))
+        await message.channel.send(
+            "Getting list of all the " + axie_class + " axies in the scholarship ! This can take some time.\n")
+        axies = (axie async for axie in AsyncPyaxie(scholar).iter_all_axie_list()
+                 if axie['class'] is not None and axie['class'].lower() == axie_class.lower())
+        async with get_outbox(message.channel, config) as out:
+            await send_axies_gallery(out, scholar, axies)
+            await out.send("\n----------- END OF AXIES LIST ----------")
+    else:
+        print("\nListing of all axies in the scholarship, asked by : " + message.author.name + " : " + str(
+            message.author.id) + " at " + now.strftime("%d/%m/%Y %H:%M:%S"))
+        await message.channel.send("Getting list of all the axies in the scholarship ! This can take some time.\n")
         try:
-            axies = scholar.get_axie_list()
-            await message.channel.send("\nHere is the axie list for " + scholar.name + " account :\n")
-            for axie in axies:
-                await message.channel.send(scholar.axie_link(int(axie['id'])))
-                await message.channel.send(file=discord.File(scholar.download_axie_image(int(axie['id']))))
+            async with get_outbox(message.channel, config) as out:
+                await send_axies_gallery(out, scholar, AsyncPyaxie(scholar).iter_all_axie_list())
+                await out.send("\n----------- END OF AXIES LIST ----------")
         except ValueError as e:
             await message.channel.send("Error while getting axies : " + str(e))
-        return
-    elif "$all_axies" in message.content:
-        if "$all_axies " in message.content:
-            axie_class = message.content.split(' ')[1]
-            if axie_class.lower() in ["reptile", "plant", "dusk", "aquatic", "bird", "dawn", "beast", "bug"]:
-                axies = scholar.get_all_axie_class(axie_class)
-            else:
-                return await message.channel.send(
-                    axie_class + " is not a class. Class list : Reptile, Plant, Dusk, Aquatic, Bird, Dawn, Beast, Bug ")
-
-            print(
-                "\nListing of all " + axie_class + " axies in the scholarship, asked by : " + message.author.name + " : " + str(
-                    message.author.id) + " at " + now.strftime("%d/%m/%Y %H:%M:%S"))
-            await message.channel.send(
-                "Getting list of all the " + axie_class + " axies in the scholarship ! This can take some time.\n")
-            for axie in axies:
-                await message.channel.send("\n" + scholar.axie_link(int(axie['id'])) + "\n")
-                await message.channel.send(file=discord.File(scholar.download_axie_image(int(axie['id']))))
-            await message.channel.send("\n----------- END OF AXIES LIST ----------")
-        else:
-            print("\nListing of all axies in the scholarship, asked by : " + message.author.name + " : " + str(
-                message.author.id) + " at " + now.strftime("%d/%m/%Y %H:%M:%S"))
-            await message.channel.send("Getting list of all the axies in the scholarship ! This can take some time.\n")
-            try:
-                axies = scholar.get_all_axie_list()
-                for axie in axies:
-                    await message.channel.send("\n" + scholar.axie_link(int(axie['id'])) + "\n")
-                    await message.channel.send(file=discord.File(scholar.download_axie_image(int(axie['id']))))
-                await message.channel.send("\n----------- END OF AXIES LIST ----------")
-            except ValueError as e:
-                await message.channel.send("Error while getting axies : " + str(e))
-        return
 
-    ################################################
-    # Get account balance                          #
-    ################################################
-    if "account_balance" in message.content:
-        if message.author.id != config['personal']['discord_id']:
-            return await message.channel.send("This command is only available for manager")
-        print("\nAccount balance, asked by : " + message.author.name + " : " + str(
-            message.author.id) + " at " + now.strftime("%d/%m/%Y %H:%M:%S"))
-        await message.channel.send("\nGetting account balance. This can take some time.\n")
-        if message.content == '$account_balance':
-            datas = scholar.get_account_balances(config['personal']['ronin_address'])
-            msg = "Balances for account **{}**\n".format(datas['ronin_address'])
-            msg += "WETH : **{}** | AXS : **{}** | SLP : **{}** | Axies : **{}**\n".format(datas['WETH'], datas['AXS'],
-                                                                                           datas['SLP'], datas['axies'])
-            return await message.channel.send(msg)
-        elif "$account_balance " in message.content:
-            if not ' ' in message.content:
-                ronin_address = config['personal']['ronin_address']
-            else:
-                ronin_address = message.content.split(' ')[1].replace('ronin:', '0x')
-                if not Web3.isAddress(ronin_address):
-                    return await message.channel.send("\nError in the address.\n")
-
-            datas = scholar.get_account_balances(ronin_address)
-            msg = "Balances for account **{}**\n".format(datas['ronin_address'])
-            msg += "WETH : **{}** | AXS : **{}** | SLP : **{}** | Axies : **{}**\n".format(datas['WETH'], datas['AXS'],
-                                                                                           datas['SLP'], datas['axies'])
-            return await message.channel.send(msg)
-        elif '$all' in message.content:
-            datas = scholar.get_all_accounts_balances()
-            msg = ""
-            total_slp = 0
-            total_axs = 0
-            total_axies = 0
-            total_weth = 0
-            for data in datas:
-                msg += "Balances for account **{}**\n".format(data['ronin_address'])
-                msg += "WETH : **{}** | AXS : **{}** | SLP : **{}** | Axies : **{}**\n".format(data['WETH'],
-                                                                                               data['AXS'], data['SLP'],
-                                                                                               data['axies'])
-                msg += "-----\n"
-                total_slp += data['SLP']
-                total_axs += data['AXS']
-                total_axies += data['axies']
-                total_weth += data['WETH']
-            s = "Balances for all infos in the scholarship.\nTotal WETH : **{}** | Total AXS : **{}** | Total SLP : **{}** | Total Axies : **{}**\n\n".format(
-                total_weth, total_axs, total_slp, total_axies)
-            return await message.channel.send(s + msg)
-
-    ################################################
-    # Get all the ronin_address in the scholarship #
-    ################################################
-    if message.content == "$all_address":
-        if message.author.id != config['personal']['discord_id']:
-            return await message.channel.send("This command is only available for manager")
-        print(
-            "\nall_address, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
-                "%d/%m/%Y %H:%M:%S"))
-        l = list()
-        i = 0
-        await message.channel.send("\n Here is the list of address :\n")
-        l.append('**You** : ' + config['personal']['ronin_address'])
-        for scholar in config['scholars']:
-            l.append("**" + scholar + "** : " + config['scholars'][scholar]['ronin_address'])
-            if i == 20:
-                await message.channel.send('\n'.join(l))
-                l = list()
-                i = 0
-            i += 1
-        if len(l) > 0:
-            await message.channel.send('\n'.join(l))
-        return
 
-    #################################################
-    # Get profiles links                            #
-    #################################################
-    if "profile" in message.content:
-        print("\nProfile, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
+################################################
+# Get account balance                          #
+################################################
+@router.command("$account_balance", "$all_account_balance", policy=THREAD, timeout=120, manager_only=True)
+def account_balance_command(message, args):
+    print("\nAccount balance, asked by : " + message.author.name + " : " + str(
+        message.author.id) + " at " + now.strftime("%d/%m/%Y %H:%M:%S"))
+    scholar = get_account_from_id(message.author.id)
+    balance_format = "WETH : **{}** | AXS : **{}** | SLP : **{}** | Axies : **{}**\n"
+    if message.content.startswith("$all_account_balance") or (args and args[0] == '$all'):
+        datas = scholar.get_all_accounts_balances()
+        texts = ["Balances for all infos in the scholarship.\nTotal WETH : **{}** | Total AXS : **{}** | Total SLP : **{}** | Total Axies : **{}**\n".format(
+            sum(data['WETH'] for data in datas), sum(data['AXS'] for data in datas),
+            sum(data['SLP'] for data in datas), sum(data['axies'] for data in datas))]
+        for data in datas:
+            texts.append("Balances for account **{}**\n".format(data['ronin_address']) +
+                         balance_format.format(data['WETH'], data['AXS'], data['SLP'], data['axies']) + "-----")
+        return texts
+
+    ronin_address = config['personal']['ronin_address']
+    if args:
+        ronin_address = args[0].replace('ronin:', '0x')
+        if not Web3.isAddress(ronin_address):
+            return "\nError in the address.\n"
+    datas = scholar.get_account_balances(ronin_address)
+    return "Balances for account **{}**\n".format(datas['ronin_address']) + \
+           balance_format.format(datas['WETH'], datas['AXS'], datas['SLP'], datas['axies'])
+
+
+################################################
+# Get all the ronin_address in the scholarship #
+################################################
+@router.command("$all_address", manager_only=True)
+async def all_address_command(message, args):
+    print(
+        "\nall_address, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
             "%d/%m/%Y %H:%M:%S"))
-        url = "https://marketplace.axieinfinity.com/profile/ronin:"
-        if message.content == "$all_profiles":
-            try:
-                l = list()
-                for account in config['scholars']:
-                    address = config['scholars'][account]['ronin_address']
-                    l.append(account + " : " + url + address.replace('0x', '') + "/axie")
-                await message.channel.send("\n".join(l) + "\n-----------\n")
-            except ValueError as e:
-                await message.channel.send("Error while getting profile : " + str(e))
-                return e
-            return
-
-        elif message.content == "$profile":
-            return await message.channel.send(
-                "Here is the link for your profile **" + message.author.name + "** : " + url + scholar.ronin_address.replace(
-                    '0x', '') + "/axie")
-
-        elif " " in message.content:
-            try:
-                id = message.content.split(" ")[1]
-                if id.isnumeric():
-                    scholar = get_account_from_id(id)
-                else:
-                    return await message.channel.send("Error in discord ID. Example: $profile 496061891353903121")
-            except ValueError as e:
-                await message.channel.send("Error : " + str(e))
-                return e
-
-            if scholar is None:
-                return await message.channel.send("Error: No scholar found with this ID")
-            await message.channel.send(
-                "Here is the link for " + scholar.name + " profile : " + url + scholar.ronin_address.replace('0x',
-                                                                                                             'ronin:') + "/axie")
-        return
+    async with get_outbox(message.channel, config) as out:
+        await out.send("\n Here is the list of address :\n")
+        await out.send('**You** : ' + config['personal']['ronin_address'])
+        for scholar in config['scholars']:
+            await out.send("**" + scholar + "** : " + config['scholars'][scholar]['ronin_address'])
+
+
+#################################################
+# Get profiles links                            #
+#################################################
+PROFILE_URL = "https://marketplace.axieinfinity.com/profile/ronin:"
+
+
+@router.command("$all_profiles", "$all_profile")
+async def all_profiles_command(message, args):
+    print("\nProfile, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
+        "%d/%m/%Y %H:%M:%S"))
+    async with get_outbox(message.channel, config) as out:
+        for account in config['scholars']:
+            address = config['scholars'][account]['ronin_address']
+            await out.send(account + " : " + PROFILE_URL + address.replace('0x', '') + "/axie")
+        await out.send("-----------")
+
+
+@router.command("$profile")
+async def profile_command(message, args):
+    print("\nProfile, asked by : " + message.author.name + " : " + str(message.author.id) + " at " + now.strftime(
+        "%d/%m/%Y %H:%M:%S"))
+    if not args:
+        return await message.channel.send(
+            "Here is the link for your profile **" + message.author.name + "** : " + PROFILE_URL +
+            get_account_from_id(message.author.id).ronin_address.replace('0x', '') + "/axie")
+
+    if not args[0].isnumeric():
+        return await message.channel.send("Error in discord ID. Example: $profile 496061891353903121")
+    scholar = get_account_from_id(args[0])
+    if scholar is None:
+        return await message.channel.send("Error: No scholar found with this ID")
+    await message.channel.send(
+        "Here is the link for " + scholar.name + " profile : " + PROFILE_URL + scholar.ronin_address.replace('0x',
+                                                                                                         'ronin:') + "/axie")
+
+
+def get_discord_name(discord_id):
+    """
+    Get the name of a discord user
+    :param discord_id: discord ID of the user
+    :return: Name of the user, None if the client does not know the user yet
+    """
+    user = client.get_user(int(discord_id))
+    return None if user is None else str(user).split('#', -1)[0]
 
 
-# Loads secret.yaml data
+# Loads secret.yaml data, the accounts are built once and reused by every command
 config_file = os.getenv("CONFIG_FILE", "secret.yaml")
-with open(config_file, "r") as file:
-    config = yaml.safe_load(file)
+registry = AccountRegistry(config_file, name_resolver=get_discord_name)
+config = registry.config
+prefetch = config.get('prefetch') or {}
+scheduler = PrefetchScheduler(registry.scholars, prefetch.get('interval', 300), prefetch.get('price_interval', 60),
+                              prefetch.get('max_age', 900), prefetch.get('parallelism', 4))
 
 data = '200'
 host_name = "0.0.0.0"
@@ -1,4 +1,3 @@
-import requests
 import json
 import yaml
 import qrcode
@@ -6,26 +5,156 @@ import os
 import datetime
 import time
 import math
-import pyaxie_utils
-
+import threading
+import pyaxie_auth
+import pyaxie_breeding
+import pyaxie_cache
+import pyaxie_compose
+import pyaxie_confirm
+import pyaxie_fanout
+import pyaxie_images
+import pyaxie_nonce
+import pyaxie_rpc
+import pyaxie_prices
+import pyaxie_store
+import pyaxie_transport
+import pyaxie_txindex
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta, date
 from web3 import Web3, exceptions
 from web3.auto import w3
 from eth_account.messages import encode_defunct
 from pprint import pprint
-from pycoingecko import CoinGeckoAPI
+
+RONIN_RPC_URL = pyaxie_rpc.RONIN_RPC_URL
+# Token contracts on Ronin read by the balances : (address, decimals, rounding)
+RONIN_TOKENS = {
+	'WETH': ('0xc99a6a985ed2cac1ef41640596c5a5f9f4e19ef5', 18, 6),
+	'AXS': ('0x97a9107c1793bc407d6f527b77e7fff4d812bece', 18, 2),
+	'SLP': ('0xa8754b9fa15fc18bb59458815510e40a12cd2014', 0, None),
+	'axies': ('0x32950db2a7164ae833121501c797d79e7b79d74c', 0, None)
+}
+# Fields of an adult axie that can still change, the other ones are cached until evicted
+MUTABLE_AXIE_FIELDS = ('name', 'owner', 'ownerProfile', 'auction', 'breedCount', 'children', 'battleInfo', 'level', 'stage', 'title')
+AXIE_DETAIL_FRAGMENTS = "fragment AxieDetail on Axie {\n  id\n  image\n  class\n  chain\n  name\n  genes\n  owner\n  birthDate\n  bodyShape\n  class\n  sireId\n  sireClass\n  matronId\n  matronClass\n  stage\n  title\n  breedCount\n  level\n  figure {\n    atlas\n    model\n    image\n    __typename\n  }\n  parts {\n    ...AxiePart\n    __typename\n  }\n  stats {\n    ...AxieStats\n    __typename\n  }\n  auction {\n    ...AxieAuction\n    __typename\n  }\n  ownerProfile {\n    name\n    __typename\n  }\n  battleInfo {\n    ...AxieBattleInfo\n    __typename\n  }\n  children {\n    id\n    name\n    class\n    image\n    title\n    stage\n    __typename\n  }\n  __typename\n}\n\nfragment AxieBattleInfo on AxieBattleInfo {\n  banned\n  banUntil\n  level\n  __typename\n}\n\nfragment AxiePart on AxiePart {\n  id\n  name\n  class\n  type\n  specialGenes\n  stage\n  abilities {\n    ...AxieCardAbility\n    __typename\n  }\n  __typename\n}\n\nfragment AxieCardAbility on AxieCardAbility {\n  id\n  name\n  attack\n  defense\n  energy\n  description\n  backgroundUrl\n  effectIconUrl\n  __typename\n}\n\nfragment AxieStats on AxieStats {\n  hp\n  speed\n  skill\n  morale\n  __typename\n}\n\nfragment AxieAuction on Auction {\n  startingPrice\n  endingPrice\n  startingTimestamp\n  endingTimestamp\n  duration\n  timeLeft\n  currentPrice\n  currentPriceUSD\n  suggestedPrice\n  seller\n  listingIndex\n  state\n  __typename\n}\n"
+
+# Objects shared by every pyaxie instance
+shared_lock = threading.Lock()
+loaded_configs = dict()
+shared_web3 = dict()
+shared_contracts = dict()
+item_snapshots = None
+axie_details = None
+
+
+def load_config(config_file=None):
+	"""
+	Load the config file, it is only parsed again when modified on disk
+	:param config_file: Path of the config, CONFIG_FILE env or secret.yaml by default
+	:return: The config as dict
+	"""
+	if not config_file:
+		config_file = os.getenv("CONFIG_FILE", "secret.yaml")
+	mtime = os.stat(config_file).st_mtime
+	with shared_lock:
+		cached = loaded_configs.get(config_file)
+		if cached is not None and cached[0] == mtime:
+			return cached[1]
+	with open(config_file, "r") as file:
+		config = yaml.safe_load(file)
+	with shared_lock:
+		loaded_configs[config_file] = (mtime, config)
+	return config
+
+
+def get_shared_web3(url=RONIN_RPC_URL):
+	"""
+	:param url: RPC url of the chain
+	:return: The web3 object shared by all the accounts
+	"""
+	with shared_lock:
+		if url not in shared_web3:
+			timeout = pyaxie_transport.get_transport().timeout
+			shared_web3[url] = Web3(Web3.HTTPProvider(url, request_kwargs={'timeout': timeout}))
+		return shared_web3[url]
+
+
+def get_shared_contract(ronin_web3, contract_address, abi_path):
+	"""
+	:param ronin_web3: ronin web3 object
+	:param contract_address: Address of the contract
+	:param abi_path: Path of the ABI of the contract
+	:return: The contract object shared by all the accounts
+	"""
+	key = (id(ronin_web3), contract_address.lower(), abi_path)
+	with shared_lock:
+		if key in shared_contracts:
+			return shared_contracts[key]
+	with open(abi_path) as f:
+		abi = json.load(f)
+	contract = ronin_web3.eth.contract(address=w3.toChecksumAddress(contract_address), abi=abi)
+	with shared_lock:
+		return shared_contracts.setdefault(key, contract)
+
+
+def get_axie_detail_cache(config):
+	"""
+	:param config: The loaded config, 'cache' > 'axie_detail_size' and 'axie_detail_ttl' give the size and the mutable fields lifetime
+	:return: The axie detail cache shared by all the accounts
+	"""
+	global axie_details
+	with shared_lock:
+		if axie_details is None:
+			cache = config.get('cache', {})
+			axie_details = pyaxie_cache.DetailCache(cache.get('axie_detail_size', 1000), cache.get('axie_detail_ttl', 60), MUTABLE_AXIE_FIELDS)
+		return axie_details
+
+
+def get_item_snapshot_cache(config):
+	"""
+	:param config: The loaded config, 'cache' > 'item_snapshot_ttl' gives the lifetime of the snapshots
+	:return: The item snapshot cache shared by all the accounts
+	"""
+	global item_snapshots
+	with shared_lock:
+		if item_snapshots is None:
+			item_snapshots = pyaxie_cache.TTLCache(config.get('cache', {}).get('item_snapshot_ttl', 30))
+		return item_snapshots
+
+
+class ItemSnapshot(object):
+
+	def __init__(self, data):
+		"""
+		SLP datas of an account from one call to the game API
+		:param data: Json of clients/{address}/items/1
+		"""
+		self.data = data
+		self.fetched_at = time.time()
+		related = data.get('blockchain_related') if data else None
+		self.balance = int(related['balance'] or 0) if related else 0
+		self.total = int(data['total'] or 0) if data else 0
+		if not data:
+			self.unclaimed = 0
+		elif related is None:
+			self.unclaimed = -1
+		else:
+			self.unclaimed = self.total - self.balance
+		self.last_claimed_item_at = int(data['last_claimed_item_at']) if data else 0
+
 
 class pyaxie(object):
 
-	def __init__(self, ronin_address="", private_key=""):
+	def __init__(self, ronin_address="", private_key="", config=None):
 		"""
 		Init the class variables, we need a ronin address and its private key
 		:param ronin_address: The ronin address
 		:param private_key: Private key belonging to the ronin account
+		:param config: The loaded config, read from CONFIG_FILE if not given
 		"""
-		config_file = os.getenv("CONFIG_FILE", "secret.yaml")
-		with open(config_file, "r") as file:
-			config = yaml.safe_load(file)
+		if config is None:
+			config = load_config()
 
 		self.config = config
 		self.ronin_address = ronin_address.replace('ronin:', '0x')
@@ -33,19 +162,35 @@ class pyaxie(object):
 		self.headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/41.0.2228.0 Safari/537.36', 'authorization': ""}
 		self.url = "https://axieinfinity.com/graphql-server-v2/graphql"
 		self.url_api = config['url_api']
-		# TODO: uncomment this to add ronin write access
-		# should be optional if private key is not set
-		# access tokens are good for a week, these should be cached
-		self.access_token = self.get_access_token()
+		self.http = pyaxie_transport.get_transport(config)
+		self.price_oracle = pyaxie_prices.get_price_oracle(config)
+		# Access tokens are good for a week, they are cached on disk and only created when a call needs one
+		self.token_store = pyaxie_auth.get_token_store(config['paths'].get('token_cache_path', 'datas/tokens.yaml'))
+		if self.private_key:
+			self.token_store.register(self.ronin_address, self.authenticate)
 		self.account_id = 0
 		self.email = ""
 		self.slp_contract = None
 		self.ronin_web3 = self.get_ronin_web3()
 		self.axie_list_path = config['paths']['axie_list_path']
+		self.axie_store = pyaxie_store.get_axie_store(config['paths'].get('axie_store_path', 'datas/axies.sqlite'), self.axie_list_path)
 		self.slp_track_path = config['paths']['slp_track_path']
 		self.slp_abi_path = 'slp_abi.json'
 		self.axie_abi_path = 'slp_abi.json'
 		self.slp_contract = self.get_slp_contract(self.ronin_web3, self.slp_abi_path)
+		self.rpc = pyaxie_rpc.get_batch_rpc(config)
+		self.confirmations = pyaxie_confirm.get_confirmation_tracker(self.rpc, config)
+		self.nonces = pyaxie_nonce.get_nonce_manager(self.rpc)
+		self.item_snapshots = get_item_snapshot_cache(config)
+		self.fan_out_parallelism = config.get('concurrency', {}).get('fan_out', 8)
+		self.graphql_batch_size = config.get('concurrency', {}).get('graphql_batch_size', 25)
+		self.axie_page_size = config.get('concurrency', {}).get('axie_page_size', 24)
+		self.axie_details = get_axie_detail_cache(config)
+		self.image_cache = pyaxie_images.get_image_cache(config['paths'].get('image_cache_path', './img/axies/cache'), self.http,
+														config.get('cache', {}).get('image_cache_budget_mb', 200) * 1024 * 1024, self.fan_out_parallelism)
+		self.compositor = pyaxie_compose.get_compositor(self.image_cache)
+		self.tx_index = pyaxie_txindex.get_tx_index(config['paths'].get('tx_index_path', 'datas/txs.sqlite'), self.get_ronin_txs_page,
+													config.get('concurrency', {}).get('tx_page_size', 100), config.get('cache', {}).get('tx_index_ttl', 60))
 		self.name = "you"
 
 		for scholar in config['scholars']:
@@ -69,7 +214,7 @@ class pyaxie(object):
 		"""
 		body = {"operationName": "CreateRandomMessage", "variables": {}, "query": "mutation CreateRandomMessage {\n  createRandomMessage\n}\n"}
 
-		r = requests.post(self.url, headers=self.headers, data=body)
+		r = self.http.post(self.url, headers=self.headers, data=body)
 		try:
 			json_data = json.loads(r.text)
 		except ValueError as e:
@@ -108,7 +253,7 @@ class pyaxie(object):
 		body['variables']['input']['signature'] = signed_message['signature'].hex()
 		body['variables']['input']['message'] = raw_message
 		body['variables']['input']['owner'] = ronin_address
-		r = requests.post(self.url, headers=self.headers, json=body)
+		r = self.http.post(self.url, headers=self.headers, json=body)
 
 		try:
 			json_data = json.loads(r.text)
@@ -116,23 +261,43 @@ class pyaxie(object):
 			return e
 		return json_data['data']['createAccessTokenWithSignature']['accessToken']
 
-	def get_access_token(self):
+	def authenticate(self):
 		"""
-		Get an access token as proof of authentication
+		Sign a new message and ask the API for a fresh access token
 		:return: The access token in string
 		"""
+		msg = self.get_raw_message()
+		if not isinstance(msg, str):
+			print("Error getting the message to sign : " + str(msg))
+			return None
+		return self.submit_signature(self.sign_message(msg), msg)
+
+	def get_access_token(self, force=False):
+		"""
+		Get an access token as proof of authentication. The token is taken from the token store when still valid
+		:param force: Ignore the cached token and authenticate again
+		:return: The access token in string or None without private key
+		"""
 		if not self.private_key:
 			return
-		msg = self.get_raw_message()
-		signed = self.sign_message(msg)
-		if "JSONDecodeError" in signed:
-			print("Error getting the signed message, trying again.")
-			token = self.get_access_token()
-		else:
-			token = self.submit_signature(signed, msg)
-		self.access_token = token
-		self.headers['authorization'] = 'Bearer ' + token
-		return token
+		if force:
+			self.token_store.invalidate(self.ronin_address)
+		return self.token_store.get_or_create(self.ronin_address, self.authenticate)
+
+	@property
+	def access_token(self):
+		return self.get_access_token()
+
+	def get_auth_headers(self):
+		"""
+		Headers for the calls that need an authenticated account
+		:return: Copy of the headers with the authorization
+		"""
+		headers = self.headers.copy()
+		token = self.get_access_token()
+		if token:
+			headers['authorization'] = 'Bearer ' + token
+		return headers
 
 	def get_qr_code(self):
 		"""
@@ -147,13 +312,25 @@ class pyaxie(object):
 	# Account interaction functions #
 	#################################
 
+	def get_price_body(self, currency):
+		"""
+		:param currency: eth, slp or axs
+		:return: GraphQL body of the exchange rate query
+		"""
+		return {"operationName": "NewEthExchangeRate", "variables": {}, "query": "query NewEthExchangeRate {\n  exchangeRate {\n    " + currency.lower() + " {\n      usd\n      __typename\n    }\n    __typename\n  }\n}\n"}
+
 	def get_price(self, currency):
 		"""
 		Get the price in USD for 1 ETH / SLP / AXS
 		:return: The price in US of 1 token
 		"""
-		body = {"operationName": "NewEthExchangeRate", "variables": {}, "query": "query NewEthExchangeRate {\n  exchangeRate {\n    " + currency.lower() + " {\n      usd\n      __typename\n    }\n    __typename\n  }\n}\n"}
-		r = requests.post(self.url, headers=self.headers, json=body)
+		if currency.lower() in pyaxie_prices.CURRENCIES:
+			try:
+				return self.price_oracle.get_price(currency)
+			except ValueError as e:
+				return e
+		body = self.get_price_body(currency)
+		r = self.http.post(self.url, headers=self.headers, json=body, idempotent=True)
 		try:
 			json_data = json.loads(r.text)
 		except ValueError as e:
@@ -166,7 +343,7 @@ class pyaxie(object):
 		:return: Your profil data as dict
 		"""
 		body = {"operationName": "GetProfileBrief", "variables": {}, "query": "query GetProfileBrief {\n  profile {\n    ...ProfileBrief\n    __typename\n  }\n}\n\nfragment ProfileBrief on AccountProfile {\n  accountId\n  addresses {\n    ...Addresses\n    __typename\n  }\n  email\n  activated\n  name\n  settings {\n    unsubscribeNotificationEmail\n    __typename\n  }\n  __typename\n}\n\nfragment Addresses on NetAddresses {\n  ethereum\n  tomo\n  loom\n  ronin\n  __typename\n}\n"}
-		r = requests.post(self.url, headers=self.headers, json=body)
+		r = self.http.post(self.url, headers=self.get_auth_headers(), json=body, idempotent=True)
 		try:
 			json_data = json.loads(r.text)
 		except ValueError as e:
@@ -183,7 +360,7 @@ class pyaxie(object):
 		:return: activity log
 		"""
 		body = {"operationName": "GetActivityLog", "variables": {"from": 0, "size": 6}, "query": "query GetActivityLog($from: Int, $size: Int) {\n  profile {\n    activities(from: $from, size: $size) {\n      ...Activity\n      __typename\n    }\n    __typename\n  }\n}\n\nfragment Activity on Activity {\n  activityId\n  accountId\n  action\n  timestamp\n  seen\n  data {\n    ... on ListAxie {\n      ...ListAxie\n      __typename\n    }\n    ... on UnlistAxie {\n      ...UnlistAxie\n      __typename\n    }\n    ... on BuyAxie {\n      ...BuyAxie\n      __typename\n    }\n    ... on GiftAxie {\n      ...GiftAxie\n      __typename\n    }\n    ... on MakeAxieOffer {\n      ...MakeAxieOffer\n      __typename\n    }\n    ... on CancelAxieOffer {\n      ...CancelAxieOffer\n      __typename\n    }\n    ... on SyncExp {\n      ...SyncExp\n      __typename\n    }\n    ... on MorphToPetite {\n      ...MorphToPetite\n      __typename\n    }\n    ... on MorphToAdult {\n      ...MorphToAdult\n      __typename\n    }\n    ... on BreedAxies {\n      ...BreedAxies\n      __typename\n    }\n    ... on BuyLand {\n      ...BuyLand\n      __typename\n    }\n    ... on ListLand {\n      ...ListLand\n      __typename\n    }\n    ... on UnlistLand {\n      ...UnlistLand\n      __typename\n    }\n    ... on GiftLand {\n      ...GiftLand\n      __typename\n    }\n    ... on MakeLandOffer {\n      ...MakeLandOffer\n      __typename\n    }\n    ... on CancelLandOffer {\n      ...CancelLandOffer\n      __typename\n    }\n    ... on BuyItem {\n      ...BuyItem\n      __typename\n    }\n    ... on ListItem {\n      ...ListItem\n      __typename\n    }\n    ... on UnlistItem {\n      ...UnlistItem\n      __typename\n    }\n    ... on GiftItem {\n      ...GiftItem\n      __typename\n    }\n    ... on MakeItemOffer {\n      ...MakeItemOffer\n      __typename\n    }\n    ... on CancelItemOffer {\n      ...CancelItemOffer\n      __typename\n    }\n    ... on ListBundle {\n      ...ListBundle\n      __typename\n    }\n    ... on UnlistBundle {\n      ...UnlistBundle\n      __typename\n    }\n    ... on BuyBundle {\n      ...BuyBundle\n      __typename\n    }\n    ... on MakeBundleOffer {\n      ...MakeBundleOffer\n      __typename\n    }\n    ... on CancelBundleOffer {\n      ...CancelBundleOffer\n      __typename\n    }\n    ... on AddLoomBalance {\n      ...AddLoomBalance\n      __typename\n    }\n    ... on WithdrawFromLoom {\n      ...WithdrawFromLoom\n      __typename\n    }\n    ... on AddFundBalance {\n      ...AddFundBalance\n      __typename\n    }\n    ... on WithdrawFromFund {\n      ...WithdrawFromFund\n      __typename\n    }\n    ... on TopupRoninWeth {\n      ...TopupRoninWeth\n      __typename\n    }\n    ... on WithdrawRoninWeth {\n      ...WithdrawRoninWeth\n      __typename\n    }\n    __typename\n  }\n  __typename\n}\n\nfragment ListAxie on ListAxie {\n  axieId\n  priceFrom\n  priceTo\n  duration\n  txHash\n  __typename\n}\n\nfragment UnlistAxie on UnlistAxie {\n  axieId\n  txHash\n  __typename\n}\n\nfragment BuyAxie on BuyAxie {\n  axieId\n  price\n  owner\n  txHash\n  __typename\n}\n\nfragment GiftAxie on GiftAxie {\n  axieId\n  destination\n  txHash\n  __typename\n}\n\nfragment MakeAxieOffer on MakeAxieOffer {\n  axieId\n  price\n  txHash\n  __typename\n}\n\nfragment CancelAxieOffer on CancelAxieOffer {\n  axieId\n  txHash\n  __typename\n}\n\nfragment SyncExp on SyncExp {\n  axieId\n  exp\n  txHash\n  __typename\n}\n\nfragment MorphToPetite on MorphToPetite {\n  axieId\n  txHash\n  __typename\n}\n\nfragment MorphToAdult on MorphToAdult {\n  axieId\n  txHash\n  __typename\n}\n\nfragment BreedAxies on BreedAxies {\n  sireId\n  matronId\n  lovePotionAmount\n  txHash\n  __typename\n}\n\nfragment BuyLand on BuyLand {\n  row\n  col\n  price\n  owner\n  txHash\n  __typename\n}\n\nfragment ListLand on ListLand {\n  row\n  col\n  priceFrom\n  priceTo\n  duration\n  txHash\n  __typename\n}\n\nfragment UnlistLand on UnlistLand {\n  row\n  col\n  txHash\n  __typename\n}\n\nfragment GiftLand on GiftLand {\n  row\n  col\n  destination\n  txHash\n  __typename\n}\n\nfragment MakeLandOffer on MakeLandOffer {\n  row\n  col\n  price\n  txHash\n  __typename\n}\n\nfragment CancelLandOffer on CancelLandOffer {\n  row\n  col\n  txHash\n  __typename\n}\n\nfragment BuyItem on BuyItem {\n  tokenId\n  itemAlias\n  price\n  owner\n  txHash\n  __typename\n}\n\nfragment ListItem on ListItem {\n  tokenId\n  itemAlias\n  priceFrom\n  priceTo\n  duration\n  txHash\n  __typename\n}\n\nfragment UnlistItem on UnlistItem {\n  tokenId\n  itemAlias\n  txHash\n  __typename\n}\n\nfragment GiftItem on GiftItem {\n  tokenId\n  itemAlias\n  destination\n  txHash\n  __typename\n}\n\nfragment MakeItemOffer on MakeItemOffer {\n  tokenId\n  itemAlias\n  price\n  txHash\n  __typename\n}\n\nfragment CancelItemOffer on CancelItemOffer {\n  tokenId\n  itemAlias\n  txHash\n  __typename\n}\n\nfragment BuyBundle on BuyBundle {\n  listingIndex\n  price\n  owner\n  txHash\n  __typename\n}\n\nfragment ListBundle on ListBundle {\n  numberOfItems\n  priceFrom\n  priceTo\n  duration\n  txHash\n  __typename\n}\n\nfragment UnlistBundle on UnlistBundle {\n  listingIndex\n  txHash\n  __typename\n}\n\nfragment MakeBundleOffer on MakeBundleOffer {\n  listingIndex\n  price\n  txHash\n  __typename\n}\n\nfragment CancelBundleOffer on CancelBundleOffer {\n  listingIndex\n  txHash\n  __typename\n}\n\nfragment AddLoomBalance on AddLoomBalance {\n  amount\n  senderAddress\n  receiverAddress\n  txHash\n  __typename\n}\n\nfragment WithdrawFromLoom on WithdrawFromLoom {\n  amount\n  senderAddress\n  receiverAddress\n  txHash\n  __typename\n}\n\nfragment AddFundBalance on AddFundBalance {\n  amount\n  senderAddress\n  txHash\n  __typename\n}\n\nfragment WithdrawFromFund on WithdrawFromFund {\n  amount\n  receiverAddress\n  txHash\n  __typename\n}\n\nfragment WithdrawRoninWeth on WithdrawRoninWeth {\n  amount\n  receiverAddress\n  txHash\n  receiverAddress\n  __typename\n}\n\nfragment TopupRoninWeth on TopupRoninWeth {\n  amount\n  receiverAddress\n  txHash\n  receiverAddress\n  __typename\n}\n"}
-		r = requests.post(self.url, headers=self.headers, json=body)
+		r = self.http.post(self.url, headers=self.get_auth_headers(), json=body, idempotent=True)
 		try:
 			json_data = json.loads(r.text)
 		except ValueError as e:
@@ -199,7 +376,7 @@ class pyaxie(object):
 		if ronin_address == '':
 			ronin_address = self.ronin_address
 		body = {"operationName": "GetProfileNameByRoninAddress", "variables": {"roninAddress": ronin_address}, "query": "query GetProfileNameByRoninAddress($roninAddress: String!) {\n  publicProfileWithRoninAddress(roninAddress: $roninAddress) {\n    accountId\n    name\n    __typename\n  }\n}\n"}
-		r = requests.post(self.url, headers=self.headers, json=body)
+		r = self.http.post(self.url, headers=self.headers, json=body, idempotent=True)
 		try:
 			json_data = json.loads(r.text)
 		except ValueError as e:
@@ -209,7 +386,7 @@ class pyaxie(object):
 	def rename_account(self, new_name):
 		body = {"operationName": "RenameAxie", "variables": {"axieId": str(new_name),"name": str(new_name) }, "query": "mutation RenameAxie($axieId: ID!, $name: String!) {\n  renameAxie(axieId: $axieId, name: $name) {\n    result\n    __typename\n  }\n}\n"}
 		try:
-			r = requests.post(self.url, headers=self.headers, json=body)
+			r = self.http.post(self.url, headers=self.get_auth_headers(), json=body)
 			json_data = json.loads(r.text)
 		except ValueError as e:
 			return e
@@ -226,7 +403,7 @@ class pyaxie(object):
 		if ronin_address == '':
 			ronin_address = self.ronin_address
 		body = {"operationName": "GetProfileByRoninAddress", "variables": {"roninAddress": ronin_address}, "query": "query GetProfileByRoninAddress($roninAddress: String!) {\n  publicProfileWithRoninAddress(roninAddress: $roninAddress) {\n    ...Profile\n    __typename\n  }\n}\n\nfragment Profile on PublicProfile {\n  accountId\n  name\n  addresses {\n    ...Addresses\n    __typename\n  }\n  __typename\n}\n\nfragment Addresses on NetAddresses {\n  ethereum\n  tomo\n  loom\n  ronin\n  __typename\n}\n"}
-		r = requests.post(self.url, headers=self.headers, json=body)
+		r = self.http.post(self.url, headers=self.headers, json=body, idempotent=True)
 		try:
 			json_data = json.loads(r.text)
 		except ValueError as e:
@@ -242,15 +419,14 @@ class pyaxie(object):
 			ronin_address = self.ronin_address
 		params = {"client_id": ronin_address, "offset": 0, "limit": 0}
 
-		# Try multiple times to avoid return 0
-		for i in range(0, 5):
-			try:
-				r = requests.get(self.url_api + "last-season-leaderboard", params=params)
-				json_data = json.loads(r.text)
-				if json_data['success']:
-					return {'mmr': int(json_data['items'][1]['elo']), 'rank': int(json_data['items'][1]['rank'])}
-			except ValueError as e:
-				return e
+		# Failed requests are retried by the transport
+		try:
+			r = self.http.get(self.url_api + "last-season-leaderboard", params=params)
+			json_data = json.loads(r.text)
+		except ValueError as e:
+			return e
+		if json_data['success']:
+			return {'mmr': int(json_data['items'][1]['elo']), 'rank': int(json_data['items'][1]['rank'])}
 		return {'mmr': 0, 'rank': 0}
 
 
@@ -259,8 +435,9 @@ class pyaxie(object):
 		Get the daily SLP ratio based on SLP farmed between now and last claim
 		:return: Dict with ratio and date
 		"""
-		unclaimed = self.get_unclaimed_slp()
-		t = datetime.datetime.fromtimestamp(self.get_last_claim())
+		snapshot = self.get_item_snapshot()
+		unclaimed = snapshot.unclaimed
+		t = datetime.datetime.fromtimestamp(snapshot.last_claimed_item_at)
 		days = (t - datetime.datetime.utcnow()).days * -1
 		if days <= 0:
 			return unclaimed
@@ -270,34 +447,83 @@ class pyaxie(object):
 	# Functions to interact with axies from web #
 	#############################################
 
+	def get_axie_list_body(self, ronin_address='', start=0, size=24):
+		"""
+		:param ronin_address: The ronin address of the target account
+		:param start: Index of the first axie
+		:param size: Number of axies to get
+		:return: GraphQL body of the axie list query
+		"""
+		if ronin_address == '':
+			ronin_address = self.ronin_address
+		return {"operationName": "GetAxieBriefList", "variables": {"from": start, "size": size, "sort": "IdDesc", "auctionType": "All", "owner": ronin_address, "criteria": {"region": None, "parts": None, "bodyShapes": None, "classes": None, "stages": None, "numMystic": None, "pureness": None, "title": None, "breedable": None, "breedCount": None, "hp":[],"skill":[],"speed":[],"morale":[]}},"query":"query GetAxieBriefList($auctionType: AuctionType, $criteria: AxieSearchCriteria, $from: Int, $sort: SortBy, $size: Int, $owner: String) {\n  axies(auctionType: $auctionType, criteria: $criteria, from: $from, sort: $sort, size: $size, owner: $owner) {\n    total\n    results {\n      ...AxieBrief\n      __typename\n    }\n    __typename\n  }\n}\n\nfragment AxieBrief on Axie {\n  id\n  name\n  stage\n  class\n  breedCount\n  image\n  title\n  battleInfo {\n    banned\n    __typename\n  }\n  auction {\n    currentPrice\n    currentPriceUSD\n    __typename\n  }\n  parts {\n    id\n    name\n    class\n    type\n    specialGenes\n    __typename\n  }\n  __typename\n}\n"}
+
+	def get_axie_page(self, ronin_address='', start=0, size=None):
+		"""
+		Get one page of the axies of an account
+		:param ronin_address: The ronin address of the target account
+		:param start: Index of the first axie
+		:param size: Number of axies in the page, axie_page_size by default
+		:return: Dict with the total number of axies and the results of the page
+		"""
+		body = self.get_axie_list_body(ronin_address, start, size or self.axie_page_size)
+		r = self.http.post(self.url, headers=self.headers, json=body, idempotent=True)
+		json_data = json.loads(r.text)
+		return json_data['data']['axies']
+
+	def iter_axie_pages(self, ronin_address=''):
+		"""
+		Get all the pages of the axies of an account. The first page gives the total, the other ones are
+		requested at the same time and given as soon as they arrive
+		:param ronin_address: The ronin address of the target account
+		:return: Generator of (index of the first axie, list of axies)
+		"""
+		size = self.axie_page_size
+		first = self.get_axie_page(ronin_address, 0, size)
+		yield 0, first['results']
+		starts = range(size, first['total'] or 0, size)
+		if not starts:
+			return
+		with ThreadPoolExecutor(max_workers=min(self.fan_out_parallelism, len(starts))) as pool:
+			futures = {pool.submit(self.get_axie_page, ronin_address, start, size): start for start in starts}
+			for future in as_completed(futures):
+				yield futures[future], future.result()['results']
+
+	def iter_axie_list(self, ronin_address=''):
+		"""
+		Get the axies of an account as they arrive, without waiting for the whole inventory
+		:param ronin_address: The ronin address of the target account
+		:return: Generator of axie datas
+		"""
+		for start, axies in self.iter_axie_pages(ronin_address):
+			for axie in axies:
+				yield axie
+
 	def get_axie_list(self, ronin_address=''):
 		"""
 		Get informations about the axies in a specific account
 		:param ronin_address: The ronin address of the target account
 		:return: Data about the axies
 		"""
-		if ronin_address == '':
-			ronin_address = self.ronin_address
-		body = {"operationName": "GetAxieBriefList", "variables": {"from": 0, "size": 24, "sort": "IdDesc", "auctionType": "All", "owner": ronin_address, "criteria": {"region": None, "parts": None, "bodyShapes": None, "classes": None, "stages": None, "numMystic": None, "pureness": None, "title": None, "breedable": None, "breedCount": None, "hp":[],"skill":[],"speed":[],"morale":[]}},"query":"query GetAxieBriefList($auctionType: AuctionType, $criteria: AxieSearchCriteria, $from: Int, $sort: SortBy, $size: Int, $owner: String) {\n  axies(auctionType: $auctionType, criteria: $criteria, from: $from, sort: $sort, size: $size, owner: $owner) {\n    total\n    results {\n      ...AxieBrief\n      __typename\n    }\n    __typename\n  }\n}\n\nfragment AxieBrief on Axie {\n  id\n  name\n  stage\n  class\n  breedCount\n  image\n  title\n  battleInfo {\n    banned\n    __typename\n  }\n  auction {\n    currentPrice\n    currentPriceUSD\n    __typename\n  }\n  parts {\n    id\n    name\n    class\n    type\n    specialGenes\n    __typename\n  }\n  __typename\n}\n"}
 		try:
-			r = requests.post(self.url, headers=self.headers, json=body)
-			json_data = json.loads(r.text)
+			pages = sorted(self.iter_axie_pages(ronin_address), key=lambda page: page[0])
 		except ValueError as e:
 			return e
-		return json_data['data']['axies']['results']
+		return [axie for start, axies in pages for axie in axies]
 
 	def get_all_axie_list(self):
 		"""
 		Get informations about the axies in all the accounts
 		:return: List with all axies datas
 		"""
+		addresses = [self.config['scholars'][account]['ronin_address'] for account in self.config['scholars']]
+		addresses.append(self.config['personal']['ronin_address'])
 		res = list()
-		for account in self.config['scholars']:
-			axies = self.get_axie_list(self.config['scholars'][account]['ronin_address'])
-			for axie in axies:
-				res.append(axie)
-		for axie in self.get_axie_list(self.config['personal']['ronin_address']):
-			res.append(axie)
+		for address, axies in zip(addresses, pyaxie_fanout.fan_out(self.get_axie_list, addresses, self.fan_out_parallelism)):
+			if isinstance(axies, Exception):
+				print("Error getting axies of " + address + " : " + str(axies))
+				continue
+			res.extend(axies)
 		return res
 
 	def get_all_axie_class(self, axie_class, axies_datas=[]):
@@ -320,21 +546,18 @@ class pyaxie(object):
 		:param axie_id: String ID of the axie you are targeting
 		:return: Link to the image
 		"""
-		body = {"operationName": "GetAxieMetadata", "variables": {"axieId": axie_id}, "query": "query GetAxieMetadata($axieId: ID!) {\n  axie(axieId: $axieId) {\n    id\n    image\n    __typename\n  }\n}\n"}
-		try:
-			r = requests.post(self.url, headers=self.headers, json=body)
-			json_data = json.loads(r.text)
-		except ValueError as e:
-			return e
-		return json_data['data']['axie']['image']
+		data = self.get_axie_detail(axie_id, ('image',))
+		return data['image'] if data else None
 
 	def get_number_of_axies(self):
 		"""
 		Get the number of axies in the account
 		:return: the number of axies
 		"""
-		axies = self.get_axie_list()
-		return len(axies)
+		try:
+			return self.get_axie_page(size=1)['total']
+		except ValueError as e:
+			return e
 
 	def download_axie_image(self, axie_id):
 		"""
@@ -342,65 +565,119 @@ class pyaxie(object):
 		:param axie_id: ID of the axie
 		:return: Path of the image
 		"""
-		axie_id = str(axie_id)
-		path = './img/axies/' + axie_id + '.png'
-		dir = os.path.join(".", "img", "axies")
-		if not os.path.exists(dir):
-			os.mkdir(dir)
+		return self.image_cache.get(axie_id)
 
-		if os.path.exists(path):
-			return path
+	def download_axie_images(self, axie_ids):
+		"""
+		Download the images of many axies in parallel, they are kept on disk until release_axie_images is called
+		:param axie_ids: List of axie IDs
+		:return: Dict {axie ID as string: path of the image}
+		"""
+		return self.image_cache.prefetch(axie_ids, pin=True)
 
-		img_data = requests.get('https://storage.googleapis.com/assets.axieinfinity.com/axies/'+axie_id+'/axie/axie-full-transparent.png').content
-		if len(img_data) <= 500:
-			return './img/axies/egg.png'
-		with open(path, 'ab') as img:
-			img.write(img_data)
-		return path
+	def release_axie_images(self, paths):
+		"""
+		:param paths: Paths returned by download_axie_images, the images can be evicted again
+		"""
+		self.image_cache.release(paths)
 
 	def get_axies_imageline(self):
 		"""
-		Get the path to the picture containing the 3 axies merged horizontally
-		:return: Path of the new picture
+		Get the picture containing the 3 axies merged horizontally, built in memory
+		:return: BytesIO with the PNG
 		"""
 		try:
 			axies = self.get_axie_list()
-			l = list()
-			for axie in axies:
-				l.append(self.download_axie_image(axie['id']))
-			if len(l) < 3:
+			if len(axies) < 3:
 				return 'Error: not enough axies on the account'
 		except ValueError as e:
 			return e
-		return pyaxie_utils.merge_images(l[0], l[1], l[2], self.name)
+		return self.compositor.line([axie['id'] for axie in axies[:3]])
+
+	def get_axies_gallery(self, axie_ids, per_sheet=25, columns=5):
+		"""
+		Get contact sheets of axie thumbnails, built in memory
+		:param axie_ids: List of axie IDs
+		:param per_sheet: Number of axies per sheet
+		:param columns: Number of axies per row
+		:return: List of (axie IDs of the sheet sorted by ID, BytesIO with the PNG)
+		"""
+		return self.compositor.sheets(axie_ids, per_sheet, columns)
 
-	def get_axie_detail(self, axie_id):
+	def cache_axie_detail(self, data):
+		"""
+		Keep the details of an axie in the detail cache, only adults have immutable fields
+		:param data: Datas of the axie
+		"""
+		if data:
+			self.axie_details.set(str(data['id']), data, frozen=data.get('stage') == 4)
+
+	def get_axie_detail(self, axie_id, fields=None):
 		"""
 		Get informations about an Axie based on its ID
 		:param axie_id: string ID of the axie
+		:param fields: Fields that will be read, to reuse cached details when they are still valid for them
 		:return: A dict with the adatas of the axie
 		"""
-		body = {"operationName": "GetAxieDetail", "variables": {"axieId": axie_id}, "query": "query GetAxieDetail($axieId: ID!) {\n  axie(axieId: $axieId) {\n    ...AxieDetail\n    __typename\n  }\n}\n\nfragment AxieDetail on Axie {\n  id\n  image\n  class\n  chain\n  name\n  genes\n  owner\n  birthDate\n  bodyShape\n  class\n  sireId\n  sireClass\n  matronId\n  matronClass\n  stage\n  title\n  breedCount\n  level\n  figure {\n    atlas\n    model\n    image\n    __typename\n  }\n  parts {\n    ...AxiePart\n    __typename\n  }\n  stats {\n    ...AxieStats\n    __typename\n  }\n  auction {\n    ...AxieAuction\n    __typename\n  }\n  ownerProfile {\n    name\n    __typename\n  }\n  battleInfo {\n    ...AxieBattleInfo\n    __typename\n  }\n  children {\n    id\n    name\n    class\n    image\n    title\n    stage\n    __typename\n  }\n  __typename\n}\n\nfragment AxieBattleInfo on AxieBattleInfo {\n  banned\n  banUntil\n  level\n  __typename\n}\n\nfragment AxiePart on AxiePart {\n  id\n  name\n  class\n  type\n  specialGenes\n  stage\n  abilities {\n    ...AxieCardAbility\n    __typename\n  }\n  __typename\n}\n\nfragment AxieCardAbility on AxieCardAbility {\n  id\n  name\n  attack\n  defense\n  energy\n  description\n  backgroundUrl\n  effectIconUrl\n  __typename\n}\n\nfragment AxieStats on AxieStats {\n  hp\n  speed\n  skill\n  morale\n  __typename\n}\n\nfragment AxieAuction on Auction {\n  startingPrice\n  endingPrice\n  startingTimestamp\n  endingTimestamp\n  duration\n  timeLeft\n  currentPrice\n  currentPriceUSD\n  suggestedPrice\n  seller\n  listingIndex\n  state\n  __typename\n}\n"}
+		data = self.axie_details.get(str(axie_id), fields)
+		if data is not None:
+			return data
+		body = {"operationName": "GetAxieDetail", "variables": {"axieId": axie_id}, "query": "query GetAxieDetail($axieId: ID!) {\n  axie(axieId: $axieId) {\n    ...AxieDetail\n    __typename\n  }\n}\n\n" + AXIE_DETAIL_FRAGMENTS}
 		try:
-			r = requests.post(self.url, headers=self.headers, json=body)
+			r = self.http.post(self.url, headers=self.headers, json=body, idempotent=True)
 			json_data = json.loads(r.text)
 		except ValueError as e:
 			return None
+		self.cache_axie_detail(json_data['data']['axie'])
 		return json_data['data']['axie']
 
+	def get_axies_detail(self, axie_ids, batch_size=None):
+		"""
+		Get informations about many axies with one GraphQL request per batch of axies
+		:param axie_ids: List of axie IDs
+		:param batch_size: Number of axies per request, concurrency.graphql_batch_size by default
+		:return: Dict {axie ID as string: datas of the axie or None if not found}
+		"""
+		res = dict()
+		missing = list()
+		for axie_id in dict.fromkeys(str(i) for i in axie_ids):
+			res[axie_id] = self.axie_details.get(axie_id)
+			if res[axie_id] is None:
+				missing.append(axie_id)
+		batch_size = batch_size or self.graphql_batch_size
+		batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+		for batch, datas in zip(batches, pyaxie_fanout.fan_out(self.get_axies_detail_batch, batches, self.fan_out_parallelism)):
+			if isinstance(datas, Exception):
+				print("Error getting details of axies " + ", ".join(batch) + " : " + str(datas))
+				datas = dict.fromkeys(batch)
+			for data in datas.values():
+				self.cache_axie_detail(data)
+			res.update(datas)
+		return res
+
+	def get_axies_detail_batch(self, axie_ids):
+		"""
+		Get informations about a few axies in one aliased GraphQL request
+		:param axie_ids: List of axie IDs as string
+		:return: Dict {axie ID: datas of the axie or None if not found}
+		"""
+		variables = {"a" + str(n): axie_id for n, axie_id in enumerate(axie_ids)}
+		params = ", ".join("$" + alias + ": ID!" for alias in variables)
+		fields = "".join("  " + alias + ": axie(axieId: $" + alias + ") {\n    ...AxieDetail\n    __typename\n  }\n" for alias in variables)
+		body = {"operationName": "GetAxiesDetail", "variables": variables, "query": "query GetAxiesDetail(" + params + ") {\n" + fields + "}\n\n" + AXIE_DETAIL_FRAGMENTS}
+		r = self.http.post(self.url, headers=self.headers, json=body, idempotent=True)
+		json_data = json.loads(r.text)
+		data = json_data.get('data') or {}
+		return {axie_id: data.get(alias) for alias, axie_id in variables.items()}
+
 	def get_axie_name(self, axie_id):
 		"""
 		Get the name of an axie based on his ID
 		:param axie_id: The id of the axie
 		:return: Name of the axie
 		"""
-		body = {"operationName": "GetAxieName", "variables": {"axieId": axie_id}, "query": "query GetAxieName($axieId: ID!) {\n  axie(axieId: $axieId) {\n    ...AxieName\n    __typename\n  }\n}\n\nfragment AxieName on Axie {\n  name\n  __typename\n}\n"}
-		try:
-			r = requests.post(self.url, headers=self.headers, json=body)
-			json_data = json.loads(r.text)
-		except ValueError as e:
-			return e
-		return json_data['data']['axie']['name']
+		data = self.get_axie_detail(axie_id, ('name',))
+		return data['name'] if data else None
 
 	def get_axie_stats(self, axie_id):
 		"""
@@ -408,7 +685,7 @@ class pyaxie(object):
 		:param axie_id: String ID of the axie
 		:return: Dict with the stats
 		"""
-		data = self.get_axie_detail(axie_id)
+		data = self.get_axie_detail(axie_id, ('stats',))
 		return data['stats']
 
 	def get_axie_parts(self, axie_id):
@@ -417,7 +694,7 @@ class pyaxie(object):
 		:param axie_id: String ID of the axie
 		:return: Dict with the differents body parts
 		"""
-		data = self.get_axie_detail(axie_id)
+		data = self.get_axie_detail(axie_id, ('parts',))
 		return data['parts']
 
 	def get_axie_class(self, axie_id):
@@ -426,7 +703,7 @@ class pyaxie(object):
 		:param axie_id: String ID of the axie
 		:return: Dict with the differents body parts
 		"""
-		data = self.get_axie_detail(axie_id)
+		data = self.get_axie_detail(axie_id, ('class',))
 		return data['class']
 
 	def get_axie_children(self, id=0, axie_data={}):
@@ -436,7 +713,7 @@ class pyaxie(object):
 		:param axie_data: axie_datas
 		:return: list of id of the children
 		"""
-		axie = self.get_axie_detail(id) if axie_data == {} else axie_data
+		axie = self.get_axie_detail(id, ('children',)) if axie_data == {} else axie_data
 		l = list()
 		for children in axie['children']:
 			l.append(int(children['id']))
@@ -451,13 +728,14 @@ class pyaxie(object):
 		"""
 		body = {"operationName": "RenameAxie", "variables": {"axieId": str(axie_id),"name": str(new_name) }, "query": "mutation RenameAxie($axieId: ID!, $name: String!) {\n  renameAxie(axieId: $axieId, name: $name) {\n    result\n    __typename\n  }\n}\n"}
 		try:
-			r = requests.post(self.url, headers=self.headers, json=body)
+			r = self.http.post(self.url, headers=self.get_auth_headers(), json=body)
 			json_data = json.loads(r.text)
 			pprint(json_data)
 		except ValueError as e:
 			return e
 		if json_data['data'] is None:
 			return False
+		self.axie_details.invalidate(str(axie_id))
 		return json_data['data']['renameAxie']['result']
 
 	###############################################
@@ -466,57 +744,78 @@ class pyaxie(object):
 
 	def save_axie(self, axie_data):
 		"""
-		Save an axie details to the local axie_list
-		:param axie_data:
-		:param axie_list: Path of the axie_list file
+		Save an axie details to the local axie store
+		:param axie_data: Datas of the axie
 		"""
-		axie_list = self.axie_list()
-		axie_id = axie_data['id']
-		if axie_list:
-			axie_list.update({axie_id: axie_data})
-		else:
-			axie_list = {axie_id: axie_data}
-		f = open(self.axie_list_path, 'a')
-		yaml.safe_dump(axie_list, f)
-		f.close()
+		self.axie_store.upsert(axie_data)
 
 	def check_axie(self, axie_id):
 		"""
 		Check if we have this axie data locally
 		:param axie_id: String of the ID of the axie to check
-		:return: Data of the axie or None if not locally
+		:return: ID of the axie or [] if not locally
 		"""
-		with open(self.axie_list_path) as f:
-			data = yaml.safe_load(f)
-
-		for val in data:
-			if val == str(axie_id):
-				return val
+		if self.axie_store.has(axie_id):
+			return str(axie_id)
 		return []
 
-	def update_axie_list(self):
-		"""
-		Update the local axie_list with the new datas
-		"""
-		axie_list = self.axie_list()
-		new = {}
-
-		for axie in axie_list:
-			new[axie['id']] = self.get_axie_detail(axie['id'])
-		with open(self.axie_list_path, 'w') as outfile:
-			yaml.safe_dump(new, outfile)
+	def update_axie_list(self, incremental=False):
+		"""
+		Update the local axie store with the new datas
+		:param incremental: Only fetch the details of new or changed axies, see sync_axie_list
+		"""
+		if incremental:
+			return self.sync_axie_list()
+		axie_list = self.axie_list() or {}
+		new = self.get_axies_detail(list(axie_list))
+		self.axie_store.upsert_many([axie for axie in new.values() if axie])
+
+	def sync_axie_list(self, addresses=None):
+		"""
+		Sync the local axie store with the axies of the scholarship. The brief lists of the accounts are compared
+		to the store and only new or changed axies (breed count, stage or owner) get their details fetched.
+		Stored axies that are not in any account anymore are removed
+		:param addresses: List of ronin addresses, all the accounts of the scholarship by default
+		:return: Dict with the added, updated and removed axie IDs and the number of unchanged axies
+		"""
+		if addresses is None:
+			addresses = [self.config['scholars'][account]['ronin_address'] for account in self.config['scholars']]
+			addresses.append(self.config['personal']['ronin_address'])
+		addresses = [address.replace('ronin:', '0x').lower() for address in addresses]
+
+		stored = self.axie_store.briefs()
+		seen = set()
+		failed = list()
+		added = list()
+		updated = list()
+		for address, axies in zip(addresses, pyaxie_fanout.fan_out(self.get_axie_list, addresses, self.fan_out_parallelism)):
+			if isinstance(axies, Exception):
+				print("Error getting axies of " + address + " : " + str(axies))
+				failed.append(address)
+				continue
+			for axie in axies:
+				axie_id = str(axie['id'])
+				seen.add(axie_id)
+				if axie_id not in stored:
+					added.append(axie_id)
+				elif stored[axie_id] != (axie['breedCount'], axie['stage'], address):
+					updated.append(axie_id)
+
+		# Without the list of an account, its axies can't be told apart from the ones that left
+		removed = [axie_id for axie_id, (_, _, owner) in stored.items() if axie_id not in seen and owner not in failed and (owner in addresses or not failed)]
+		details = self.get_axies_detail(added + updated)
+		self.axie_store.upsert_many([axie for axie in details.values() if axie])
+		self.axie_store.delete(removed)
+		return {'added': added, 'updated': updated, 'removed': removed, 'unchanged': len(seen) - len(added) - len(updated)}
 
 	def axie_list(self):
 		"""
 		Get the list of axies stored locally
-		:return: List of axie data
-		"""
-		if os.stat(self.axie_list_path).st_size > 3:
-			f = open(self.axie_list_path, 'r')
-			data = yaml.safe_load(f)
-			f.close()
-			if data:
-				return data
+		:return: Dict {axie ID: axie data} or None if no axie is stored
+		"""
+		data = self.axie_store.all()
+		if data:
+			return data
 		return None
 
 	def axie_detail(self, axie_id):
@@ -525,10 +824,7 @@ class pyaxie(object):
 		:param axie_id: The ID of the axie
 		:return: Informations about the axie
 		"""
-		data = self.axie_list()
-		if data:
-			return data[str(axie_id)]
-		return None
+		return self.axie_store.get(axie_id)
 
 	def axie_infos(self, axie_id, key):
 		"""
@@ -537,8 +833,9 @@ class pyaxie(object):
 		:param key: 'parts' or 'class' or 'stats' (list on documentation)
 		:return: Information about the axie
 		"""
-		if self.check_axie(axie_id):
-			return self.axie_detail(axie_id)[key]
+		data = self.axie_detail(axie_id)
+		if data:
+			return data[key]
 		return "This axie is not registered : " + str(axie_id)
 
 	def axie_link(self, axie_id):
@@ -556,10 +853,9 @@ class pyaxie(object):
 
 	def get_ronin_web3(self):
 		"""
-		:return: Return the ronin web3
+		:return: Return the ronin web3, shared by all the accounts
 		"""
-		web3 = Web3(Web3.HTTPProvider('https://proxy.roninchain.com/free-gas-rpc'))
-		return web3
+		return get_shared_web3()
 
 	def get_slp_contract(self, ronin_web3, slp_abi_path):
 		"""
@@ -568,73 +864,71 @@ class pyaxie(object):
 		:return: The contract to interact with
 		"""
 		slp_contract_address = "0xa8754b9fa15fc18bb59458815510e40a12cd2014"
-		with open(slp_abi_path) as f:
-			try:
-				slp_abi = json.load(f)
-			except ValueError as e:
-				return e
-		contract = ronin_web3.eth.contract(address=w3.toChecksumAddress(slp_contract_address), abi=slp_abi)
+		try:
+			contract = get_shared_contract(ronin_web3, slp_contract_address, slp_abi_path)
+		except ValueError as e:
+			return e
 		self.slp_contract = contract
 		return contract
 
 	def get_axie_contract(self, ronin_web3):
-		slp_contract_address = "0x32950db2a7164ae833121501c797d79e7b79d74c"
-		with open(self.axie_abi_path) as f:
-			try:
-				slp_abi = json.load(f)
-			except ValueError as e:
-				return e
-		contract = ronin_web3.eth.contract(address=w3.toChecksumAddress(slp_contract_address), abi=slp_abi)
-		self.slp_contract = contract
+		axie_contract_address = "0x32950db2a7164ae833121501c797d79e7b79d74c"
+		try:
+			contract = get_shared_contract(ronin_web3, axie_contract_address, self.axie_abi_path)
+		except ValueError as e:
+			return e
+		self.axie_contract = contract
 		return contract
 
 
-	def get_claimed_slp(self, address=''):
+	def get_item_snapshot(self, address='', max_age=None):
 		"""
+		Get the SLP datas of an account (balance, total, unclaimed, last claim) from the game API.
+		The result is cached for a few seconds as all of them come from the same call
 		:param address: Ronin address to check
-		:return: The amount of claimed SLP
+		:param max_age: Maximum age in seconds of a cached snapshot, cache > item_snapshot_ttl of the config by default
+		:return: ItemSnapshot object
+		"""
+		if address == '':
+			address = self.ronin_address
+		snapshot = self.item_snapshots.get(address)
+		max_age = self.item_snapshots.ttl if max_age is None else max_age
+		if snapshot is not None and time.time() - snapshot.fetched_at <= max_age:
+			return snapshot
+
+		response = self.http.get(self.url_api + f"clients/{address}/items/1", headers=self.headers, data="")
+		snapshot = ItemSnapshot(response.json())
+		self.item_snapshots.set(address, snapshot)
+		return snapshot
+
+	def invalidate_item_snapshot(self, address=''):
+		"""
+		Forget the cached SLP datas of an account, to call after its balance changed
+		:param address: Ronin address
 		"""
 		if address == '':
 			address = self.ronin_address
+		self.item_snapshots.invalidate(address)
+
+	def get_claimed_slp(self, address=''):
+		"""
+		:param address: Ronin address to check
+		:return: The amount of claimed SLP
+		"""
 		try:
-			response = requests.get(self.url_api + f"clients/{address}/items/1", headers=self.headers, data="")
-			data = json.loads(response.text)
+			return self.get_item_snapshot(address).balance
 		except ValueError as e:
 			return e
 
-		balance = data['blockchain_related']['balance']
-		if balance is None:
-			return 0
-
-		return int(balance)
-
 	def get_unclaimed_slp(self, address=''):
 		"""
 		:param address: Ronin address to check
 		:return: The amount of unclaimed SLP
 		"""
-		if address == '':
-			address = self.ronin_address
 		try:
-			response = requests.get(self.url_api + f"clients/{address}/items/1", headers=self.headers, data="")
-			result = response.json()
+			return self.get_item_snapshot(address).unclaimed
 		except ValueError as e:
 			return e
-		if result is None:
-			return 0
-
-		balance = -1
-		if 'blockchain_related' in result:
-			balance = result['blockchain_related']['balance']
-		else:
-			return balance
-		if balance is None:
-			balance = 0
-
-		res = result["total"]
-		if res is None:
-			res = 0
-		return int(res - balance)
 
 	def get_last_claim(self, address=''):
 		"""
@@ -642,36 +936,24 @@ class pyaxie(object):
 		:param address: Ronin address
 		:return: Time in sec
 		"""
-		if address == '':
-			address = self.ronin_address
-
 		try:
-			response = requests.get(self.url_api + f"clients/{address}/items/1", headers=self.headers, data="")
-			result = response.json()
+			return self.get_item_snapshot(address).last_claimed_item_at
 		except ValueError as e:
 			return e
 
-		return int(result["last_claimed_item_at"])
-
-	def claim_slp(self):
+	def get_claim_signature(self):
 		"""
-		Claim SLP on the account.
-		:return: Transaction of the claim
+		Ask the game API for the claim signature, authenticating again once if the cached token is refused
+		:return: The blockchain_related signature (amount, timestamp, signature), an error message or None
 		"""
-		print("\nClaiming SLP for : ", self.name)
-
 		if datetime.datetime.utcnow() + timedelta(days=-14) < datetime.datetime.fromtimestamp(self.get_last_claim()):
 			return 'Error: Too soon to claim or already claimed'
 
-		slp_claim = {
-			'address': self.ronin_address,
-			'private_key': self.private_key,
-			'state': {"signature": None}
-		}
-		access_token = self.access_token
-		custom_headers = self.headers.copy()
-		custom_headers["authorization"] = f"Bearer {access_token}"
-		response = requests.post(self.url_api + f"clients/{self.ronin_address}/items/1/claim", headers=custom_headers, json="")
+		response = self.http.post(self.url_api + f"clients/{self.ronin_address}/items/1/claim", headers=self.get_auth_headers(), json="")
+		if response.status_code == 401:
+			# The cached token was refused, authenticate again once
+			self.get_access_token(force=True)
+			response = self.http.post(self.url_api + f"clients/{self.ronin_address}/items/1/claim", headers=self.get_auth_headers(), json="")
 
 		if response.status_code != 200:
 			print(response.text)
@@ -680,17 +962,33 @@ class pyaxie(object):
 		result = response.json()["blockchain_related"]["signature"]
 		if result is None:
 			return 'Error: Nothing to claim'
+		return result
+
+	def claim_slp(self):
+		"""
+		Claim SLP on the account.
+		:return: Transaction of the claim
+		"""
+		signed_txns, finish = self.prepare_claim()
+		return finish(self.send_transactions(signed_txns))
+
+	def prepare_claim(self):
+		"""
+		Sign the claim of the account, nothing is sent. Shared by claim_slp and its async version
+		:return: (list of signed transactions, function (results of send_transactions) returning the result of the claim)
+		"""
+		print("\nClaiming SLP for : ", self.name)
+
+		signature = self.get_claim_signature()
+		if not isinstance(signature, dict):
+			return list(), lambda results: signature
 
-		checksum_address = w3.toChecksumAddress(self.ronin_address)
-		nonce = self.ronin_web3.eth.get_transaction_count(checksum_address)
-		slp_claim['state']["signature"] = result["signature"].replace("0x", "")
-		claim_txn = self.slp_contract.functions.checkpoint(checksum_address, result["amount"], result["timestamp"],
-						slp_claim['state']["signature"]).buildTransaction({'gas': 1000000, 'gasPrice': 0, 'nonce': nonce})
-		signed_txn = self.ronin_web3.eth.account.sign_transaction(claim_txn, private_key=bytearray.fromhex(self.private_key.replace("0x", "")))
+		signed_txns = self.sign_transactions(signature, [])
 
-		self.ronin_web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-		txn = self.ronin_web3.toHex(self.ronin_web3.keccak(signed_txn.rawTransaction))
-		return txn if self.wait_confirmation(txn) else "Error : Transaction " + str(txn) + "reverted by EVM (Ethereum Virtual machine)"
+		def finish(results):
+			self.invalidate_item_snapshot()
+			return results[0]
+		return signed_txns, finish
 
 	def transfer_slp(self, to_address, amount):
 		"""
@@ -699,65 +997,216 @@ class pyaxie(object):
 		:param amount: Amount of SLP to send
 		:return: Transaction hash
 		"""
+		signed_txns, finish = self.prepare_transfer(to_address, amount)
+		return finish(self.send_transactions(signed_txns))
+
+	def prepare_transfer(self, to_address, amount):
+		"""
+		Sign a SLP transfer, nothing is sent. Shared by transfer_slp and its async version
+		:param to_address: Receiver of the SLP. Format : 0x
+		:param amount: Amount of SLP to send
+		:return: (list of signed transactions, function (results of send_transactions) returning the result of the transfer)
+		"""
 		if amount < 1 or not Web3.isAddress(to_address):
-			return {"error": "Make sure that the amount is not under 1 and the **to_address** is correct."}
+			return list(), lambda results: {"error": "Make sure that the amount is not under 1 and the **to_address** is correct."}
+
+		signed_txns = self.sign_transactions(None, [(to_address, amount)])
+
+		def finish(results):
+			self.invalidate_item_snapshot()
+			self.invalidate_item_snapshot(to_address)
+			return results[0]
+		return signed_txns, finish
 
+	def sign_transactions(self, signature, transfers):
+		"""
+		Sign the claim and the transfers of the account with following nonces, nothing is sent. The nonces are
+		synced again with the chain if signing fails, a reserved nonce never sent would block every later transaction
+		:param signature: blockchain_related signature from the claim API, None to only transfer
+		:param transfers: List of (to_address, amount)
+		:return: List of signed transactions, the claim first
+		"""
+		nonce = self.nonces.allocate(self.ronin_address, len(transfers) + (signature is not None))
+		try:
+			signed_txns = [self.sign_claim_transaction(signature, nonce)] if signature is not None else list()
+			for to_address, amount in transfers:
+				signed_txns.append(self.sign_transfer_transaction(to_address, amount, nonce + len(signed_txns)))
+			return signed_txns
+		except Exception:
+			self.nonces.resync(self.ronin_address)
+			raise
+
+	def send_transaction(self, signed_txn):
+		"""
+		Broadcast a signed transaction without waiting for it. The local nonces are synced again with the chain if it is refused
+		:param signed_txn: The signed transaction
+		:return: Hash of the transaction
+		"""
+		try:
+			self.ronin_web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+		except Exception:
+			self.nonces.resync(self.ronin_address)
+			raise
+		return self.ronin_web3.toHex(self.ronin_web3.keccak(signed_txn.rawTransaction))
+
+	def send_transactions(self, signed_txns):
+		"""
+		Broadcast signed transactions of the account back-to-back, then wait for all of them together
+		:param signed_txns: List of signed transactions with following nonces
+		:return: List with the hash or an error message for each transaction
+		"""
+		sent, error = self.broadcast_transactions(signed_txns)
+		futures = [self.confirmations.submit(txn) for txn in sent]
+		successes = list()
+		for future in futures:
+			try:
+				successes.append(future.result())
+			except pyaxie_confirm.ConfirmationTimeout as e:
+				print(str(e))
+				successes.append(None)
+		return self.transactions_results(signed_txns, sent, error, successes)
+
+	def broadcast_transactions(self, signed_txns):
+		"""
+		Broadcast signed transactions of the account back-to-back without waiting for them
+		:param signed_txns: List of signed transactions with following nonces
+		:return: (list of the hashes sent, error message of the first refused transaction or None)
+		"""
+		sent = list()
+		for signed_txn in signed_txns:
+			try:
+				sent.append(self.send_transaction(signed_txn))
+			except Exception as e:
+				# The next nonces can not be mined without this one
+				return sent, "Error : " + str(e)
+		return sent, None
+
+	def transactions_results(self, signed_txns, sent, error, successes):
+		"""
+		Results of broadcast transactions once confirmed. The nonces are synced again with the chain if one of
+		them was refused, reverted or not confirmed
+		:param signed_txns: List of signed transactions
+		:param sent: Hashes of the broadcast ones
+		:param error: Error of the first refused transaction or None
+		:param successes: Result of the confirmation of every sent transaction
+		:return: List with the hash or an error message for each transaction
+		"""
+		res = [self.confirmation_result(txn, success) for txn, success in zip(sent, successes)]
+		if error is not None or not all(successes):
+			self.nonces.resync(self.ronin_address)
+		return res + [error] * (len(signed_txns) - len(sent))
+
+	@staticmethod
+	def confirmation_result(txn, success):
+		"""
+		:param txn: Hash of the transaction
+		:param success: Result of wait_confirmation
+		:return: The hash if the transaction succeed, else an error message
+		"""
+		if success:
+			return txn
+		if success is None:
+			return "Error : Transaction " + str(txn) + " not confirmed before the deadline"
+		return "Error : Transaction " + str(txn) + " reverted by EVM (Ethereum Virtual machine)"
+
+	def sign_claim_transaction(self, signature, nonce):
+		"""
+		Build and sign the SLP claim transaction, nothing is sent
+		:param signature: blockchain_related signature from the claim API (amount, timestamp, signature)
+		:param nonce: Nonce of the transaction
+		:return: The signed transaction
+		"""
+		claim_txn = self.slp_contract.functions.checkpoint(w3.toChecksumAddress(self.ronin_address), signature["amount"], signature["timestamp"],
+						signature["signature"].replace("0x", "")).buildTransaction({'chainId': 2020, 'gas': 1000000, 'gasPrice': 0, 'nonce': nonce})
+		return self.ronin_web3.eth.account.sign_transaction(claim_txn, private_key=bytearray.fromhex(self.private_key.replace("0x", "")))
+
+	def sign_transfer_transaction(self, to_address, amount, nonce):
+		"""
+		Build and sign a SLP transfer transaction, nothing is sent
+		:param to_address: Receiver of the SLP. Format : 0x
+		:param amount: Amount of SLP to send
+		:param nonce: Nonce of the transaction
+		:return: The signed transaction
+		"""
 		transfer_txn = self.slp_contract.functions.transfer(w3.toChecksumAddress(to_address), amount).buildTransaction({
 			'chainId': 2020,
 			'gas': 100000,
 			'gasPrice': Web3.toWei('0', 'gwei'),
-			'nonce': self.ronin_web3.eth.get_transaction_count(w3.toChecksumAddress(self.ronin_address))
+			'nonce': nonce
 		})
-		private_key = bytearray.fromhex(self.private_key.replace("0x", ""))
-		signed_txn = self.ronin_web3.eth.account.sign_transaction(transfer_txn, private_key=private_key)
-
-		self.ronin_web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-		txn = self.ronin_web3.toHex(self.ronin_web3.keccak(signed_txn.rawTransaction))
-		return txn if self.wait_confirmation(txn) else "Error : Transaction " + str(txn) + " reverted by EVM (Ethereum Virtual machine)"
+		return self.ronin_web3.eth.account.sign_transaction(transfer_txn, private_key=bytearray.fromhex(self.private_key.replace("0x", "")))
 
 	def wait_confirmation(self, txn):
 		"""
-		Wait for a transaction to finish
+		Wait for a transaction to finish, it is polled by the shared confirmation tracker with the other pending ones
 		:param txn: the transaction to wait
-		:return: True or False depending if transaction succeed
+		:return: True or False depending if transaction succeed, None if not confirmed before the deadline
 		"""
-		while True:
-			try:
-				recepit = self.ronin_web3.eth.get_transaction_receipt(txn)
-				success = True if recepit["status"] == 1 else False
-				break
-			except exceptions.TransactionNotFound:
-				time.sleep(5)
+		success = self.confirmations.wait(txn)
+		if success is None:
+			# It may have been dropped, its nonce can be free again
+			self.nonces.resync(self.ronin_address)
 		return success
 
+	def get_payout_transfers(self, slp_balance):
+		"""
+		Split the SLP of the account between the manager and the scholar
+		:param slp_balance: Amount of SLP to send
+		:return: List of (to_address, amount), the manager first
+		"""
+		scholar_payout_amount = math.ceil(slp_balance * self.payout_percentage)
+		academy_payout_amount = slp_balance - scholar_payout_amount
+		manager_address = self.config['personal']['ronin_address'].replace('ronin:', '0x')
+
+		if self.payout_percentage == 0:
+			print("Sending all {} SLP to you : {} ".format(slp_balance, manager_address))
+			return [(manager_address, slp_balance)]
+		# TODO(igaskin) change second field to guild name variable
+		print("Sending {} SLP to {} : {} ".format(academy_payout_amount, "Axie Amigos", manager_address))
+		print("Sending {} SLP to {} : {} ".format(scholar_payout_amount, self.name, self.personal_ronin))
+		return [(manager_address, academy_payout_amount), (self.personal_ronin, scholar_payout_amount)]
+
 	def payout(self):
 		"""
-		Send money to the scholar and to the manager/academy or directly to manager if manager called
+		Send money to the scholar and to the manager/academy or directly to manager if manager called.
+		The claim and the transfers are sent back-to-back with local nonces and confirmed together
 		:return: List of 2 transactions hash : scholar and manager
 		"""
-		self.claim_slp()
+		signed_txns, finish = self.prepare_payout()
+		return finish(self.send_transactions(signed_txns))
 
-		txns = list()
-		slp_balance = self.get_claimed_slp()
-		scholar_payout_amount = math.ceil(slp_balance * self.payout_percentage)
-		academy_payout_amount = slp_balance - scholar_payout_amount
+	def prepare_payout(self):
+		"""
+		Sign the claim and the transfers of a payout, nothing is sent. Shared by payout and its async version
+		:return: (list of signed transactions, function (results of send_transactions) returning the result of the payout)
+		"""
+		print("\nClaiming SLP for : ", self.name)
+		signature = self.get_claim_signature()
+		claiming = isinstance(signature, dict)
+
+		# After the claim the account holds everything it earned
+		self.invalidate_item_snapshot()
+		snapshot = self.get_item_snapshot()
+		slp_balance = snapshot.total if claiming else snapshot.balance
 
 		if slp_balance < 1:
-			return ["Error: Nothing to send.", "Error: Nothing to send."]
+			return list(), lambda results: ["Error: Nothing to send.", "Error: Nothing to send."]
 
-		if self.payout_percentage == 0:
-			print("Sending all {} SLP to you : {} ".format(academy_payout_amount, self.config['personal']['ronin_address']))
-			txns.append(str(self.transfer_slp(self.config['personal']['ronin_address'], academy_payout_amount + scholar_payout_amount)))
-			txns.append("Nothing to send to scholar")
-			return txns
-		else:
-			# TODO(igaskin) change second field to guild name variable
-			print("Sending {} SLP to {} : {} ".format(academy_payout_amount, "Axie Amigos", self.config['personal']['ronin_address'].replace('ronin:', '0x')))
-			txns.append(str(self.transfer_slp(self.config['personal']['ronin_address'].replace('ronin:', '0x'), academy_payout_amount)))
+		transfers = self.get_payout_transfers(slp_balance)
+		valid = [amount >= 1 and Web3.isAddress(to) for to, amount in transfers]
+		signed_txns = self.sign_transactions(signature if claiming else None, [t for t, ok in zip(transfers, valid) if ok])
 
-			print("Sending {} SLP to {} : {} ".format(scholar_payout_amount, self.name, self.personal_ronin))
-			txns.append(str(self.transfer_slp(self.personal_ronin, scholar_payout_amount)))
-		return txns
+		def finish(results):
+			sent = iter(results[claiming:])
+			error = {"error": "Make sure that the amount is not under 1 and the **to_address** is correct."}
+			txns = [next(sent) if ok else error for ok in valid]
+			self.invalidate_item_snapshot()
+			for to, _ in transfers:
+				self.invalidate_item_snapshot(to)
+			if len(txns) == 1:
+				txns.append("Nothing to send to scholar")
+			return [str(txn) for txn in txns]
+		return signed_txns, finish
 
 
 	def get_breed_cost(self, nb=-1):
@@ -787,59 +1236,111 @@ class pyaxie(object):
 		:param timestamp: date in unix timestamp format
 		:return: Dict with the prices of currencies at given date
 		"""
-		cg = CoinGeckoAPI()
-		dt = datetime.datetime.fromtimestamp(timestamp)
+		return self.get_price_store().get_prices(timestamp)
 
-		price_history = cg.get_coin_history_by_id(id='smooth-love-potion', date=dt.date().strftime('%d-%m-%Y'), vsCurrencies=['usd'])
-		slp_price = price_history['market_data']['current_price']['usd']
-
-		price_history = cg.get_coin_history_by_id(id='axie-infinity', date=dt.date().strftime('%d-%m-%Y'), vsCurrencies=['usd'])
-		axs_price = price_history['market_data']['current_price']['usd']
-
-		price_history = cg.get_coin_history_by_id(id='ethereum', date=dt.date().strftime('%d-%m-%Y'), vsCurrencies=['usd'])
-		eth_price = price_history['market_data']['current_price']['usd']
+	def get_price_store(self):
+		"""
+		:return: The local store of daily prices
+		"""
+		return pyaxie_prices.get_price_store(self.config['paths'].get('price_history_path', 'datas/prices.sqlite'))
 
-		return {'slp': slp_price, 'axs': axs_price, 'eth': eth_price, 'date': timestamp}
+	def get_ronin_txs_page(self, ronin_address, start, size):
+		"""
+		Get a page of the transactions of an account from the explorer
+		:param ronin_address: The ronin address
+		:param start: Position of the first transaction, newest first
+		:param size: Number of transactions
+		:return: List of transactions
+		"""
+		url = "https://explorer.roninchain.com/api/txs/" + str(ronin_address).replace('ronin:', '0x')
+		h = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/41.0.2228.0 Safari/537.36'}
+		response = self.http.get(url, headers=h, params={'from': start, 'size': size})
+		return json.loads(response.text)['results']
 
 	def ronin_txs(self, ronin_address=''):
+		"""
+		Get the transactions of an account from the local index, only the new ones are downloaded
+		:param ronin_address: The ronin address, the manager one by default
+		:return: List of transactions, newest first
+		"""
 		if ronin_address == '':
 			ronin_address = self.config['personal']['ronin_address']
+		try:
+			self.tx_index.sync(ronin_address)
+		except ValueError as e:
+			return e
+		return self.tx_index.txs(ronin_address)
 
-		url = "https://explorer.roninchain.com/api/txs/" + str(ronin_address) + "?size=10000"
-		h = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/41.0.2228.0 Safari/537.36'}
-		response = requests.get(url, headers=h)
+	def get_breed_analytics(self):
+		"""
+		:return: BreedAnalytics object on the transaction index and the price store
+		"""
+		return pyaxie_breeding.BreedAnalytics(self.tx_index, self.get_price_store())
 
+	def get_breeding_report(self, axie_ids=None):
+		"""
+		Breeding P&L of the manager account : guild totals, cost of every axie bred and costs per parent
+		:param axie_ids: IDs of the parents, all the axies of the manager in the local store by default
+		:return: Dict with 'guild', 'axies' and 'parents'
+		"""
+		address = self.config['personal']['ronin_address']
 		try:
-			json_data = json.loads(response.text)
+			self.tx_index.sync(address)
 		except ValueError as e:
 			return e
-		return json_data['results']
+		if axie_ids is None:
+			axie_ids = [axie['id'] for axie in self.axie_store.by_owner(address)]
+		details = self.get_axies_detail(axie_ids)
+		parent_children = {axie_id: [int(child['id']) for child in data['children']] for axie_id, data in details.items() if data}
+		return self.get_breed_analytics().report(address, parent_children)
 
 	def get_axie_total_breed_cost(self, axie_id, txs={}):
 		if not isinstance(axie_id, int):
 			return "Error in axie ID."
-		if txs == {}:
-			txs = self.ronin_txs()
 
 		children = self.get_axie_children(axie_id)
+		if txs == {}:
+			return self.get_axie_breed_cost_from_index(children)
 		total = 0
 		l = list()
-		for i in txs:
-			if len(i['logs']) == 4 and len(i['logs'][3]['topics']) > 1 and int(i['logs'][3]['topics'][1], 16) in children:
-				prices = self.get_prices_from_timestamp(i['timestamp'])
-				slp_price = int(i['logs'][1]['data'], 16) * prices['slp']
-				axs_price = prices['axs'] * 2
-				l.append({'date': datetime.datetime.fromtimestamp(i['timestamp']).strftime('%d-%m-%Y'),
-							'axs_price': round(prices['axs'], 2), 'slp_price': round(prices['slp'], 2),
-							'breed_cost': round(slp_price + axs_price, 2), 'axs_cost': round(axs_price, 2),
-							'slp_cost': round(slp_price, 2), 'axie_id': int(i['logs'][3]['topics'][1], 16)})
-				total += slp_price + axs_price
+		breeds = [i for i in txs if len(i['logs']) == 4 and len(i['logs'][3]['topics']) > 1 and int(i['logs'][3]['topics'][1], 16) in children]
+		# Download the prices of all the breeding days at once
+		self.get_price_store().prefetch([i['timestamp'] for i in breeds])
+		for i in breeds:
+			prices = self.get_prices_from_timestamp(i['timestamp'])
+			slp_price = int(i['logs'][1]['data'], 16) * prices['slp']
+			axs_price = prices['axs'] * 2
+			l.append({'date': datetime.datetime.fromtimestamp(i['timestamp']).strftime('%d-%m-%Y'),
+						'axs_price': round(prices['axs'], 2), 'slp_price': round(prices['slp'], 2),
+						'breed_cost': round(slp_price + axs_price, 2), 'axs_cost': round(axs_price, 2),
+						'slp_cost': round(slp_price, 2), 'axie_id': int(i['logs'][3]['topics'][1], 16)})
+			total += slp_price + axs_price
 		res = dict()
 		res['total_breed_cost'] = round(total, 2)
 		res['average_breed_cost'] = round(total / len(children), 2)
 		res['details'] = l
 		return res
 
+	def get_axie_breed_cost_from_index(self, children):
+		"""
+		Same result as get_axie_total_breed_cost, computed on the indexed breeds of the manager account
+		:param children: IDs of the children of the axie
+		:return: Dict with total_breed_cost, average_breed_cost and details
+		"""
+		address = self.config['personal']['ronin_address']
+		try:
+			self.tx_index.sync(address)
+		except ValueError as e:
+			return e
+		analytics = self.get_breed_analytics()
+		total, l, missing = analytics.children_breeds(analytics.breeds(address), children)
+		res = dict()
+		res['total_breed_cost'] = round(total, 2)
+		res['average_breed_cost'] = round(total / len(children), 2) if children else 0
+		res['details'] = l
+		res['missing_price_days'] = missing
+		return res
+
 	def get_account_balances(self, ronin_address=''):
 		"""
 		Get the different balances for a given account (AXS, SLP, WETH, AXIES)
@@ -848,26 +1349,33 @@ class pyaxie(object):
 		"""
 		if not ronin_address:
 			ronin_address = self.config['personal']['ronin_address']
+		return self.get_accounts_balances([ronin_address])[0]
 
-		url = "https://explorer.roninchain.com/api/tokenbalances/" + str(ronin_address).replace('ronin:', '0x')
-		headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/41.0.2228.0 Safari/537.36'}
-		response = requests.get(url, headers=headers)
-
+	def get_accounts_balances(self, addresses):
+		"""
+		Get the balances of many accounts with the balanceOf of the token contracts, all read in one RPC batch
+		:param addresses: List of ronin addresses
+		:return: List of dict with currencies and amount, in the same order as addresses
+		"""
+		error = {'WETH': -1, 'AXS': -1, 'SLP': -1, 'axies': -1}
+		tokens = {name: token[0] for name, token in RONIN_TOKENS.items()}
 		try:
-			json_data = json.loads(response.text)
-		except ValueError as e:
-			return {'WETH': -1, 'AXS': -1, 'SLP': -1, 'axies': -1, 'ronin_address': ronin_address}
-
-		res = {'WETH': 0, 'AXS': 0, 'SLP': 0, 'axies': 0, 'ronin_address': ronin_address}
-		for data in json_data['results']:
-			if data['token_symbol'] == 'WETH':
-				res['WETH'] = round(int(data['balance']) / math.pow(10, 18), 6)
-			elif data['token_symbol'] == 'AXS':
-				res['AXS'] = round(int(data['balance']) / math.pow(10, 18), 2)
-			elif data['token_symbol'] == 'SLP':
-				res['SLP'] = int(data['balance'])
-			elif data['token_symbol'] == 'AXIE':
-				res['axies'] = int(data['balance'])
+			balances = self.rpc.get_balances(tokens, [a.replace('ronin:', '0x') for a in addresses])
+		except Exception as e:
+			print("Error getting balances : " + str(e))
+			return [dict(error, ronin_address=address) for address in addresses]
+
+		res = list()
+		for address in addresses:
+			data = balances[address.replace('ronin:', '0x')]
+			if any(isinstance(balance, Exception) for balance in data.values()):
+				print("Error getting balances of " + address)
+				res.append(dict(error, ronin_address=address))
+				continue
+			account = {'ronin_address': address}
+			for name, (_, decimals, rounding) in RONIN_TOKENS.items():
+				account[name] = round(data[name] / math.pow(10, decimals), rounding) if decimals else data[name]
+			res.append(account)
 		return res
 
 	def get_all_accounts_balances(self):
@@ -875,11 +1383,7 @@ class pyaxie(object):
 		l.append(self.config['personal']['ronin_address'])
 		for account in self.config['scholars']:
 			l.append(self.config['scholars'][account]['ronin_address'])
-
-		res = list()
-		for r in l:
-			res.append(self.get_account_balances(r))
-		return res
+		return self.get_accounts_balances(l)
 
 
 
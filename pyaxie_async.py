@@ -0,0 +1,278 @@
+import asyncio
+import datetime
+import functools
+import threading
+import time
+import pyaxie_confirm
+import pyaxie_prices
+import pyaxie_transport
+
+from concurrent.futures import ThreadPoolExecutor
+from pyaxie import ItemSnapshot
+
+executor = None
+executor_lock = threading.Lock()
+
+
+def get_executor(config=None):
+	"""
+	Get the bounded thread pool running the sync-only calls
+	:param config: The loaded config, 'async' > 'executor_workers' gives the number of threads
+	:return: ThreadPoolExecutor object
+	"""
+	global executor
+	with executor_lock:
+		if executor is None:
+			workers = ((config or {}).get('async') or {}).get('executor_workers', 8)
+			executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pyaxie')
+		return executor
+
+
+async def run_blocking(fn, *args, **kwargs):
+	"""
+	Run a blocking function in the bounded executor without blocking the event loop
+	:param fn: The function to run
+	:return: Result of the function
+	"""
+	loop = asyncio.get_event_loop()
+	return await loop.run_in_executor(get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+class AsyncPyaxie(object):
+
+	def __init__(self, account, transport=None):
+		"""
+		Async version of the pyaxie methods used by the bot, for the discord event loop
+		:param account: pyaxie object of the account
+		:param transport: AsyncTransport object, the shared one by default
+		"""
+		self.account = account
+		self.transport = transport or pyaxie_transport.get_async_transport(account.config)
+		get_executor(account.config)
+
+	def __getattr__(self, name):
+		# Attributes of the account (name, ronin_address, payout_percentage...) are read from the pyaxie object
+		return getattr(self.account, name)
+
+	async def graphql(self, body, headers=None):
+		r = await self.transport.post(self.account.url, headers=headers or self.account.headers, json=body, idempotent=True)
+		return r.json()
+
+	###################
+	# Read functions  #
+	###################
+
+	async def get_item_snapshot(self, address='', max_age=None):
+		"""
+		Same as pyaxie.get_item_snapshot, sharing the same cache
+		:param address: Ronin address to check
+		:param max_age: Maximum age in seconds of a cached snapshot
+		:return: ItemSnapshot object
+		"""
+		if address == '':
+			address = self.account.ronin_address
+		snapshot = self.account.item_snapshots.get(address)
+		max_age = self.account.item_snapshots.ttl if max_age is None else max_age
+		if snapshot is not None and time.time() - snapshot.fetched_at <= max_age:
+			return snapshot
+		r = await self.transport.get(self.account.url_api + f"clients/{address}/items/1", headers=self.account.headers)
+		snapshot = ItemSnapshot(r.json())
+		self.account.item_snapshots.set(address, snapshot)
+		return snapshot
+
+	async def get_claimed_slp(self, address=''):
+		return (await self.get_item_snapshot(address)).balance
+
+	async def get_unclaimed_slp(self, address=''):
+		return (await self.get_item_snapshot(address)).unclaimed
+
+	async def get_last_claim(self, address=''):
+		return (await self.get_item_snapshot(address)).last_claimed_item_at
+
+	async def get_daily_slp(self, snapshot=None):
+		snapshot = snapshot or await self.get_item_snapshot()
+		days = (datetime.datetime.fromtimestamp(snapshot.last_claimed_item_at) - datetime.datetime.utcnow()).days * -1
+		if days <= 0:
+			return snapshot.unclaimed
+		return int(snapshot.unclaimed / days)
+
+	async def get_rank_mmr(self, ronin_address=''):
+		if ronin_address == '':
+			ronin_address = self.account.ronin_address
+		params = {"client_id": ronin_address, "offset": 0, "limit": 0}
+		try:
+			r = await self.transport.get(self.account.url_api + "last-season-leaderboard", params=params)
+			json_data = r.json()
+		except ValueError as e:
+			return e
+		if json_data['success']:
+			return {'mmr': int(json_data['items'][1]['elo']), 'rank': int(json_data['items'][1]['rank'])}
+		return {'mmr': 0, 'rank': 0}
+
+	async def get_price(self, currency):
+		if currency.lower() in pyaxie_prices.CURRENCIES:
+			try:
+				return (await self.account.price_oracle.get_rates_async(self.transport))[currency.lower()]
+			except ValueError as e:
+				return e
+		try:
+			json_data = await self.graphql(self.account.get_price_body(currency))
+		except ValueError as e:
+			return e
+		return json_data['data']['exchangeRate'][currency.lower()]['usd']
+
+	async def get_axie_page(self, ronin_address='', start=0, size=None):
+		json_data = await self.graphql(self.account.get_axie_list_body(ronin_address, start, size or self.account.axie_page_size))
+		return json_data['data']['axies']
+
+	async def iter_axie_pages(self, addresses=None):
+		"""
+		Get the pages of the axies of many accounts as they arrive. The first page of every account is requested
+		at once, then the other pages of an account as soon as its total is known. An account failing is only
+		logged when many accounts are asked, the error is raised if there is only one
+		:param addresses: List of ronin addresses, all the accounts of the scholarship by default
+		:return: Async generator of (ronin address, index of the first axie, list of axies)
+		"""
+		if addresses is None:
+			config = self.account.config
+			addresses = [config['scholars'][account]['ronin_address'] for account in config['scholars']]
+			addresses.append(config['personal']['ronin_address'])
+		size = self.account.axie_page_size
+		semaphore = asyncio.Semaphore(self.account.fan_out_parallelism)
+		queue = asyncio.Queue()
+
+		async def page(address, start):
+			async with semaphore:
+				res = await self.get_axie_page(address, start, size)
+			await queue.put((address, start, res['results']))
+			return res
+
+		async def account(address):
+			first = await page(address, 0)
+			await asyncio.gather(*[page(address, start) for start in range(size, first['total'] or 0, size)])
+
+		async def run():
+			results = await asyncio.gather(*[account(address) for address in addresses], return_exceptions=True)
+			for address, res in zip(addresses, results):
+				if isinstance(res, Exception):
+					if len(addresses) == 1:
+						await queue.put(res)
+					print("Error getting axies of " + address + " : " + str(res))
+			await queue.put(None)
+
+		task = asyncio.ensure_future(run())
+		try:
+			while True:
+				item = await queue.get()
+				if item is None:
+					break
+				if isinstance(item, Exception):
+					raise item
+				yield item
+		finally:
+			task.cancel()
+
+	async def iter_all_axie_list(self, addresses=None):
+		"""
+		Get the axies of many accounts as the pages arrive, in arrival order
+		:param addresses: List of ronin addresses, all the accounts of the scholarship by default
+		:return: Async generator of axie datas
+		"""
+		async for address, start, axies in self.iter_axie_pages(addresses):
+			for axie in axies:
+				yield axie
+
+	async def iter_axie_list(self, ronin_address=''):
+		"""
+		Get the axies of an account as the pages arrive
+		:param ronin_address: The ronin address of the target account
+		:return: Async generator of axie datas
+		"""
+		async for axie in self.iter_all_axie_list([ronin_address or self.account.ronin_address]):
+			yield axie
+
+	async def get_axie_list(self, ronin_address=''):
+		"""
+		Same as pyaxie.get_axie_list, the pages are put back in order
+		:param ronin_address: The ronin address of the target account
+		:return: Data about the axies
+		"""
+		try:
+			pages = sorted([page async for page in self.iter_axie_pages([ronin_address or self.account.ronin_address])], key=lambda page: page[1])
+		except ValueError as e:
+			return e
+		return [axie for address, start, axies in pages for axie in axies]
+
+	async def get_number_of_axies(self):
+		try:
+			return (await self.get_axie_page(size=1))['total']
+		except ValueError as e:
+			return e
+
+	###################
+	# Write functions #
+	###################
+
+	async def get_claim_signature(self):
+		"""
+		Same as pyaxie.get_claim_signature without blocking the loop
+		:return: The blockchain_related signature (amount, timestamp, signature), an error message or None
+		"""
+		return await run_blocking(self.account.get_claim_signature)
+
+	async def wait_confirmations(self, txns):
+		"""
+		Wait for transactions to finish, the loop keeps serving other commands meanwhile and the
+		transactions are polled by the shared confirmation tracker with the other pending ones
+		:param txns: Hashes of the transactions
+		:return: List of True or False depending if transaction succeed, None if not confirmed before the deadline
+		"""
+		async def wait(txn):
+			try:
+				return await asyncio.wrap_future(self.account.confirmations.submit(txn))
+			except pyaxie_confirm.ConfirmationTimeout as e:
+				print(str(e))
+				return None
+		return list(await asyncio.gather(*[wait(txn) for txn in txns]))
+
+	async def send_transactions(self, signed_txns):
+		"""
+		Same as pyaxie.send_transactions, only the wait for the confirmations is done in the loop
+		:param signed_txns: List of signed transactions with following nonces
+		:return: List with the hash or an error message for each transaction
+		"""
+		sent, error = await run_blocking(self.account.broadcast_transactions, signed_txns)
+		return self.account.transactions_results(signed_txns, sent, error, await self.wait_confirmations(sent))
+
+	async def write(self, prepare, *args):
+		"""
+		Run a write method of pyaxie : prepare (claim signature and signing) runs in the executor, the
+		transactions are then sent and confirmed without holding a thread
+		:param prepare: pyaxie.prepare_claim, prepare_transfer or prepare_payout
+		:return: Result of the write method
+		"""
+		signed_txns, finish = await run_blocking(prepare, *args)
+		return finish(await self.send_transactions(signed_txns))
+
+	async def claim_slp(self):
+		"""
+		Same as pyaxie.claim_slp without blocking the loop
+		:return: Transaction of the claim
+		"""
+		return await self.write(self.account.prepare_claim)
+
+	async def transfer_slp(self, to_address, amount):
+		"""
+		Same as pyaxie.transfer_slp without blocking the loop
+		:param to_address: Receiver of the SLP. Format : 0x
+		:param amount: Amount of SLP to send
+		:return: Transaction hash
+		"""
+		return await self.write(self.account.prepare_transfer, to_address, amount)
+
+	async def payout(self):
+		"""
+		Same as pyaxie.payout without blocking the loop
+		:return: List of 2 transactions hash : scholar and manager
+		"""
+		return await self.write(self.account.prepare_payout)
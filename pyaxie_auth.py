@@ -0,0 +1,195 @@
+import base64
+import json
+import os
+import threading
+import time
+import yaml
+
+# Axie access tokens are valid for a week, refresh them a day before they expire
+DEFAULT_TOKEN_TTL = 7 * 24 * 3600
+DEFAULT_REFRESH_MARGIN = 24 * 3600
+DEFAULT_REFRESH_INTERVAL = 3600
+
+
+def token_expiry(token, default_ttl=DEFAULT_TOKEN_TTL):
+	"""
+	Read the expiration date of an access token
+	:param token: The access token (JWT)
+	:param default_ttl: Lifetime to assume if the token has no readable 'exp' claim
+	:return: Expiration time in unix timestamp
+	"""
+	try:
+		payload = token.split('.')[1]
+		payload += '=' * (-len(payload) % 4)
+		claims = json.loads(base64.urlsafe_b64decode(payload))
+		return int(claims['exp'])
+	except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+		return int(time.time()) + default_ttl
+
+
+def check_token(address, token):
+	"""
+	:param address: Ronin address of the account
+	:param token: Result of an authentication
+	:return: The token if it is one, authentication errors are returned as values by pyaxie and are raised here
+	"""
+	if isinstance(token, str) and token:
+		return token
+	if isinstance(token, ValueError):
+		raise token
+	raise ValueError("Authentication failed for " + address + " : " + str(token))
+
+
+class TokenStore(object):
+
+	def __init__(self, path, refresh_margin=DEFAULT_REFRESH_MARGIN, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+		"""
+		Access tokens of every account, keyed by ronin address and persisted on disk
+		:param path: Path of the yaml file holding the tokens
+		:param refresh_margin: Seconds before expiry at which a token is refreshed
+		:param refresh_interval: Seconds between two checks of the background refresher
+		"""
+		self.path = path
+		self.refresh_margin = refresh_margin
+		self.refresh_interval = refresh_interval
+		self.tokens = dict()
+		self.authenticators = dict()
+		self.address_locks = dict()
+		self.lock = threading.RLock()
+		self.refresher = None
+		self.load()
+
+	def load(self):
+		"""
+		Load the tokens saved on disk, expired ones are dropped
+		"""
+		if not os.path.exists(self.path):
+			return
+		with open(self.path, 'r') as f:
+			try:
+				data = yaml.safe_load(f)
+			except yaml.YAMLError:
+				data = None
+		now = time.time()
+		with self.lock:
+			for address, entry in (data or {}).items():
+				if entry and entry.get('expires_at', 0) > now:
+					self.tokens[address] = entry
+
+	def save(self):
+		"""
+		Write the tokens on disk. The file is only readable by the owner as tokens give write access to the accounts
+		"""
+		directory = os.path.dirname(self.path)
+		if directory and not os.path.exists(directory):
+			os.makedirs(directory)
+		tmp = self.path + '.tmp'
+		with self.lock:
+			fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+			with os.fdopen(fd, 'w') as f:
+				yaml.safe_dump(self.tokens, f)
+			os.replace(tmp, self.path)
+
+	def get(self, address):
+		"""
+		:param address: Ronin address of the account
+		:return: The cached access token or None if missing or expired
+		"""
+		with self.lock:
+			entry = self.tokens.get(address)
+			if entry is None or entry['expires_at'] <= time.time():
+				return None
+			return entry['token']
+
+	def put(self, address, token, expires_at=None):
+		"""
+		Store a new token for an account
+		:param address: Ronin address of the account
+		:param token: The access token
+		:param expires_at: Expiration in unix timestamp, read from the token if not given
+		"""
+		if expires_at is None:
+			expires_at = token_expiry(token)
+		with self.lock:
+			self.tokens[address] = {'token': token, 'expires_at': int(expires_at)}
+			self.save()
+
+	def invalidate(self, address):
+		"""
+		Forget the token of an account (ex: when the API refused it)
+		:param address: Ronin address of the account
+		"""
+		with self.lock:
+			if self.tokens.pop(address, None) is not None:
+				self.save()
+
+	def get_or_create(self, address, authenticate):
+		"""
+		Return the cached token or authenticate once to get a new one
+		:param address: Ronin address of the account
+		:param authenticate: Function returning a fresh access token
+		:return: The access token, a ValueError is raised if authentication failed
+		"""
+		with self.lock:
+			address_lock = self.address_locks.setdefault(address, threading.Lock())
+		# Only one authentication per account at a time, other accounts are not blocked
+		with address_lock:
+			token = self.get(address)
+			if token:
+				return token
+			token = check_token(address, authenticate())
+			self.put(address, token)
+			return token
+
+	def register(self, address, authenticate):
+		"""
+		Register how to authenticate an account so its token is refreshed in background before expiring
+		:param address: Ronin address of the account
+		:param authenticate: Function returning a fresh access token
+		"""
+		with self.lock:
+			self.authenticators[address] = authenticate
+			if self.refresher is None:
+				self.refresher = threading.Thread(target=self.refresh_loop, name='token-refresher', daemon=True)
+				self.refresher.start()
+
+	def refresh_expiring(self):
+		"""
+		Refresh the tokens expiring in less than refresh_margin. Accounts without token are left alone,
+		they will authenticate when a call needs it
+		:return: List of refreshed addresses
+		"""
+		limit = time.time() + self.refresh_margin
+		with self.lock:
+			expiring = [a for a, e in self.tokens.items() if e['expires_at'] <= limit and a in self.authenticators]
+		refreshed = list()
+		for address in expiring:
+			try:
+				token = check_token(address, self.authenticators[address]())
+			except Exception as e:
+				print("Error refreshing access token for " + address + " : " + str(e))
+				continue
+			self.put(address, token)
+			refreshed.append(address)
+		return refreshed
+
+	def refresh_loop(self):
+		while True:
+			time.sleep(self.refresh_interval)
+			self.refresh_expiring()
+
+
+token_stores = dict()
+token_stores_lock = threading.Lock()
+
+
+def get_token_store(path):
+	"""
+	Get the token store shared by all the accounts using this file
+	:param path: Path of the yaml file holding the tokens
+	:return: TokenStore object
+	"""
+	with token_stores_lock:
+		if path not in token_stores:
+			token_stores[path] = TokenStore(path)
+		return token_stores[path]
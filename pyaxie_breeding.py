@@ -0,0 +1,162 @@
+import datetime
+import numpy as np
+
+from pyaxie_prices import DAY
+
+# Breeding transactions have 4 logs : the SLP amount is the data of the second one, the child ID the topic1 of the fourth one
+BREED_LOGS_SQL = """
+	SELECT t.timestamp, child.topic1, slp.data FROM txs t
+	JOIN logs child ON child.hash = t.hash AND child.idx = 3
+	JOIN logs slp ON slp.hash = t.hash AND slp.idx = 1
+	WHERE t.address = ? AND child.topic1 IS NOT NULL
+	AND NOT EXISTS (SELECT 1 FROM logs extra WHERE extra.hash = t.hash AND extra.idx = 4)
+"""
+
+
+def hex_column(values):
+	"""
+	Parse a column of hex strings at once, only the 64 lowest bits are kept (axie IDs, SLP amounts)
+	:param values: List of hex strings
+	:return: int64 NumPy array
+	"""
+	if not values:
+		return np.zeros(0, dtype=np.int64)
+	digits = "".join((v or '0x0').replace('0x', '')[-16:].rjust(16, '0') for v in values)
+	return np.frombuffer(bytes.fromhex(digits), dtype='>u8').astype(np.int64)
+
+
+class BreedAnalytics(object):
+
+	def __init__(self, tx_index, price_store):
+		"""
+		Breeding costs computed on columns of the indexed breeding transactions joined with the daily prices
+		:param tx_index: TxIndex object
+		:param price_store: HistoricalPriceStore object
+		"""
+		self.tx_index = tx_index
+		self.price_store = price_store
+
+	def breeds(self, address):
+		"""
+		Load the breeding transactions of an address with their cost
+		:param address: Ronin address which paid the breeds
+		:return: Dict of NumPy arrays of the same length : child, timestamp, slp, slp_usd, axs_usd, slp_cost, axs_cost, cost
+		"""
+		rows = self.tx_index.query(BREED_LOGS_SQL, (self.tx_index.normalize(address),))
+		timestamps = np.array([row[0] for row in rows], dtype=np.int64)
+		res = {'child': hex_column([row[1] for row in rows]), 'timestamp': timestamps, 'slp': hex_column([row[2] for row in rows])}
+
+		# One price lookup per breeding day instead of one per breed
+		days, inverse = np.unique(timestamps // DAY, return_inverse=True)
+		day_names = [datetime.datetime.utcfromtimestamp(int(d) * DAY).strftime('%Y-%m-%d') for d in days]
+		self.price_store.prefetch([int(d) * DAY for d in days])
+		known = self.price_store.stored(day_names)
+		slp_usd = np.array([known.get(('slp', d), np.nan) for d in day_names], dtype=np.float64)
+		axs_usd = np.array([known.get(('axs', d), np.nan) for d in day_names], dtype=np.float64)
+
+		res['slp_usd'] = slp_usd[inverse]
+		res['axs_usd'] = axs_usd[inverse]
+		res['slp_cost'] = res['slp'] * res['slp_usd']
+		res['axs_cost'] = res['axs_usd'] * 2
+		res['cost'] = res['slp_cost'] + res['axs_cost']
+		return res
+
+	@staticmethod
+	def children_breeds(breeds, children):
+		"""
+		Details of the breeds of some children, in the format of get_axie_total_breed_cost
+		:param breeds: Result of breeds()
+		:param children: List of children IDs
+		:return: (total cost, list of breed details newest first, days without a price)
+		"""
+		mask = np.isin(breeds['child'], np.array(children, dtype=np.int64))
+		selected = np.flatnonzero(mask)[np.argsort(-breeds['timestamp'][mask], kind='stable')]
+		details = list()
+		for i in selected:
+			details.append({'date': datetime.datetime.fromtimestamp(int(breeds['timestamp'][i])).strftime('%d-%m-%Y'),
+							'axs_price': round(float(breeds['axs_usd'][i]), 2), 'slp_price': round(float(breeds['slp_usd'][i]), 2),
+							'breed_cost': round(float(breeds['cost'][i]), 2), 'axs_cost': round(float(breeds['axs_cost'][i]), 2),
+							'slp_cost': round(float(breeds['slp_cost'][i]), 2), 'axie_id': int(breeds['child'][i])})
+		return float(np.nansum(breeds['cost'][mask])), details, BreedAnalytics.missing_days(breeds, mask)
+
+	@staticmethod
+	def missing_days(breeds, mask=None):
+		"""
+		Days of breeds whose SLP or AXS price is unknown, their cost is left out of the totals
+		:param breeds: Result of breeds()
+		:param mask: Boolean array selecting the breeds, all of them if not given
+		:return: Sorted list of days, ex: ['2021-09-01']
+		"""
+		unknown = np.isnan(breeds['slp_usd']) | np.isnan(breeds['axs_usd'])
+		if mask is not None:
+			unknown &= mask
+		days = np.unique(breeds['timestamp'][unknown] // DAY)
+		return [datetime.datetime.utcfromtimestamp(int(d) * DAY).strftime('%Y-%m-%d') for d in days]
+
+	@staticmethod
+	def parent_costs(breeds, parent_children):
+		"""
+		Join the breeds with the children of every parent
+		:param breeds: Result of breeds()
+		:param parent_children: Dict {parent ID: list of children IDs}
+		:return: Dict {parent ID: {'total_breed_cost', 'average_breed_cost', 'children', 'breeds'}}
+		"""
+		pairs = [(int(parent), int(child)) for parent, children in parent_children.items() for child in children]
+		parents = np.array([p for p, _ in pairs], dtype=np.int64)
+		children = np.array([c for _, c in pairs], dtype=np.int64)
+
+		# Cost of every child, 0 if its breed is not in the index or its day has no price
+		order = np.argsort(breeds['child'], kind='stable')
+		sorted_children = breeds['child'][order]
+		if len(sorted_children):
+			position = np.minimum(np.searchsorted(sorted_children, children), len(sorted_children) - 1)
+			found = sorted_children[position] == children
+			child_cost = np.where(found, np.nan_to_num(breeds['cost'][order][position]), 0)
+			unpriced = found & np.isnan(breeds['cost'][order][position])
+			child_day = breeds['timestamp'][order][position] // DAY
+		else:
+			found = np.zeros(len(children), dtype=bool)
+			child_cost = np.zeros(len(children))
+			unpriced = found
+			child_day = np.zeros(len(children), dtype=np.int64)
+
+		unique_parents, inverse = np.unique(parents, return_inverse=True)
+		totals = np.bincount(inverse, weights=child_cost, minlength=len(unique_parents))
+		counts = np.bincount(inverse, minlength=len(unique_parents))
+		found_counts = np.bincount(inverse, weights=found, minlength=len(unique_parents))
+
+		# Days without a price of every parent, like missing_days
+		missing = {int(parent): set() for parent in unique_parents}
+		for parent, day in zip(parents[unpriced], child_day[unpriced]):
+			missing[int(parent)].add(int(day))
+
+		res = dict()
+		for parent, total, count, found_count in zip(unique_parents, totals, counts, found_counts):
+			res[int(parent)] = {'total_breed_cost': round(float(total), 2), 'average_breed_cost': round(float(total / count), 2),
+								'children': int(count), 'breeds': int(found_count),
+								'missing_price_days': [datetime.datetime.utcfromtimestamp(d * DAY).strftime('%Y-%m-%d') for d in sorted(missing[int(parent)])]}
+		for parent, children_ids in parent_children.items():
+			if not children_ids:
+				res[int(parent)] = {'total_breed_cost': 0, 'average_breed_cost': 0, 'children': 0, 'breeds': 0, 'missing_price_days': []}
+		return res
+
+	def report(self, address, parent_children=None):
+		"""
+		Breeding P&L of an address in one pass
+		:param address: Ronin address which paid the breeds
+		:param parent_children: Dict {parent ID: list of children IDs} for the per parent costs
+		:return: Dict with the guild totals, the cost of every axie bred and the costs per parent
+		"""
+		breeds = self.breeds(address)
+		count = len(breeds['child'])
+		res = {
+			'guild': {'breeds': count, 'total_breed_cost': round(float(np.nansum(breeds['cost'])), 2),
+					'total_slp': int(breeds['slp'].sum()), 'total_slp_cost': round(float(np.nansum(breeds['slp_cost'])), 2),
+					'total_axs_cost': round(float(np.nansum(breeds['axs_cost'])), 2),
+					'average_breed_cost': round(float(np.nanmean(breeds['cost'])), 2) if count else 0,
+					'missing_price_days': self.missing_days(breeds)},
+			'axies': {int(child): round(float(cost), 2) for child, cost in zip(breeds['child'], breeds['cost'])}
+		}
+		if parent_children is not None:
+			res['parents'] = self.parent_costs(breeds, parent_children)
+		return res
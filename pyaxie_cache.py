@@ -0,0 +1,185 @@
+import collections
+import threading
+import time
+
+
+class TTLCache(object):
+
+	def __init__(self, ttl):
+		"""
+		Thread safe in-memory cache where every entry expires after ttl seconds
+		:param ttl: Default lifetime of the entries in seconds
+		"""
+		self.ttl = ttl
+		self.entries = dict()
+		self.loading = dict()
+		self.lock = threading.Lock()
+
+	def get(self, key, default=None):
+		"""
+		:param key: Key of the entry
+		:param default: Value returned if the entry is missing or expired
+		:return: The cached value
+		"""
+		with self.lock:
+			entry = self.entries.get(key)
+			if entry is None or entry[1] <= time.time():
+				return default
+			return entry[0]
+
+	def set(self, key, value, ttl=None):
+		"""
+		:param key: Key of the entry
+		:param value: Value to cache
+		:param ttl: Lifetime of this entry, default ttl of the cache if not given
+		"""
+		ttl = self.ttl if ttl is None else ttl
+		with self.lock:
+			self.entries[key] = (value, time.time() + ttl, time.time())
+
+	def age(self, key):
+		"""
+		:param key: Key of the entry
+		:return: Seconds since the entry was cached or None if missing
+		"""
+		with self.lock:
+			entry = self.entries.get(key)
+		return None if entry is None else time.time() - entry[2]
+
+	def invalidate(self, key=None, predicate=None):
+		"""
+		Drop an entry, the entries matching predicate, or the whole cache if none is given
+		:param key: Key of the entry
+		:param predicate: Function (key) returning True for the entries to drop
+		"""
+		with self.lock:
+			if predicate is not None:
+				for k in [k for k in self.entries if predicate(k)]:
+					del self.entries[k]
+			elif key is None:
+				self.entries.clear()
+			else:
+				self.entries.pop(key, None)
+
+	def get_or_load(self, key, loader, ttl=None):
+		"""
+		Return the cached value or call loader to get it. Concurrent callers asking for the same
+		missing key wait for the same load instead of calling loader again
+		:param key: Key of the entry
+		:param loader: Function without argument returning the value
+		:param ttl: Lifetime of the loaded entry, default ttl of the cache if not given
+		:return: The value
+		"""
+		missing = object()
+		value = self.get(key, missing)
+		if value is not missing:
+			return value
+		with self.lock:
+			key_lock = self.loading.setdefault(key, threading.Lock())
+		with key_lock:
+			value = self.get(key, missing)
+			if value is not missing:
+				return value
+			try:
+				value = loader()
+				self.set(key, value, ttl)
+				return value
+			finally:
+				# Callers coming after this point find the value, the lock of the key is not needed anymore
+				with self.lock:
+					if self.loading.get(key) is key_lock:
+						del self.loading[key]
+
+
+class DetailCache(object):
+
+	def __init__(self, maxsize, mutable_ttl, mutable_fields):
+		"""
+		Thread safe LRU cache of datas where only some fields expire. Immutable fields are kept until
+		the entry is evicted, mutable ones are only served for mutable_ttl seconds
+		:param maxsize: Maximum number of entries
+		:param mutable_ttl: Lifetime in seconds of the mutable fields
+		:param mutable_fields: Names of the fields that can change
+		"""
+		self.maxsize = maxsize
+		self.mutable_ttl = mutable_ttl
+		self.mutable_fields = frozenset(mutable_fields)
+		self.entries = collections.OrderedDict()
+		self.lock = threading.Lock()
+
+	def get(self, key, fields=None):
+		"""
+		:param key: Key of the entry
+		:param fields: Fields that will be read, all of them if not given
+		:return: The cached datas or None if missing or if a mutable field asked is too old
+		"""
+		with self.lock:
+			entry = self.entries.get(key)
+			if entry is None:
+				return None
+			data, fetched_at, frozen = entry
+			asked = self.mutable_fields if fields is None else self.mutable_fields.intersection(fields)
+			if (asked or not frozen) and time.time() - fetched_at > self.mutable_ttl:
+				return None
+			self.entries.move_to_end(key)
+			return data
+
+	def set(self, key, data, frozen=True):
+		"""
+		:param key: Key of the entry
+		:param data: Datas to cache
+		:param frozen: False if every field of this entry has to be considered mutable
+		"""
+		with self.lock:
+			self.entries[key] = (data, time.time(), frozen)
+			self.entries.move_to_end(key)
+			while len(self.entries) > self.maxsize:
+				self.entries.popitem(last=False)
+
+	def invalidate(self, key=None):
+		"""
+		Drop an entry, or the whole cache if no key is given
+		:param key: Key of the entry
+		"""
+		with self.lock:
+			if key is None:
+				self.entries.clear()
+			else:
+				self.entries.pop(key, None)
+
+
+class LRUCache(object):
+
+	def __init__(self, maxsize):
+		"""
+		Thread safe in-memory cache keeping the maxsize most recently used entries
+		:param maxsize: Maximum number of entries
+		"""
+		self.maxsize = maxsize
+		self.entries = collections.OrderedDict()
+		self.lock = threading.Lock()
+
+	def get(self, key, default=None):
+		with self.lock:
+			if key not in self.entries:
+				return default
+			self.entries.move_to_end(key)
+			return self.entries[key]
+
+	def set(self, key, value):
+		with self.lock:
+			self.entries[key] = value
+			self.entries.move_to_end(key)
+			while len(self.entries) > self.maxsize:
+				self.entries.popitem(last=False)
+
+	def invalidate(self, key=None):
+		"""
+		Drop an entry, or the whole cache if no key is given
+		:param key: Key of the entry
+		"""
+		with self.lock:
+			if key is None:
+				self.entries.clear()
+			else:
+				self.entries.pop(key, None)
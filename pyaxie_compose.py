@@ -0,0 +1,148 @@
+import io
+import threading
+import pyaxie_cache
+
+from PIL import Image
+from pyaxie_images import EGG_IMAGE
+
+
+def sorted_ids(axie_ids):
+	return sorted(set(str(i) for i in axie_ids), key=int)
+
+
+class Compositor(object):
+
+	def __init__(self, image_cache, decoded_size=256, composite_size=64):
+		"""
+		Build images made of many axies in memory, nothing is written on disk. Decoded axie images and
+		finished composites are kept in LRU caches, a composite is keyed by its kind and the sorted axie IDs
+		:param image_cache: ImageCache object giving the path of every axie image
+		:param decoded_size: Number of decoded axie images kept in memory
+		:param composite_size: Number of composites kept in memory
+		"""
+		self.image_cache = image_cache
+		self.decoded = pyaxie_cache.LRUCache(decoded_size)
+		self.composites = pyaxie_cache.LRUCache(composite_size)
+
+	def load(self, path):
+		"""
+		:param path: Path of the image, the paths of the image cache never change of content
+		:return: The decoded RGBA image
+		"""
+		img = self.decoded.get(path)
+		if img is None:
+			with Image.open(path) as f:
+				img = f.convert('RGBA')
+			self.decoded.set(path, img)
+		return img
+
+	@staticmethod
+	def to_buffer(img):
+		buffer = io.BytesIO()
+		img.save(buffer, format='PNG')
+		return buffer.getvalue()
+
+	def composite(self, key, build):
+		"""
+		:param key: Key of the composite
+		:param build: Function returning (composite image, False if a placeholder was used)
+		:return: BytesIO with the PNG, ready for discord.File
+		"""
+		data = self.composites.get(key)
+		if data is None:
+			img, complete = build()
+			data = self.to_buffer(img)
+			# A placeholder comes from a failed download or an egg, the next call gets the real images
+			if complete:
+				self.composites.set(key, data)
+		return io.BytesIO(data)
+
+	def images(self, axie_ids):
+		"""
+		:param axie_ids: List of axie IDs
+		:return: (List of decoded images, False if the egg placeholder replaced one of them)
+		"""
+		pinned = self.image_cache.prefetch(axie_ids, pin=True)
+		try:
+			paths = [pinned[str(axie_id)] for axie_id in axie_ids]
+			return [self.load(path) for path in paths], EGG_IMAGE not in paths
+		finally:
+			self.image_cache.release(pinned.values())
+
+	def line(self, axie_ids):
+		"""
+		Axies merged horizontally in the given order, like pyaxie_utils.merge_images
+		:param axie_ids: List of axie IDs
+		:return: BytesIO with the PNG
+		"""
+		axie_ids = [str(i) for i in axie_ids]
+		key = sorted_ids(axie_ids)
+
+		def build():
+			imgs, complete = self.images(axie_ids)
+			dst = Image.new('RGBA', (sum(img.width for img in imgs), max(img.height for img in imgs)))
+			x = 0
+			for img in imgs:
+				dst.paste(img, (x, 0))
+				x += img.width
+			return dst, complete
+		# Keyed by the sorted IDs, with the display order so the same axies in another order are not mixed up
+		return self.composite(('line', tuple(key), tuple(key.index(i) for i in axie_ids)), build)
+
+	def sheet(self, axie_ids, columns=5, thumb=160):
+		"""
+		Contact sheet of axie thumbnails in a grid
+		:param axie_ids: List of axie IDs
+		:param columns: Number of thumbnails per row
+		:param thumb: Size in pixels of the square cell of a thumbnail
+		:return: BytesIO with the PNG
+		"""
+		axie_ids = sorted_ids(axie_ids)
+
+		def build():
+			imgs, complete = self.images(axie_ids)
+			rows = (len(imgs) + columns - 1) // columns
+			dst = Image.new('RGBA', (min(columns, len(imgs)) * thumb, rows * thumb))
+			for i, img in enumerate(imgs):
+				small = img.copy()
+				small.thumbnail((thumb, thumb), Image.LANCZOS)
+				x = (i % columns) * thumb + (thumb - small.width) // 2
+				y = (i // columns) * thumb + (thumb - small.height) // 2
+				dst.paste(small, (x, y), small)
+			return dst, complete
+		return self.composite(('sheet', columns, thumb) + tuple(axie_ids), build)
+
+	def sheets(self, axie_ids, per_sheet=25, columns=5, thumb=160):
+		"""
+		Split many axies in contact sheets
+		:param axie_ids: List of axie IDs
+		:param per_sheet: Number of axies per sheet
+		:return: List of (axie IDs of the sheet, BytesIO with the PNG)
+		"""
+		axie_ids = sorted_ids(axie_ids)
+		# Downloaded at once and kept until every sheet is built
+		pinned = self.image_cache.prefetch(axie_ids, pin=True)
+		try:
+			res = list()
+			for i in range(0, len(axie_ids), per_sheet):
+				chunk = axie_ids[i:i + per_sheet]
+				res.append((chunk, self.sheet(chunk, columns, thumb)))
+			return res
+		finally:
+			self.image_cache.release(pinned.values())
+
+
+compositors = dict()
+compositors_lock = threading.Lock()
+
+
+def get_compositor(image_cache):
+	"""
+	Get the compositor shared by all the accounts using this image cache
+	:param image_cache: ImageCache object
+	:return: Compositor object
+	"""
+	with compositors_lock:
+		if id(image_cache) not in compositors:
+			compositors[id(image_cache)] = Compositor(image_cache)
+		return compositors[id(image_cache)]
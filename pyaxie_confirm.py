@@ -0,0 +1,152 @@
+import threading
+import time
+
+from concurrent.futures import Future
+
+DEFAULT_POLL_INTERVAL = 1
+DEFAULT_MAX_INTERVAL = 10
+DEFAULT_BACKOFF = 1.5
+DEFAULT_DEADLINE = 300
+
+
+class ConfirmationTimeout(Exception):
+
+	def __init__(self, txn, deadline):
+		"""
+		Raised by the future of a transaction that had no receipt before the deadline
+		:param txn: Hash of the transaction
+		:param deadline: Seconds the transaction was tracked
+		"""
+		super().__init__("Transaction " + str(txn) + " not confirmed after " + str(deadline) + " seconds")
+		self.txn = txn
+		self.deadline = deadline
+
+
+class PendingTransaction(object):
+
+	def __init__(self, txn, deadline, interval):
+		self.txn = txn
+		self.future = Future()
+		self.timeout = deadline
+		self.deadline = time.time() + deadline
+		self.interval = interval
+		self.next_poll = time.time()
+
+
+class ConfirmationTracker(object):
+
+	def __init__(self, fetch_receipts, poll_interval=DEFAULT_POLL_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL,
+				backoff=DEFAULT_BACKOFF, deadline=DEFAULT_DEADLINE):
+		"""
+		Wait for many transactions with one background thread. The pending transactions due are polled
+		together, each one waits a bit longer between polls while it stays unmined
+		:param fetch_receipts: Function taking a list of hashes and returning {hash: status}, status is None if not mined yet
+		:param poll_interval: Seconds before the first poll of a transaction
+		:param max_interval: Maximum seconds between two polls of a transaction
+		:param backoff: Factor applied to the interval after each poll without receipt
+		:param deadline: Default seconds after which a transaction is given up
+		"""
+		self.fetch_receipts = fetch_receipts
+		self.poll_interval = poll_interval
+		self.max_interval = max_interval
+		self.backoff = backoff
+		self.deadline = deadline
+		self.pending = dict()
+		self.condition = threading.Condition()
+		self.poller = None
+
+	def submit(self, txn, callback=None, deadline=None):
+		"""
+		Track a transaction
+		:param txn: Hash of the transaction
+		:param callback: Function called with the future once resolved
+		:param deadline: Seconds after which the transaction is given up, default deadline of the tracker if not given
+		:return: Future resolved with True or False depending if the transaction succeed, or ConfirmationTimeout
+		"""
+		with self.condition:
+			pending = self.pending.get(txn)
+			if pending is None:
+				pending = PendingTransaction(txn, self.deadline if deadline is None else deadline, self.poll_interval)
+				pending.next_poll += self.poll_interval
+				self.pending[txn] = pending
+			if self.poller is None:
+				self.poller = threading.Thread(target=self.poll_loop, name='confirmation-tracker', daemon=True)
+				self.poller.start()
+			self.condition.notify()
+		if callback is not None:
+			pending.future.add_done_callback(callback)
+		return pending.future
+
+	def wait(self, txn, deadline=None):
+		"""
+		Track a transaction and block until it is resolved
+		:param txn: Hash of the transaction
+		:param deadline: Seconds after which the transaction is given up
+		:return: True or False depending if transaction succeed, None if not confirmed before the deadline
+		"""
+		try:
+			return self.submit(txn, deadline=deadline).result()
+		except ConfirmationTimeout as e:
+			print(str(e))
+			return None
+
+	def poll_due(self):
+		"""
+		Poll the transactions due together and resolve the ones mined or past their deadline
+		"""
+		now = time.time()
+		with self.condition:
+			due = [p for p in self.pending.values() if p.next_poll <= now]
+		if not due:
+			return
+		try:
+			receipts = self.fetch_receipts([p.txn for p in due])
+		except Exception as e:
+			print("Error polling transaction receipts : " + str(e))
+			receipts = dict()
+		now = time.time()
+		resolved = list()
+		with self.condition:
+			for p in due:
+				status = receipts.get(p.txn)
+				if status is not None or now >= p.deadline:
+					del self.pending[p.txn]
+					resolved.append((p, status))
+				else:
+					p.interval = min(p.interval * self.backoff, self.max_interval)
+					p.next_poll = min(now + p.interval, p.deadline)
+		# Resolved outside the lock, the callbacks can submit other transactions
+		for p, status in resolved:
+			if status is None:
+				p.future.set_exception(ConfirmationTimeout(p.txn, p.timeout))
+			else:
+				p.future.set_result(status == 1)
+
+	def poll_loop(self):
+		while True:
+			self.poll_due()
+			with self.condition:
+				if not self.pending:
+					self.condition.wait()
+				else:
+					wait = min(p.next_poll for p in self.pending.values()) - time.time()
+					if wait > 0:
+						self.condition.wait(wait)
+
+
+confirmation_trackers = dict()
+confirmation_trackers_lock = threading.Lock()
+
+
+def get_confirmation_tracker(rpc, config=None):
+	"""
+	Get the confirmation tracker shared by all the accounts of this chain, the receipts due are read in one batch
+	:param rpc: BatchRPC object of the chain
+	:param config: The loaded config, 'confirmation' gives poll_interval, max_interval, backoff and deadline
+	:return: ConfirmationTracker object
+	"""
+	with confirmation_trackers_lock:
+		if rpc.url not in confirmation_trackers:
+			settings = (config or {}).get('confirmation') or {}
+			confirmation_trackers[rpc.url] = ConfirmationTracker(rpc.get_transaction_receipts, **settings)
+		return confirmation_trackers[rpc.url]
@@ -0,0 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fan_out(fn, items, parallelism=8):
+	"""
+	Call fn on every item with at most parallelism calls at the same time
+	:param fn: Function taking one item
+	:param items: List of items (ex: ronin addresses)
+	:param parallelism: Maximum number of concurrent calls
+	:return: List of results in the same order as items. If a call raised, its exception is returned at its place
+	"""
+	def call(item):
+		try:
+			return fn(item)
+		except Exception as e:
+			return e
+
+	items = list(items)
+	if parallelism <= 1 or len(items) <= 1:
+		return [call(item) for item in items]
+	with ThreadPoolExecutor(max_workers=min(parallelism, len(items))) as pool:
+		return list(pool.map(call, items))
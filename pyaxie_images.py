@@ -0,0 +1,232 @@
+import collections
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import pyaxie_fanout
+
+from concurrent.futures import Future
+
+AXIE_IMAGE_URL = 'https://storage.googleapis.com/assets.axieinfinity.com/axies/{}/axie/axie-full-transparent.png'
+EGG_IMAGE = './img/axies/egg.png'
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class ImageCache(object):
+
+	def __init__(self, directory, transport, budget=200 * 1024 * 1024, parallelism=8):
+		"""
+		Axie images stored on disk by the sha256 of their content, with an LRU index kept under a disk budget.
+		Concurrent requests of the same image wait for the same download and files are written atomically
+		:param directory: Directory of the cache
+		:param transport: Transport object
+		:param budget: Maximum size in bytes of the cached images
+		:param parallelism: Number of images downloaded at the same time by prefetch
+		"""
+		if not os.path.exists(directory):
+			os.makedirs(directory)
+		self.directory = directory
+		self.transport = transport
+		self.budget = budget
+		self.parallelism = parallelism
+		self.lock = threading.Lock()
+		self.inflight = dict()
+		# Number of callers still using each file (by digest), never evicted meanwhile
+		self.pins = collections.Counter()
+		self.db = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+		self.db.execute("CREATE TABLE IF NOT EXISTS images (key TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL, used_at REAL NOT NULL)")
+		self.db.commit()
+		self.clean_temp_files()
+
+	def clean_temp_files(self):
+		# Leftovers of writes interrupted by a crash, never renamed so never served
+		for name in os.listdir(self.directory):
+			if name.endswith('.tmp'):
+				os.remove(os.path.join(self.directory, name))
+
+	def blob_path(self, digest):
+		return os.path.join(self.directory, digest + '.png')
+
+	def lookup(self, key, pin=False):
+		"""
+		:param key: Key of the image (axie ID)
+		:param pin: Keep the image from eviction until release is called with its path
+		:return: Path of the cached image or None
+		"""
+		with self.lock:
+			return self.find(key, pin)
+
+	def find(self, key, pin=False):
+		# Called with the lock held
+		row = self.db.execute("SELECT digest FROM images WHERE key = ?", (key,)).fetchone()
+		if row is None:
+			return None
+		path = self.blob_path(row[0])
+		if not os.path.exists(path):
+			self.db.execute("DELETE FROM images WHERE key = ?", (key,))
+			self.db.commit()
+			return None
+		self.db.execute("UPDATE images SET used_at = ? WHERE key = ?", (time.time(), key))
+		self.db.commit()
+		if pin:
+			self.pins[row[0]] += 1
+		return path
+
+	def release(self, paths):
+		"""
+		Let images pinned by get or prefetch be evicted again
+		:param paths: Paths returned with pin=True
+		"""
+		with self.lock:
+			for path in paths:
+				digest = os.path.splitext(os.path.basename(path))[0]
+				if self.pins[digest] <= 0:
+					continue
+				self.pins[digest] -= 1
+				if self.pins[digest] == 0:
+					del self.pins[digest]
+					# Replaced while pinned, the file was kept for the callers
+					if self.db.execute("SELECT 1 FROM images WHERE digest = ?", (digest,)).fetchone() is None and os.path.exists(path):
+						os.remove(path)
+		self.evict()
+
+	def store(self, key, content, pin=False):
+		"""
+		Write an image atomically : a temporary file is renamed once complete
+		:param key: Key of the image (axie ID)
+		:param content: Bytes of the PNG
+		:param pin: Keep the image from eviction until release is called with its path
+		:return: Path of the image
+		"""
+		digest = hashlib.sha256(content).hexdigest()
+		path = self.blob_path(digest)
+		if not os.path.exists(path):
+			fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+			try:
+				with os.fdopen(fd, 'wb') as f:
+					f.write(content)
+					f.flush()
+					os.fsync(f.fileno())
+				os.replace(tmp, path)
+			except Exception:
+				if os.path.exists(tmp):
+					os.remove(tmp)
+				raise
+		with self.lock:
+			old = self.db.execute("SELECT digest FROM images WHERE key = ?", (key,)).fetchone()
+			self.db.execute("INSERT OR REPLACE INTO images (key, digest, size, used_at) VALUES (?, ?, ?, ?)", (key, digest, len(content), time.time()))
+			self.db.commit()
+			if pin:
+				self.pins[digest] += 1
+			if old is not None and old[0] != digest and not self.pins[old[0]] and self.db.execute("SELECT 1 FROM images WHERE digest = ?", (old[0],)).fetchone() is None:
+				if os.path.exists(self.blob_path(old[0])):
+					os.remove(self.blob_path(old[0]))
+		self.evict()
+		return path
+
+	def evict(self):
+		"""
+		Remove the least recently used images until the cache fits in the budget. A file shared by many keys
+		is only deleted with its last key, a pinned file is not deleted
+		:return: Number of files deleted
+		"""
+		deleted = 0
+		with self.lock:
+			total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT digest, MAX(size) AS size FROM images GROUP BY digest)").fetchone()[0]
+			if total <= self.budget:
+				return 0
+			rows = self.db.execute("SELECT key, digest, size FROM images ORDER BY used_at").fetchall()
+			for key, digest, size in rows:
+				if total <= self.budget:
+					break
+				if self.pins[digest]:
+					continue
+				self.db.execute("DELETE FROM images WHERE key = ?", (key,))
+				if self.db.execute("SELECT 1 FROM images WHERE digest = ?", (digest,)).fetchone() is None:
+					total -= size
+					if os.path.exists(self.blob_path(digest)):
+						os.remove(self.blob_path(digest))
+						deleted += 1
+			self.db.commit()
+		return deleted
+
+	def download(self, axie_id, pin=False):
+		content = self.transport.get(AXIE_IMAGE_URL.format(axie_id)).content
+		# Eggs have no image, the API answers with a tiny placeholder
+		if len(content) <= 500 or not content.startswith(PNG_SIGNATURE):
+			return EGG_IMAGE
+		return self.store(axie_id, content, pin)
+
+	def get(self, axie_id, pin=False):
+		"""
+		Get the image of an axie, downloaded if not cached. Callers asking for an image being downloaded
+		wait for the same download
+		:param axie_id: ID of the axie
+		:param pin: Keep the image from eviction until release is called with its path
+		:return: Path of the image
+		"""
+		key = str(axie_id)
+		while True:
+			# Looked up and registered as downloading at once, two callers never download the same image
+			with self.lock:
+				path = self.find(key, pin)
+				if path is not None:
+					return path
+				future = self.inflight.get(key)
+				owner = future is None
+				if owner:
+					future = self.inflight[key] = Future()
+			if owner:
+				break
+			path = future.result()
+			if path == EGG_IMAGE:
+				return path
+			# Looked up again to be pinned, downloaded again if evicted meanwhile
+		try:
+			path = self.download(key, pin)
+			future.set_result(path)
+			return path
+		except Exception as e:
+			future.set_exception(e)
+			raise
+		finally:
+			with self.lock:
+				self.inflight.pop(key, None)
+
+	def prefetch(self, axie_ids, pin=False):
+		"""
+		Make sure the images of many axies are cached, downloading the missing ones in parallel
+		:param axie_ids: List of axie IDs
+		:param pin: Keep the images from eviction until release is called with the returned paths, so the
+		images stored at the end of a large batch do not evict the first ones
+		:return: Dict {axie ID: path}, a failed download gives the egg image
+		"""
+		axie_ids = list(dict.fromkeys(str(i) for i in axie_ids))
+		res = dict()
+		for axie_id, path in zip(axie_ids, pyaxie_fanout.fan_out(lambda i: self.get(i, pin), axie_ids, self.parallelism)):
+			if isinstance(path, Exception):
+				print("Error downloading the image of axie " + axie_id + " : " + str(path))
+				path = EGG_IMAGE
+			res[axie_id] = path
+		return res
+
+
+image_caches = dict()
+image_caches_lock = threading.Lock()
+
+
+def get_image_cache(directory, transport, budget=200 * 1024 * 1024, parallelism=8):
+	"""
+	Get the image cache shared by all the accounts using this directory
+	:param directory: Directory of the cache
+	:param transport: Transport object
+	:param budget: Maximum size in bytes of the cached images
+	:param parallelism: Number of images downloaded at the same time by prefetch
+	:return: ImageCache object
+	"""
+	with image_caches_lock:
+		if directory not in image_caches:
+			image_caches[directory] = ImageCache(directory, transport, budget, parallelism)
+		return image_caches[directory]
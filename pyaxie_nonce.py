@@ -0,0 +1,77 @@
+import threading
+
+from web3.auto import w3
+
+
+class NonceManager(object):
+
+	def __init__(self, get_transaction_counts):
+		"""
+		Allocate the nonces of the accounts locally so many transactions of the same account can be sent
+		without waiting for the previous ones. The chain is only asked on first use and after an error
+		:param get_transaction_counts: Function taking a list of checksum addresses and returning {address: pending transaction count}
+		"""
+		self.get_transaction_counts = get_transaction_counts
+		self.next_nonces = dict()
+		self.address_locks = dict()
+		self.lock = threading.Lock()
+
+	def address_lock(self, address):
+		with self.lock:
+			return self.address_locks.setdefault(address, threading.Lock())
+
+	def allocate(self, address, count=1):
+		"""
+		Reserve following nonces for an account
+		:param address: Ronin address of the account
+		:param count: Number of nonces to reserve
+		:return: The first reserved nonce, the other ones follow it
+		"""
+		address = w3.toChecksumAddress(address.replace('ronin:', '0x'))
+		with self.address_lock(address):
+			nonce = self.next_nonces.get(address)
+			if nonce is None:
+				nonce = self.get_transaction_counts([address])[address]
+			self.next_nonces[address] = nonce + count
+			return nonce
+
+	def prefetch(self, addresses):
+		"""
+		Ask the chain the nonces of many accounts at once, before sending their transactions
+		:param addresses: List of ronin addresses
+		"""
+		addresses = [w3.toChecksumAddress(a.replace('ronin:', '0x')) for a in addresses]
+		with self.lock:
+			missing = [a for a in addresses if a not in self.next_nonces]
+		if not missing:
+			return
+		counts = self.get_transaction_counts(missing)
+		for address in missing:
+			with self.address_lock(address):
+				self.next_nonces.setdefault(address, counts[address])
+
+	def resync(self, address):
+		"""
+		Forget the local nonce of an account, the next allocation asks the chain again.
+		To call when a transaction of the account was refused or did not get mined
+		:param address: Ronin address of the account
+		"""
+		address = w3.toChecksumAddress(address.replace('ronin:', '0x'))
+		with self.address_lock(address):
+			self.next_nonces.pop(address, None)
+
+
+nonce_managers = dict()
+nonce_managers_lock = threading.Lock()
+
+
+def get_nonce_manager(rpc):
+	"""
+	Get the nonce manager shared by all the accounts of this chain
+	:param rpc: BatchRPC object of the chain
+	:return: NonceManager object
+	"""
+	with nonce_managers_lock:
+		if rpc.url not in nonce_managers:
+			nonce_managers[rpc.url] = NonceManager(rpc.get_transaction_counts)
+		return nonce_managers[rpc.url]
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+
+MESSAGE_LIMIT = 2000
+FILES_LIMIT = 10
+
+
+def split_text(content, limit=MESSAGE_LIMIT):
+	"""
+	Split a text in parts fitting in a message, on line breaks when possible
+	:param content: The text
+	:param limit: Maximum length of a part
+	:return: List of parts
+	"""
+	parts = list()
+	for line in content.split('\n'):
+		while len(line) > limit:
+			parts.append(line[:limit])
+			line = line[limit:]
+		parts.append(line)
+	return parts
+
+
+class RateLimiter(object):
+
+	def __init__(self, rate=5, per=5.0, global_rate=50, global_per=1.0):
+		"""
+		Token buckets spacing the messages of the bot like the rate limits of Discord : one bucket per channel
+		and one shared by all the channels
+		:param rate: Number of messages per channel every per seconds
+		:param per: Period of the channel buckets in seconds
+		:param global_rate: Number of messages of the bot every global_per seconds
+		:param global_per: Period of the global bucket in seconds
+		"""
+		self.rate = rate
+		self.per = per
+		self.global_rate = global_rate
+		self.global_per = global_per
+		self.buckets = dict()
+
+	def refill(self, key, rate, per, now):
+		tokens, updated = self.buckets.get(key, (rate, now))
+		tokens = min(rate, tokens + (now - updated) * rate / per)
+		self.buckets[key] = (tokens, now)
+		return tokens
+
+	def delay(self, key):
+		"""
+		Take a token from the bucket of the channel and from the global bucket if both have one
+		:param key: ID of the channel
+		:return: Seconds to wait before trying again, 0 if the tokens were taken
+		"""
+		now = time.monotonic()
+		tokens = self.refill(key, self.rate, self.per, now)
+		global_tokens = self.refill(None, self.global_rate, self.global_per, now)
+		if tokens < 1 or global_tokens < 1:
+			return max((1 - tokens) * self.per / self.rate, (1 - global_tokens) * self.global_per / self.global_rate)
+		self.buckets[key] = (tokens - 1, now)
+		self.buckets[None] = (global_tokens - 1, now)
+		return 0
+
+	async def acquire(self, key):
+		"""
+		Wait until a message can be sent in the channel
+		:param key: ID of the channel
+		"""
+		wait = self.delay(key)
+		while wait > 0:
+			await asyncio.sleep(wait)
+			wait = self.delay(key)
+
+
+class Outbox(object):
+
+	def __init__(self, channel, limiter, linger=1.0):
+		"""
+		Outgoing messages of a channel packed in as few Discord messages as possible : texts are joined up to
+		MESSAGE_LIMIT characters and up to FILES_LIMIT files are attached to the same message. A full message is
+		sent right away, an incomplete one once it waited linger seconds, so results show up while they stream in
+		:param channel: Discord channel (or any object with an async send(content, files=))
+		:param limiter: RateLimiter object
+		:param linger: Seconds an incomplete message waits for more content
+		"""
+		self.channel = channel
+		self.key = getattr(channel, 'id', id(channel))
+		self.limiter = limiter
+		self.linger = linger
+		self.text = ""
+		self.files = list()
+		self.timer = None
+		self.lock = asyncio.Lock()
+		self.sent = 0
+		self.error = None
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc, tb):
+		await self.close()
+
+	async def send(self, content="", files=None):
+		"""
+		Queue a text and its files, the text stays in the same message as the files when they fit. An error of
+		a message sent in background is raised here
+		:param content: Text to send
+		:param files: List of discord.File
+		"""
+		self.raise_error()
+		files = list(files or [])
+		if files and len(self.files) + len(files) > FILES_LIMIT:
+			await self.flush()
+		if content:
+			for part in split_text(content):
+				text = self.text + "\n" + part if self.text else part
+				if len(text) > MESSAGE_LIMIT:
+					await self.flush()
+					text = part
+				self.text = text
+		for f in files:
+			if len(self.files) == FILES_LIMIT:
+				await self.flush()
+			self.files.append(f)
+		if len(self.files) == FILES_LIMIT or len(self.text) == MESSAGE_LIMIT:
+			await self.flush()
+		elif (self.text or self.files) and self.timer is None:
+			self.timer = asyncio.ensure_future(self.flush_later())
+
+	async def flush_later(self):
+		await asyncio.sleep(self.linger)
+		self.timer = None
+		try:
+			await self.flush()
+		except Exception as e:
+			# Nobody awaits this task, the error is raised by the next send or close
+			print("Error sending a message in channel " + str(self.key) + " : " + str(e))
+			self.error = e
+
+	def raise_error(self):
+		if self.error is not None:
+			error, self.error = self.error, None
+			raise error
+
+	async def flush(self):
+		"""
+		Send the pending message
+		"""
+		# The pending message is taken before any await, the lock keeps the messages in order
+		text, files = self.text, self.files
+		self.text, self.files = "", list()
+		if self.timer is not None:
+			self.timer.cancel()
+			self.timer = None
+		if not text.strip() and not files:
+			return
+		async with self.lock:
+			# A 429 answered anyway is retried by discord.py itself
+			await self.limiter.acquire(self.key)
+			await self.channel.send(text if text.strip() else None, files=files or None)
+			self.sent += 1
+
+	async def close(self):
+		"""
+		Send what is still pending and wait for the messages being sent
+		"""
+		await self.flush()
+		async with self.lock:
+			pass
+		self.raise_error()
+
+
+rate_limiter = None
+rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter(config=None):
+	"""
+	Get the rate limiter shared by all the outboxes, 'outbox' > 'rate' and 'per' of the config give the channel bucket
+	:param config: The loaded config
+	:return: RateLimiter object
+	"""
+	global rate_limiter
+	with rate_limiter_lock:
+		if rate_limiter is None:
+			outbox = (config or {}).get('outbox') or {}
+			rate_limiter = RateLimiter(outbox.get('rate', 5), outbox.get('per', 5.0), outbox.get('global_rate', 50), outbox.get('global_per', 1.0))
+		return rate_limiter
+
+
+def get_outbox(channel, config=None):
+	"""
+	Create the outbox of a command
+	:param channel: Discord channel
+	:param config: The loaded config, 'outbox' > 'linger' gives the seconds an incomplete message waits
+	:return: Outbox object
+	"""
+	return Outbox(channel, get_rate_limiter(config), ((config or {}).get('outbox') or {}).get('linger', 1.0))
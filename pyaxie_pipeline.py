@@ -0,0 +1,196 @@
+import asyncio
+import datetime
+import time
+
+from datetime import timedelta
+from web3 import Web3
+from pyaxie_async import AsyncPyaxie, run_blocking
+
+STAGES = ('eligibility', 'signature', 'signing', 'broadcast', 'confirmation')
+DEFAULT_LIMITS = {'eligibility': 16, 'signature': 4, 'signing': 4, 'broadcast': 4, 'confirmation': 64}
+# What the pipeline does for every account
+CLAIM = 'claim'
+PAYOUT = 'payout'
+PAYOUT_ME = 'payout_me'
+
+
+class PipelineJob(object):
+
+	def __init__(self, account):
+		"""
+		State of one account going through the pipeline
+		:param account: pyaxie object of the account
+		"""
+		self.account = account
+		self.aio = AsyncPyaxie(account)
+		self.name = account.name
+		self.snapshot = None
+		self.claiming = False
+		self.signature = None
+		self.amount = 0
+		self.transfers = list()
+		self.signed_txns = list()
+		self.txns = list()
+		self.claim_result = None
+		self.transfer_results = list()
+		self.error = None
+		self.committed = False
+		self.stage_times = dict()
+		self.started_at = time.time()
+		self.finished_at = None
+
+	@property
+	def done(self):
+		return self.finished_at is not None
+
+	def finish(self, error=None):
+		self.error = error
+		self.finished_at = time.time()
+
+	@property
+	def success(self):
+		results = ([self.claim_result] if self.claiming else []) + [r for _, _, r in self.transfer_results]
+		return self.error is None and all(isinstance(r, str) and not r.startswith('Error') for r in results)
+
+
+class MassPipeline(object):
+
+	def __init__(self, accounts, mode=CLAIM, limits=None, on_result=None):
+		"""
+		Claim or payout many accounts at once. Every account goes through the eligibility check, the claim
+		signature fetch, the signing, the broadcast and the confirmation stages, each stage having its own
+		number of workers so the slow API calls do not hold the chain calls back
+		:param accounts: List of pyaxie objects
+		:param mode: CLAIM, PAYOUT or PAYOUT_ME (everything sent to the manager)
+		:param limits: Dict {stage: number of workers}, DEFAULT_LIMITS for the missing stages
+		:param on_result: Coroutine function called with every finished PipelineJob, in finishing order
+		"""
+		self.accounts = accounts
+		self.mode = mode
+		self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+		self.on_result = on_result
+		self.jobs = list()
+		self.stopping = False
+		self.started_at = None
+		self.finished_at = None
+
+	async def check_eligibility(self, job):
+		job.snapshot = await job.aio.get_item_snapshot(max_age=0)
+		job.claiming = datetime.datetime.utcnow() + timedelta(days=-14) >= datetime.datetime.fromtimestamp(job.snapshot.last_claimed_item_at) \
+			and job.snapshot.unclaimed > 0
+		if self.mode == CLAIM and not job.claiming:
+			job.finish("No SLP to claim at this moment")
+		elif self.mode != CLAIM and not job.claiming and job.snapshot.balance < 1:
+			job.finish("No SLP to send")
+
+	async def fetch_signature(self, job):
+		if job.claiming:
+			job.signature = await job.aio.get_claim_signature()
+			job.claiming = isinstance(job.signature, dict)
+			if not job.claiming and (self.mode == CLAIM or job.snapshot.balance < 1):
+				job.finish(str(job.signature or "Error while getting the claim signature"))
+				return
+		if self.mode == CLAIM:
+			return
+		# After the claim the account holds everything it earned
+		job.amount = job.snapshot.total if job.claiming else job.snapshot.balance
+		manager_address = job.account.config['personal']['ronin_address'].replace('ronin:', '0x')
+		transfers = [(manager_address, job.amount)] if self.mode == PAYOUT_ME else job.account.get_payout_transfers(job.amount)
+		job.transfers = [(to, amount) for to, amount in transfers if amount >= 1 and Web3.isAddress(to)]
+		if not job.transfers and not job.claiming:
+			job.finish("Make sure that the amount is not under 1 and the **to_address** is correct.")
+
+	async def sign(self, job):
+		job.signed_txns = await run_blocking(job.account.sign_transactions, job.signature if job.claiming else None, job.transfers)
+
+	async def broadcast(self, job):
+		job.txns, job.error = await run_blocking(job.account.broadcast_transactions, job.signed_txns)
+
+	async def confirm(self, job):
+		successes = await job.aio.wait_confirmations(job.txns)
+		results = job.account.transactions_results(job.signed_txns, job.txns, job.error, successes)
+		if job.claiming:
+			job.claim_result = results.pop(0)
+		job.transfer_results = [(to, amount, result) for (to, amount), result in zip(job.transfers, results)]
+		job.account.invalidate_item_snapshot()
+		for to, _ in job.transfers:
+			job.account.invalidate_item_snapshot(to)
+		job.finish(job.error)
+
+	async def worker(self, stage, run, inbox, outbox, finished):
+		while True:
+			job = await inbox.get()
+			started = time.time()
+			if self.stopping and not job.committed:
+				job.finish("Error : the run was stopped before signing")
+			else:
+				# From the signing on the job holds nonces, it is always broadcast and confirmed
+				job.committed = job.committed or stage == 'signing'
+				try:
+					await run(job)
+				except Exception as e:
+					job.finish("Error : " + str(e))
+			job.stage_times[stage] = time.time() - started
+			await (finished if job.done or outbox is None else outbox).put(job)
+
+	async def run(self):
+		"""
+		Run every account through the stages
+		:return: List of the finished PipelineJob
+		"""
+		self.started_at = time.time()
+		runs = {'eligibility': self.check_eligibility, 'signature': self.fetch_signature, 'signing': self.sign,
+				'broadcast': self.broadcast, 'confirmation': self.confirm}
+		queues = [asyncio.Queue() for _ in STAGES]
+		finished = asyncio.Queue()
+		workers = list()
+		for i, stage in enumerate(STAGES):
+			outbox = queues[i + 1] if i + 1 < len(STAGES) else None
+			for _ in range(self.limits[stage]):
+				workers.append(asyncio.ensure_future(self.worker(stage, runs[stage], queues[i], outbox, finished)))
+
+		queued = [PipelineJob(account) for account in self.accounts]
+		try:
+			if self.accounts:
+				# One batch for the nonces of the whole guild instead of one call per account
+				try:
+					await run_blocking(self.accounts[0].nonces.prefetch, [account.ronin_address for account in self.accounts])
+				except Exception as e:
+					print("Error prefetching the nonces : " + str(e))
+			for job in queued:
+				await queues[0].put(job)
+			for _ in queued:
+				job = await finished.get()
+				if not job.done:
+					job.finish()
+				self.jobs.append(job)
+				if self.on_result is not None:
+					try:
+						await self.on_result(job)
+					except Exception as e:
+						print("Error reporting the result of " + str(job.name) + " : " + str(e))
+		finally:
+			# Stopped early : the jobs not signed yet are dropped, the signed ones still go to the end
+			self.stopping = True
+			while any(job.committed and not job.done for job in queued):
+				self.jobs.append(await finished.get())
+			for worker in workers:
+				worker.cancel()
+		self.finished_at = time.time()
+		return self.jobs
+
+	def summary(self):
+		"""
+		:return: Throughput summary of the run
+		"""
+		elapsed = (self.finished_at or time.time()) - self.started_at
+		txns = sum(len(job.txns) for job in self.jobs)
+		succeeded = sum(job.success for job in self.jobs)
+		res = "{} accounts in {:.1f}s ({} succeeded, {} skipped or failed), {} transactions, {:.2f} accounts/min\n".format(
+			len(self.jobs), elapsed, succeeded, len(self.jobs) - succeeded, txns, len(self.jobs) * 60 / elapsed if elapsed else 0)
+		for stage in STAGES:
+			times = [job.stage_times[stage] for job in self.jobs if stage in job.stage_times]
+			if times:
+				res += "{} : {} accounts, avg {:.2f}s, max {:.2f}s\n".format(stage, len(times), sum(times) / len(times), max(times))
+		return res
+
@@ -0,0 +1,218 @@
+import asyncio
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import pyaxie_cache
+import pyaxie_transport
+
+from pycoingecko import CoinGeckoAPI
+
+GRAPHQL_URL = "https://axieinfinity.com/graphql-server-v2/graphql"
+CURRENCIES = ('slp', 'axs', 'eth')
+COINGECKO_IDS = {'slp': 'smooth-love-potion', 'axs': 'axie-infinity', 'eth': 'ethereum'}
+DAY = 24 * 3600
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/41.0.2228.0 Safari/537.36'}
+
+
+class PriceOracle(object):
+
+	def __init__(self, transport, ttl=60, url=GRAPHQL_URL):
+		"""
+		USD prices of SLP, AXS and ETH, fetched together in one GraphQL request and cached
+		:param transport: Transport object
+		:param ttl: Seconds during which the prices are reused
+		:param url: URL of the GraphQL API
+		"""
+		self.transport = transport
+		self.url = url
+		self.cache = pyaxie_cache.TTLCache(ttl)
+		self.inflight = None
+
+	def get_rates_body(self):
+		query = "".join("    " + c + " {\n      usd\n      __typename\n    }\n" for c in CURRENCIES)
+		return {"operationName": "NewEthExchangeRate", "variables": {}, "query": "query NewEthExchangeRate {\n  exchangeRate {\n" + query + "    __typename\n  }\n}\n"}
+
+	def parse_rates(self, json_data):
+		rates = json_data['data']['exchangeRate']
+		return {c: rates[c]['usd'] for c in CURRENCIES}
+
+	def fetch_rates(self):
+		r = self.transport.post(self.url, headers=HEADERS, json=self.get_rates_body(), idempotent=True)
+		return self.parse_rates(json.loads(r.text))
+
+	def get_rates(self):
+		"""
+		Get all the prices. Callers arriving while the prices are fetched wait for the same request
+		:return: Dict with the USD price of slp, axs and eth
+		"""
+		return self.cache.get_or_load('rates', self.fetch_rates)
+
+	def get_price(self, currency):
+		"""
+		:param currency: slp, axs or eth
+		:return: The price in USD of 1 token
+		"""
+		return self.get_rates()[currency.lower()]
+
+	async def get_rates_async(self, transport):
+		"""
+		Async version of get_rates for the bot loop, sharing the same cache
+		:param transport: AsyncTransport object
+		:return: Dict with the USD price of slp, axs and eth
+		"""
+		rates = self.cache.get('rates')
+		if rates is not None:
+			return rates
+		if self.inflight is None or self.inflight.done():
+			self.inflight = asyncio.ensure_future(self.fetch_rates_async(transport))
+		return await asyncio.shield(self.inflight)
+
+	async def fetch_rates_async(self, transport):
+		r = await transport.post(self.url, headers=HEADERS, json=self.get_rates_body(), idempotent=True)
+		rates = self.parse_rates(r.json())
+		self.cache.set('rates', rates)
+		return rates
+
+
+class HistoricalPriceStore(object):
+
+	def __init__(self, path, cg=None):
+		"""
+		Daily USD prices of SLP, AXS and ETH stored in SQLite. Missing days are filled with one
+		CoinGecko market_chart/range request per token for the whole range of days asked
+		:param path: Path of the SQLite file
+		:param cg: CoinGeckoAPI object
+		"""
+		self.cg = cg or CoinGeckoAPI()
+		directory = os.path.dirname(path)
+		if directory and not os.path.exists(directory):
+			os.makedirs(directory)
+		self.lock = threading.Lock()
+		self.db = sqlite3.connect(path, check_same_thread=False)
+		self.db.execute("CREATE TABLE IF NOT EXISTS daily_prices (coin TEXT NOT NULL, day TEXT NOT NULL, usd REAL NOT NULL, PRIMARY KEY (coin, day))")
+		self.db.commit()
+
+	@staticmethod
+	def day(timestamp):
+		"""
+		:param timestamp: date in unix timestamp format
+		:return: The UTC day of the timestamp as YYYY-MM-DD
+		"""
+		return datetime.datetime.utcfromtimestamp(int(timestamp)).strftime('%Y-%m-%d')
+
+	def stored(self, days):
+		"""
+		:param days: List of days as YYYY-MM-DD
+		:return: Dict {(coin, day): usd} of the prices already stored
+		"""
+		days = list(set(days))
+		res = dict()
+		with self.lock:
+			for i in range(0, len(days), 500):
+				chunk = days[i:i + 500]
+				rows = self.db.execute("SELECT coin, day, usd FROM daily_prices WHERE day IN (" + ",".join("?" * len(chunk)) + ")", chunk)
+				for coin, day, usd in rows:
+					res[(coin, day)] = usd
+		return res
+
+	def save(self, rows):
+		"""
+		:param rows: List of (coin, day, usd)
+		"""
+		with self.lock:
+			self.db.executemany("INSERT OR REPLACE INTO daily_prices (coin, day, usd) VALUES (?, ?, ?)", rows)
+			self.db.commit()
+
+	def fetch_range(self, coin, first_day, last_day):
+		"""
+		Download the prices of a token between two days with one request. The price of a day is the first
+		point of that day, like the daily history of CoinGecko (00:00 UTC)
+		:param coin: slp, axs or eth
+		:param first_day: First day as YYYY-MM-DD
+		:param last_day: Last day as YYYY-MM-DD
+		:return: List of (coin, day, usd)
+		"""
+		start = int(datetime.datetime.strptime(first_day, '%Y-%m-%d').replace(tzinfo=datetime.timezone.utc).timestamp())
+		end = int(datetime.datetime.strptime(last_day, '%Y-%m-%d').replace(tzinfo=datetime.timezone.utc).timestamp()) + DAY
+		chart = self.cg.get_coin_market_chart_range_by_id(id=COINGECKO_IDS[coin], vs_currency='usd', from_timestamp=start, to_timestamp=end)
+		res = dict()
+		for ms, usd in chart.get('prices', []):
+			day = self.day(ms / 1000)
+			if day not in res and first_day <= day <= last_day:
+				res[day] = usd
+		return [(coin, day, usd) for day, usd in res.items()]
+
+	def fetch_day(self, coin, day):
+		"""
+		Fallback for a day the range request did not cover
+		:return: List with (coin, day, usd)
+		"""
+		date = datetime.datetime.strptime(day, '%Y-%m-%d').strftime('%d-%m-%Y')
+		price_history = self.cg.get_coin_history_by_id(id=COINGECKO_IDS[coin], date=date, vsCurrencies=['usd'])
+		return [(coin, day, price_history['market_data']['current_price']['usd'])]
+
+	def prefetch(self, timestamps):
+		"""
+		Make sure the prices of every day of timestamps are stored, with as few requests as possible
+		:param timestamps: List of unix timestamps
+		"""
+		days = set(self.day(t) for t in timestamps)
+		if not days:
+			return
+		known = self.stored(days)
+		for coin in CURRENCIES:
+			missing = sorted(d for d in days if (coin, d) not in known)
+			if not missing:
+				continue
+			rows = self.fetch_range(coin, missing[0], missing[-1])
+			self.save(rows)
+			found = set(day for _, day, _ in rows)
+			for day in missing:
+				if day not in found:
+					self.save(self.fetch_day(coin, day))
+
+	def get_prices(self, timestamp):
+		"""
+		Get prices for AXS, SLP and ETH at given date
+		:param timestamp: date in unix timestamp format
+		:return: Dict with the prices of currencies at given date
+		"""
+		self.prefetch([timestamp])
+		day = self.day(timestamp)
+		known = self.stored([day])
+		res = {coin: known[(coin, day)] for coin in CURRENCIES}
+		res['date'] = timestamp
+		return res
+
+
+price_oracle = None
+price_oracle_lock = threading.Lock()
+price_stores = dict()
+
+
+def get_price_oracle(config=None):
+	"""
+	Get the price oracle shared by all the accounts, 'cache' > 'price_ttl' of the config gives the cache duration
+	:param config: The loaded config
+	:return: PriceOracle object
+	"""
+	global price_oracle
+	with price_oracle_lock:
+		if price_oracle is None:
+			ttl = ((config or {}).get('cache') or {}).get('price_ttl', 60)
+			price_oracle = PriceOracle(pyaxie_transport.get_transport(config), ttl)
+		return price_oracle
+
+
+def get_price_store(path):
+	"""
+	Get the historical price store shared by all the accounts using this file
+	:param path: Path of the SQLite file
+	:return: HistoricalPriceStore object
+	"""
+	with price_oracle_lock:
+		if path not in price_stores:
+			price_stores[path] = HistoricalPriceStore(path)
+		return price_stores[path]
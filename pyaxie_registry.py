@@ -0,0 +1,102 @@
+import threading
+
+from pyaxie import pyaxie, load_config
+
+
+class AccountRegistry(object):
+
+	def __init__(self, config_file=None, name_resolver=None):
+		"""
+		Keep one pyaxie object per account of the scholarship, built on first use and reused after
+		:param config_file: Path of the config, CONFIG_FILE env or secret.yaml by default
+		:param name_resolver: Function giving the display name of a scholar from its discord ID, None if not known yet
+		"""
+		self.config_file = config_file
+		self.name_resolver = name_resolver
+		self.lock = threading.RLock()
+		self.config = None
+		self.reload_if_changed()
+
+	def reload_if_changed(self):
+		"""
+		Rebuild the indexes if the config file changed on disk. The accounts are built again on next use
+		:return: The current config
+		"""
+		config = load_config(self.config_file)
+		with self.lock:
+			if config is self.config:
+				return config
+			self.config = config
+			self.accounts = dict()
+			self.unnamed = set()
+			self.ids = {int(config['personal']['discord_id']): None}
+			self.ronins = {config['personal']['ronin_address']: None}
+			for name, scholar in config['scholars'].items():
+				self.ids[int(scholar['discord_id'])] = name
+				self.ronins[scholar['ronin_address']] = name
+		return config
+
+	def get(self, name):
+		"""
+		:param name: Name of the scholar in the config, None for the manager
+		:return: The pyaxie object of the account
+		"""
+		with self.lock:
+			if name in self.accounts:
+				account = self.accounts[name]
+				if name in self.unnamed:
+					self.resolve_name(name, account)
+				return account
+			if name is None:
+				personal = self.config['personal']
+				account = pyaxie(personal['ronin_address'], personal['private_key'], config=self.config)
+			else:
+				scholar = self.config['scholars'][name]
+				account = pyaxie(scholar['ronin_address'], scholar['private_key'], config=self.config)
+				if self.name_resolver is not None:
+					self.resolve_name(name, account)
+			self.accounts[name] = account
+			return account
+
+	def resolve_name(self, name, account):
+		# Before the discord client is ready the name is not known, it is asked again on next use
+		display_name = self.name_resolver(self.config['scholars'][name]['discord_id'])
+		if display_name is None:
+			self.unnamed.add(name)
+		else:
+			account.name = display_name
+			self.unnamed.discard(name)
+
+	def get_by_discord_id(self, discord_id):
+		"""
+		:param discord_id: discord ID of the scholar or manager
+		:return: Scholar account or Manager account or None
+		"""
+		try:
+			discord_id = int(discord_id)
+		except ValueError:
+			return None
+		if discord_id not in self.ids:
+			return None
+		return self.get(self.ids[discord_id])
+
+	def get_by_ronin(self, ronin_address):
+		"""
+		:param ronin_address: ronin address of the scholar or manager
+		:return: Scholar account or Manager account or None
+		"""
+		if ronin_address not in self.ronins:
+			return None
+		return self.get(self.ronins[ronin_address])
+
+	def scholars(self):
+		"""
+		:return: List of the pyaxie objects of all the scholars, in config order
+		"""
+		return [self.get(name) for name in self.config['scholars']]
+
+	def manager(self):
+		"""
+		:return: The pyaxie object of the manager account
+		"""
+		return self.get(None)
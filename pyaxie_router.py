@@ -0,0 +1,115 @@
+import asyncio
+import traceback
+
+from pyaxie_async import run_blocking
+
+INLINE = 'inline'
+THREAD = 'thread'
+BACKGROUND = 'background'
+
+
+class Command(object):
+
+	def __init__(self, name, handler, policy=INLINE, timeout=60, manager_only=False, shielded=False):
+		"""
+		A bot command and the way it runs
+		:param name: First word of the message, ex: $infos
+		:param handler: Coroutine function (message, args) for INLINE and BACKGROUND, blocking function
+		(message, args) returning the text to send (str, list of str or None) for THREAD
+		:param policy: INLINE awaited in the event loop, THREAD run in the bounded executor, BACKGROUND scheduled
+		as a task so the bot answers other messages meanwhile
+		:param timeout: Seconds after which the command is abandoned
+		:param manager_only: Only the manager can run the command
+		:param shielded: The command is never cancelled (claims, payouts, transfers : stopping between signing
+		and broadcasting leaves transactions in flight), after timeout the user is told it is still running
+		"""
+		if policy not in (INLINE, THREAD, BACKGROUND):
+			raise ValueError("Unknown execution policy : " + str(policy))
+		self.name = name
+		self.handler = handler
+		self.policy = policy
+		self.timeout = timeout
+		self.manager_only = manager_only
+		self.shielded = shielded
+
+
+class Router(object):
+
+	def __init__(self, is_manager, send):
+		"""
+		Commands dispatched with one dict lookup on the first word of the message
+		:param is_manager: Function (message) telling if the author is the manager
+		:param send: Coroutine function (message, texts) sending a list of texts in the channel of the message
+		"""
+		self.is_manager = is_manager
+		self.send = send
+		self.commands = dict()
+		self.jobs = set()
+
+	def add(self, command):
+		if command.name in self.commands:
+			raise ValueError("Command already registered : " + command.name)
+		self.commands[command.name] = command
+
+	def command(self, *names, policy=INLINE, timeout=60, manager_only=False, shielded=False):
+		"""
+		Decorator registering a handler under one or many command names
+		:param names: Command names, ex: '$transfer', '$transfer_id'
+		:return: The decorator, the handler is returned unchanged
+		"""
+		def register(handler):
+			for name in names:
+				self.add(Command(name, handler, policy, timeout, manager_only, shielded))
+			return handler
+		return register
+
+	def resolve(self, content):
+		"""
+		:param content: Content of the message
+		:return: (Command, list of arguments), the command is None if the first word is not a command
+		"""
+		words = content.split(' ')
+		return self.commands.get(words[0]), [w for w in words[1:] if w]
+
+	async def dispatch(self, message):
+		"""
+		Run the command of a message following its policy
+		:param message: Discord message
+		:return: False if the message is not a command, the task of a BACKGROUND command, True otherwise
+		"""
+		command, args = self.resolve(message.content)
+		if command is None:
+			return False
+		if command.manager_only and not self.is_manager(message):
+			await self.send(message, ["This command is only available for manager"])
+			return True
+		if command.policy == BACKGROUND:
+			task = asyncio.ensure_future(self.execute(command, message, args))
+			self.jobs.add(task)
+			task.add_done_callback(self.jobs.discard)
+			return task
+		await self.execute(command, message, args)
+		return True
+
+	async def execute(self, command, message, args):
+		try:
+			if command.policy == THREAD:
+				# A thread can't be stopped, on timeout its result is only ignored
+				texts = await asyncio.wait_for(run_blocking(command.handler, message, args), command.timeout)
+				if texts:
+					await self.send(message, [texts] if isinstance(texts, str) else texts)
+			elif command.shielded:
+				job = asyncio.ensure_future(command.handler(message, args))
+				try:
+					await asyncio.wait_for(asyncio.shield(job), command.timeout)
+				except asyncio.TimeoutError:
+					await self.send(message, ["`{}` is still running after {} seconds, the result will be posted when it finishes.".format(
+						command.name, command.timeout)])
+					await job
+			else:
+				await asyncio.wait_for(command.handler(message, args), command.timeout)
+		except asyncio.TimeoutError:
+			await self.send(message, ["`{}` took more than {} seconds and was stopped.".format(command.name, command.timeout)])
+		except Exception as e:
+			traceback.print_exc()
+			await self.send(message, ["Error in `{}` : {}".format(command.name, e)])
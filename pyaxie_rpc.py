@@ -0,0 +1,169 @@
+import json
+import threading
+import pyaxie_fanout
+import pyaxie_transport
+
+from web3.auto import w3
+
+RONIN_RPC_URL = 'https://proxy.roninchain.com/free-gas-rpc'
+BALANCE_OF = '0x70a08231'
+READ_METHODS = ('eth_call', 'eth_blockNumber', 'eth_chainId', 'eth_estimateGas', 'net_version')
+
+
+def is_read(method):
+	"""
+	:param method: RPC method
+	:return: True if the call only reads the chain and can be sent again after a timeout
+	"""
+	return method.startswith('eth_get') or method in READ_METHODS
+
+
+class RPCError(Exception):
+
+	def __init__(self, error):
+		"""
+		Error returned by the node for one call of a batch
+		:param error: The error object of the JSON-RPC response
+		"""
+		super().__init__(error.get('message', str(error)) if isinstance(error, dict) else str(error))
+		self.error = error
+
+
+class BatchRPC(object):
+
+	def __init__(self, transport, url=RONIN_RPC_URL, batch_size=100, parallelism=4):
+		"""
+		JSON-RPC client for the Ronin chain sending many eth_* calls in one batch POST
+		:param transport: Transport object
+		:param url: RPC url of the chain
+		:param batch_size: Maximum number of calls per POST, bigger batches are split
+		:param parallelism: Number of POSTs of the same batch sent at once
+		"""
+		self.transport = transport
+		self.url = url
+		self.batch_size = batch_size
+		self.parallelism = parallelism
+		self.request_id = 0
+		self.lock = threading.Lock()
+
+	def next_ids(self, count):
+		with self.lock:
+			first = self.request_id
+			self.request_id += count
+		return range(first, first + count)
+
+	def batch(self, calls):
+		"""
+		Send calls in as few requests as possible
+		:param calls: List of (method, params)
+		:return: List with the result of every call in the same order, or the RPCError of the failed ones
+		"""
+		chunks = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+		if len(chunks) == 1:
+			return self.send_chunk(chunks[0])
+		res = list()
+		for chunk_res in pyaxie_fanout.fan_out(self.send_chunk, chunks, self.parallelism):
+			if isinstance(chunk_res, Exception):
+				raise chunk_res
+			res.extend(chunk_res)
+		return res
+
+	def send_chunk(self, chunk):
+		ids = self.next_ids(len(chunk))
+		body = [{"jsonrpc": "2.0", "id": request_id, "method": method, "params": params} for request_id, (method, params) in zip(ids, chunk)]
+		r = self.transport.post(self.url, json=body, idempotent=all(is_read(method) for method, _ in chunk))
+		data = json.loads(r.text)
+		if isinstance(data, dict):
+			# The whole batch was refused
+			raise RPCError(data.get('error', data))
+		# The node can answer in any order, route the results with their id
+		routed = {response.get('id'): response for response in data}
+		res = list()
+		for request_id in ids:
+			response = routed.get(request_id)
+			if response is None:
+				res.append(RPCError("No response for request " + str(request_id)))
+			elif response.get('error'):
+				res.append(RPCError(response['error']))
+			else:
+				res.append(response.get('result'))
+		return res
+
+	def call(self, method, params):
+		"""
+		:param method: RPC method, ex: eth_getTransactionCount
+		:param params: List of params of the method
+		:return: Result of the call
+		"""
+		res = self.batch([(method, params)])[0]
+		if isinstance(res, RPCError):
+			raise res
+		return res
+
+	def map(self, method, params_list):
+		res = self.batch([(method, params) for params in params_list])
+		for r in res:
+			if isinstance(r, RPCError):
+				raise r
+		return res
+
+	def get_transaction_counts(self, addresses, block='pending'):
+		"""
+		:param addresses: List of addresses
+		:param block: Block number or tag
+		:return: Dict {address: transaction count}
+		"""
+		res = self.map('eth_getTransactionCount', [[w3.toChecksumAddress(a), block] for a in addresses])
+		return {address: int(count, 16) for address, count in zip(addresses, res)}
+
+	def get_transaction_receipts(self, txns):
+		"""
+		:param txns: List of transaction hashes
+		:return: Dict {hash: status}, status is None if not mined yet or if its call failed
+		"""
+		# One failed call must not make the whole poll round fail, the transaction is polled again next round
+		res = self.batch([('eth_getTransactionReceipt', [txn]) for txn in txns])
+		return {txn: None if receipt is None or isinstance(receipt, RPCError) else int(receipt['status'], 16) for txn, receipt in zip(txns, res)}
+
+	@staticmethod
+	def balance_of_call(token_address, address, block='latest'):
+		data = BALANCE_OF + address.replace('ronin:', '0x')[2:].lower().rjust(64, '0')
+		return 'eth_call', [{'to': w3.toChecksumAddress(token_address), 'data': data}, block]
+
+	@staticmethod
+	def parse_uint(result):
+		return 0 if result in (None, '0x') else int(result, 16)
+
+	def get_balances(self, tokens, addresses, block='latest'):
+		"""
+		Read the balanceOf of many addresses on many contracts in the same batch
+		:param tokens: Dict {name: contract address}
+		:param addresses: List of addresses
+		:param block: Block number or tag
+		:return: Dict {address: {name: balance}}, the balance is an RPCError if its call failed
+		"""
+		keys = [(address, name) for address in addresses for name in tokens]
+		res = self.batch([self.balance_of_call(tokens[name], address, block) for address, name in keys])
+		balances = {address: dict() for address in addresses}
+		for (address, name), balance in zip(keys, res):
+			balances[address][name] = balance if isinstance(balance, RPCError) else self.parse_uint(balance)
+		return balances
+
+
+shared_rpcs = dict()
+shared_rpcs_lock = threading.Lock()
+
+
+def get_batch_rpc(config=None, url=RONIN_RPC_URL):
+	"""
+	Get the batch RPC client shared by all the accounts, 'concurrency' > 'rpc_batch_size' and 'fan_out' of the config
+	give the batch size and the number of POSTs sent at once
+	:param config: The loaded config
+	:param url: RPC url of the chain
+	:return: BatchRPC object
+	"""
+	with shared_rpcs_lock:
+		if url not in shared_rpcs:
+			concurrency = (config or {}).get('concurrency') or {}
+			shared_rpcs[url] = BatchRPC(pyaxie_transport.get_transport(config), url, concurrency.get('rpc_batch_size', 100), concurrency.get('fan_out', 8))
+		return shared_rpcs[url]
@@ -0,0 +1,136 @@
+import asyncio
+import time
+import pyaxie_cache
+
+from pyaxie_async import AsyncPyaxie, run_blocking
+
+SNAPSHOT = 'snapshot'
+RANK_MMR = 'rank_mmr'
+BALANCES = 'balances'
+PRICE = 'price'
+PRICE_CURRENCIES = ('slp', 'axs')
+
+
+def format_age(seconds):
+	"""
+	:param seconds: Age of a data in seconds
+	:return: The age as text, ex: 42 sec, 3 min, 2 h
+	"""
+	seconds = int(seconds)
+	if seconds < 60:
+		return str(seconds) + " sec"
+	if seconds < 3600:
+		return str(seconds // 60) + " min"
+	return str(seconds // 3600) + " h"
+
+
+class PrefetchScheduler(object):
+
+	def __init__(self, accounts, interval=300, price_interval=60, max_age=900, parallelism=4):
+		"""
+		Keep the datas of $infos warm : every scholar is refreshed once per interval, the refreshes being spread
+		evenly over the interval instead of all at once. Balances of all the accounts are read in one RPC batch
+		per interval and the prices every price_interval
+		:param accounts: Function returning the pyaxie objects of the scholars to refresh
+		:param interval: Seconds between two refreshes of the same scholar
+		:param price_interval: Seconds between two refreshes of the prices
+		:param max_age: Seconds after which a warm data is not served anymore
+		:param parallelism: Maximum number of scholars refreshed at the same time
+		"""
+		self.accounts = accounts
+		self.interval = interval
+		self.price_interval = price_interval
+		self.warm = pyaxie_cache.TTLCache(max_age)
+		self.parallelism = parallelism
+		self.semaphore = None
+		self.tasks = list()
+
+	def get(self, key, kind):
+		"""
+		:param key: Ronin address of the account, or currency for PRICE
+		:param kind: SNAPSHOT, RANK_MMR, BALANCES or PRICE
+		:return: (value, age in seconds) or (None, None) if not warm
+		"""
+		value = self.warm.get((key, kind))
+		if value is None:
+			return None, None
+		return value, self.warm.age((key, kind))
+
+	def put(self, key, kind, value):
+		if value is not None and not isinstance(value, Exception):
+			self.warm.set((key, kind), value)
+
+	def invalidate(self, address=None):
+		"""
+		Forget the warm datas of an account after it changed (claim, transfer...)
+		:param address: Ronin address, every account if None
+		"""
+		self.warm.invalidate(predicate=lambda key: key[1] != PRICE and (address is None or key[0] == address))
+
+	def current_accounts(self):
+		try:
+			return self.accounts()
+		except Exception as e:
+			print("Error getting the accounts to refresh : " + str(e))
+			return list()
+
+	async def refresh_account(self, account):
+		aio = AsyncPyaxie(account)
+		async with self.semaphore:
+			try:
+				self.put(account.ronin_address, SNAPSHOT, await aio.get_item_snapshot(max_age=0))
+				self.put(account.ronin_address, RANK_MMR, await aio.get_rank_mmr())
+			except Exception as e:
+				print("Error refreshing " + str(account.name) + " : " + str(e))
+
+	async def refresh_balances(self, accounts):
+		try:
+			datas = await run_blocking(accounts[0].get_accounts_balances, [account.ronin_address for account in accounts])
+		except Exception as e:
+			return print("Error refreshing balances : " + str(e))
+		for account, data in zip(accounts, datas):
+			if data['SLP'] != -1:
+				self.put(account.ronin_address, BALANCES, data)
+
+	async def refresh_prices(self, account):
+		aio = AsyncPyaxie(account)
+		for currency in PRICE_CURRENCIES:
+			try:
+				self.put(currency, PRICE, await aio.get_price(currency))
+			except Exception as e:
+				print("Error refreshing the price of " + currency + " : " + str(e))
+
+	async def account_loop(self):
+		while True:
+			started = time.monotonic()
+			accounts = self.current_accounts()
+			if accounts:
+				await self.refresh_balances(accounts)
+				step = self.interval / len(accounts)
+				refreshes = list()
+				for i, account in enumerate(accounts):
+					await asyncio.sleep(max(0, started + i * step - time.monotonic()))
+					refreshes.append(asyncio.ensure_future(self.refresh_account(account)))
+				await asyncio.gather(*refreshes)
+			await asyncio.sleep(max(0, started + self.interval - time.monotonic()))
+
+	async def price_loop(self):
+		while True:
+			accounts = self.current_accounts()
+			if accounts:
+				await self.refresh_prices(accounts[0])
+			await asyncio.sleep(self.price_interval)
+
+	def start(self):
+		"""
+		Start the refreshes in the running event loop, does nothing if already started
+		"""
+		if not self.tasks:
+			# Made here to belong to the loop of the bot
+			self.semaphore = asyncio.Semaphore(self.parallelism)
+			self.tasks = [asyncio.ensure_future(self.account_loop()), asyncio.ensure_future(self.price_loop())]
+
+	def stop(self):
+		for task in self.tasks:
+			task.cancel()
+		self.tasks = list()
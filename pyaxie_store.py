@@ -0,0 +1,167 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import yaml
+
+
+class AxieStore(object):
+
+	def __init__(self, path):
+		"""
+		Local axie datas in SQLite, keyed by axie ID with indexes on owner and class
+		:param path: Path of the SQLite file
+		"""
+		directory = os.path.dirname(path)
+		if directory and not os.path.exists(directory):
+			os.makedirs(directory)
+		self.path = path
+		self.lock = threading.Lock()
+		self.db = sqlite3.connect(path, check_same_thread=False)
+		self.db.executescript("""
+			CREATE TABLE IF NOT EXISTS axies (
+				id TEXT PRIMARY KEY,
+				owner TEXT,
+				class TEXT,
+				breed_count INTEGER,
+				stage INTEGER,
+				data TEXT NOT NULL,
+				updated_at REAL NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS axies_owner ON axies (owner);
+			CREATE INDEX IF NOT EXISTS axies_class ON axies (class);
+			CREATE TABLE IF NOT EXISTS meta (
+				key TEXT PRIMARY KEY,
+				value TEXT
+			);
+		""")
+		self.db.commit()
+
+	@staticmethod
+	def row(axie_data):
+		owner = axie_data.get('owner')
+		axie_class = axie_data.get('class')
+		return (str(axie_data['id']), owner.lower() if owner else None, axie_class.lower() if axie_class else None,
+				axie_data.get('breedCount'), axie_data.get('stage'), json.dumps(axie_data), time.time())
+
+	def upsert(self, axie_data):
+		"""
+		Insert or replace the datas of an axie
+		:param axie_data: Datas of the axie, with at least its id
+		"""
+		self.upsert_many([axie_data])
+
+	def upsert_many(self, axies_data):
+		"""
+		Insert or replace the datas of many axies in one transaction
+		:param axies_data: List of axie datas
+		"""
+		with self.lock:
+			self.db.executemany("INSERT OR REPLACE INTO axies (id, owner, class, breed_count, stage, data, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+								[self.row(axie) for axie in axies_data])
+			self.db.commit()
+
+	def delete(self, axie_ids):
+		"""
+		:param axie_ids: List of axie IDs to remove
+		"""
+		with self.lock:
+			self.db.executemany("DELETE FROM axies WHERE id = ?", [(str(i),) for i in axie_ids])
+			self.db.commit()
+
+	def query(self, sql, params=()):
+		with self.lock:
+			return self.db.execute(sql, params).fetchall()
+
+	def get(self, axie_id):
+		"""
+		:param axie_id: ID of the axie
+		:return: Datas of the axie or None if not stored
+		"""
+		rows = self.query("SELECT data FROM axies WHERE id = ?", (str(axie_id),))
+		return json.loads(rows[0][0]) if rows else None
+
+	def has(self, axie_id):
+		return bool(self.query("SELECT 1 FROM axies WHERE id = ?", (str(axie_id),)))
+
+	def briefs(self):
+		"""
+		:return: Dict {axie ID: (breed count, stage, owner)} of all the stored axies, to detect changes
+		"""
+		return {axie_id: (breed_count, stage, owner) for axie_id, breed_count, stage, owner in self.query("SELECT id, breed_count, stage, owner FROM axies")}
+
+	def all(self):
+		"""
+		:return: Dict {axie ID: datas} of all the stored axies
+		"""
+		return {axie_id: json.loads(data) for axie_id, data in self.query("SELECT id, data FROM axies")}
+
+	def by_owner(self, owner):
+		"""
+		:param owner: Ronin address of the owner
+		:return: List of the datas of the axies of this owner
+		"""
+		return [json.loads(data) for data, in self.query("SELECT data FROM axies WHERE owner = ?", (owner.replace('ronin:', '0x').lower(),))]
+
+	def by_class(self, axie_class):
+		"""
+		:param axie_class: Plant, Beast, Bird, etc...
+		:return: List of the datas of the axies of this class
+		"""
+		return [json.loads(data) for data, in self.query("SELECT data FROM axies WHERE class = ?", (axie_class.lower(),))]
+
+	def get_meta(self, key, default=None):
+		"""
+		:param key: Name of the value
+		:param default: Value returned if not stored
+		:return: The stored value
+		"""
+		rows = self.query("SELECT value FROM meta WHERE key = ?", (key,))
+		return rows[0][0] if rows else default
+
+	def set_meta(self, key, value):
+		with self.lock:
+			self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+			self.db.commit()
+
+	def migrate_yaml(self, yaml_path):
+		"""
+		One-time import of the old yaml axie_list. The file is left in place, the import is recorded in the
+		meta table so it is not done again
+		:param yaml_path: Path of the yaml axie_list
+		:return: Number of imported axies
+		"""
+		meta_key = 'migrated:' + os.path.abspath(yaml_path)
+		if self.get_meta(meta_key) is not None:
+			return 0
+		if not os.path.exists(yaml_path) or os.stat(yaml_path).st_size <= 3:
+			return 0
+		with open(yaml_path) as f:
+			data = yaml.safe_load(f)
+		axies = [axie for axie in (data or {}).values() if axie and 'id' in axie]
+		self.upsert_many(axies)
+		self.set_meta(meta_key, str(time.time()))
+		return len(axies)
+
+
+axie_stores = dict()
+axie_stores_lock = threading.Lock()
+
+
+def get_axie_store(path, yaml_path=None):
+	"""
+	Get the axie store shared by all the accounts using this file, importing the old yaml axie_list on first use
+	:param path: Path of the SQLite file
+	:param yaml_path: Path of the old yaml axie_list
+	:return: AxieStore object
+	"""
+	with axie_stores_lock:
+		if path not in axie_stores:
+			store = AxieStore(path)
+			if yaml_path:
+				imported = store.migrate_yaml(yaml_path)
+				if imported:
+					print("Imported " + str(imported) + " axies from " + yaml_path)
+			axie_stores[path] = store
+		return axie_stores[path]
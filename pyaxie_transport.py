@@ -0,0 +1,190 @@
+import asyncio
+import json
+import threading
+import aiohttp
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# A 429 is refused before being processed, a write can be sent again
+WRITE_RETRY_STATUS = (429,)
+
+
+class Transport(object):
+
+	def __init__(self, connect_timeout=5, read_timeout=30, retries=5, backoff_factor=0.5, pool_connections=10, pool_maxsize=20):
+		"""
+		HTTP client shared by all the calls : keep-alive connections pooled per host, retries with
+		exponential backoff and default timeouts. Reads are retried on 429/5xx and read errors, writes (claim,
+		token creation, rename, raw transactions) only when they surely were not processed : connection
+		errors and 429, a timeout after the server accepted a write must not send it twice
+		:param connect_timeout: Seconds to wait for the connection
+		:param read_timeout: Seconds to wait for the response
+		:param retries: Number of retries before giving up
+		:param backoff_factor: Retries wait backoff_factor * 2^(retry - 1) seconds, or the Retry-After of the server
+		:param pool_connections: Number of hosts to keep a connection pool for
+		:param pool_maxsize: Number of connections kept open per host
+		"""
+		self.timeout = (connect_timeout, read_timeout)
+		read_retry = self.make_retry(dict(total=retries, connect=retries, read=retries, status=retries, backoff_factor=backoff_factor,
+											status_forcelist=RETRY_STATUS, respect_retry_after_header=True, raise_on_status=False))
+		write_retry = self.make_retry(dict(total=retries, connect=retries, read=0, status=retries, backoff_factor=backoff_factor,
+											status_forcelist=WRITE_RETRY_STATUS, respect_retry_after_header=True, raise_on_status=False))
+		# urllib3 retries are set per session, one pooled session for each kind of call
+		self.session = self.make_session(read_retry, pool_connections, pool_maxsize)
+		self.write_session = self.make_session(write_retry, pool_connections, pool_maxsize)
+
+	@staticmethod
+	def make_retry(retry_args):
+		try:
+			# The API calls are POST, the session decides if they are retried
+			return Retry(allowed_methods=None, **retry_args)
+		except TypeError:
+			return Retry(method_whitelist=False, **retry_args)
+
+	@staticmethod
+	def make_session(retry, pool_connections, pool_maxsize):
+		adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+		session = requests.Session()
+		session.mount('https://', adapter)
+		session.mount('http://', adapter)
+		return session
+
+	def request(self, method, url, idempotent=None, **kwargs):
+		"""
+		Send a request with the pooled session
+		:param method: HTTP method
+		:param url: URL of the request
+		:param idempotent: True for a read that can be sent again, by default only GET is
+		:param kwargs: Same arguments as requests, timeout defaults to the transport timeouts
+		:return: The response
+		"""
+		kwargs.setdefault('timeout', self.timeout)
+		if idempotent is None:
+			idempotent = method == 'GET'
+		return (self.session if idempotent else self.write_session).request(method, url, **kwargs)
+
+	def get(self, url, **kwargs):
+		return self.request('GET', url, **kwargs)
+
+	def post(self, url, idempotent=False, **kwargs):
+		return self.request('POST', url, idempotent, **kwargs)
+
+
+class AsyncResponse(object):
+
+	def __init__(self, status_code, text, headers):
+		"""
+		Response of the async transport, the body is already read
+		"""
+		self.status_code = status_code
+		self.text = text
+		self.headers = headers
+
+	def json(self):
+		return json.loads(self.text)
+
+
+class AsyncTransport(object):
+
+	def __init__(self, connect_timeout=5, read_timeout=30, retries=5, backoff_factor=0.5, pool_connections=10, pool_maxsize=20):
+		"""
+		Async version of Transport for the bot event loop, with the same settings
+		:param connect_timeout: Seconds to wait for the connection
+		:param read_timeout: Seconds to wait for the response
+		:param retries: Number of retries before giving up
+		:param backoff_factor: Retries wait backoff_factor * 2^(retry - 1) seconds, or the Retry-After of the server
+		:param pool_connections: Number of hosts to keep connections for
+		:param pool_maxsize: Number of connections kept open per host
+		"""
+		self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+		self.retries = retries
+		self.backoff_factor = backoff_factor
+		self.limit = pool_connections * pool_maxsize
+		self.limit_per_host = pool_maxsize
+		self.session = None
+
+	def get_session(self):
+		# The session has to be created inside the running loop
+		if self.session is None or self.session.closed:
+			connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+			self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+		return self.session
+
+	def backoff(self, retry, retry_after=None):
+		if retry_after is not None and retry_after.isdigit():
+			return int(retry_after)
+		return self.backoff_factor * (2 ** retry)
+
+	async def request(self, method, url, idempotent=None, **kwargs):
+		"""
+		Send a request, retried with exponential backoff. Reads are retried on 429/5xx, connection errors and
+		timeouts, writes only on 429 and failed connections, like Transport
+		:param method: HTTP method
+		:param url: URL of the request
+		:param idempotent: True for a read that can be sent again, by default only GET is
+		:param kwargs: Same arguments as aiohttp
+		:return: AsyncResponse object
+		"""
+		if idempotent is None:
+			idempotent = method == 'GET'
+		retry_status = RETRY_STATUS if idempotent else WRITE_RETRY_STATUS
+		# Connecting failed : the request was never sent
+		retry_errors = (aiohttp.ClientConnectionError, asyncio.TimeoutError) if idempotent else (aiohttp.ClientConnectorError,)
+		retry = 0
+		while True:
+			try:
+				async with self.get_session().request(method, url, **kwargs) as r:
+					text = await r.text()
+					if r.status not in retry_status or retry >= self.retries:
+						return AsyncResponse(r.status, text, r.headers)
+					wait = self.backoff(retry, r.headers.get('Retry-After'))
+			except retry_errors:
+				if retry >= self.retries:
+					raise
+				wait = self.backoff(retry)
+			retry += 1
+			await asyncio.sleep(wait)
+
+	async def get(self, url, **kwargs):
+		return await self.request('GET', url, **kwargs)
+
+	async def post(self, url, idempotent=False, **kwargs):
+		return await self.request('POST', url, idempotent, **kwargs)
+
+	async def close(self):
+		if self.session is not None:
+			await self.session.close()
+
+
+shared_transport = None
+shared_async_transport = None
+shared_transport_lock = threading.Lock()
+
+
+def get_transport(config=None):
+	"""
+	Get the transport shared by all the accounts, created on first call with the 'http' part of the config
+	:param config: The loaded config
+	:return: Transport object
+	"""
+	global shared_transport
+	with shared_transport_lock:
+		if shared_transport is None:
+			shared_transport = Transport(**((config or {}).get('http') or {}))
+		return shared_transport
+
+
+def get_async_transport(config=None):
+	"""
+	Get the async transport shared by all the accounts, created on first call with the 'http' part of the config
+	:param config: The loaded config
+	:return: AsyncTransport object
+	"""
+	global shared_async_transport
+	with shared_transport_lock:
+		if shared_async_transport is None:
+			shared_async_transport = AsyncTransport(**((config or {}).get('http') or {}))
+		return shared_async_transport
@@ -0,0 +1,215 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+def topic(value):
+	"""
+	:param value: Topic as hex string or int (token ID, address...)
+	:return: The topic as stored in the index, 0x + 64 lowercase hex digits
+	"""
+	if isinstance(value, int):
+		return '0x' + format(value, '064x')
+	return '0x' + value.lower().replace('0x', '').rjust(64, '0')
+
+
+class TxIndex(object):
+
+	def __init__(self, path, fetch_page, page_size=100, ttl=60):
+		"""
+		Transaction history of the ronin addresses kept in SQLite. The history is backfilled page by page,
+		after that only the transactions newer than the last indexed block are downloaded
+		:param path: Path of the SQLite file
+		:param fetch_page: Function (address, start, size) returning a page of transactions, newest first
+		:param page_size: Number of transactions per page
+		:param ttl: Seconds during which an address is not synced again
+		"""
+		directory = os.path.dirname(path)
+		if directory and not os.path.exists(directory):
+			os.makedirs(directory)
+		self.fetch_page = fetch_page
+		self.page_size = page_size
+		self.ttl = ttl
+		self.lock = threading.Lock()
+		self.address_locks = dict()
+		self.db = sqlite3.connect(path, check_same_thread=False)
+		self.db.executescript("""
+			CREATE TABLE IF NOT EXISTS txs (
+				address TEXT NOT NULL,
+				hash TEXT NOT NULL,
+				block INTEGER,
+				timestamp INTEGER,
+				from_address TEXT,
+				to_address TEXT,
+				PRIMARY KEY (address, hash)
+			);
+			CREATE TABLE IF NOT EXISTS logs (
+				hash TEXT NOT NULL,
+				idx INTEGER NOT NULL,
+				contract TEXT,
+				topic0 TEXT,
+				topic1 TEXT,
+				topic2 TEXT,
+				topic3 TEXT,
+				data TEXT,
+				PRIMARY KEY (hash, idx)
+			);
+			CREATE TABLE IF NOT EXISTS sync_state (
+				address TEXT PRIMARY KEY,
+				last_block INTEGER NOT NULL DEFAULT 0,
+				backfill_offset INTEGER NOT NULL DEFAULT 0,
+				backfill_done INTEGER NOT NULL DEFAULT 0,
+				synced_at REAL NOT NULL DEFAULT 0
+			);
+			CREATE INDEX IF NOT EXISTS txs_block ON txs (address, block);
+			CREATE INDEX IF NOT EXISTS logs_topic0 ON logs (topic0);
+			CREATE INDEX IF NOT EXISTS logs_topic1 ON logs (topic1);
+			CREATE INDEX IF NOT EXISTS logs_topic2 ON logs (topic2);
+			CREATE INDEX IF NOT EXISTS logs_topic3 ON logs (topic3);
+		""")
+		self.db.commit()
+
+	@staticmethod
+	def normalize(address):
+		return address.replace('ronin:', '0x').lower()
+
+	def query(self, sql, params=()):
+		with self.lock:
+			return self.db.execute(sql, params).fetchall()
+
+	def state(self, address):
+		rows = self.query("SELECT last_block, backfill_offset, backfill_done, synced_at FROM sync_state WHERE address = ?", (address,))
+		return rows[0] if rows else (0, 0, 0, 0)
+
+	def save(self, address, txs, state):
+		"""
+		Store a page of transactions with their logs and the sync state in one transaction
+		:param address: Indexed address
+		:param txs: List of transactions from the explorer
+		:param state: (last_block, backfill_offset, backfill_done)
+		:return: Number of transactions that were not indexed yet
+		"""
+		tx_rows = list()
+		log_rows = list()
+		for tx in txs:
+			tx_rows.append((address, tx['hash'], tx.get('block_number'), tx.get('timestamp'), tx.get('from'), tx.get('to')))
+			for idx, log in enumerate(tx.get('logs') or []):
+				topics = [topic(t) for t in log.get('topics') or []][:4]
+				topics += [None] * (4 - len(topics))
+				log_rows.append((tx['hash'], idx, (log.get('address') or '').lower(), *topics, log.get('data')))
+		with self.lock:
+			inserted = self.db.executemany("INSERT OR IGNORE INTO txs (address, hash, block, timestamp, from_address, to_address) VALUES (?, ?, ?, ?, ?, ?)", tx_rows)
+			self.db.executemany("INSERT OR IGNORE INTO logs (hash, idx, contract, topic0, topic1, topic2, topic3, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", log_rows)
+			self.db.execute("INSERT OR REPLACE INTO sync_state (address, last_block, backfill_offset, backfill_done, synced_at) VALUES (?, ?, ?, ?, ?)",
+							(address, *state, time.time()))
+			self.db.commit()
+		return inserted.rowcount
+
+	def sync(self, address, force=False):
+		"""
+		Download the transactions of an address missing from the index
+		:param address: Ronin address
+		:param force: Sync even if the address was synced less than ttl seconds ago
+		:return: Number of new transactions indexed
+		"""
+		address = self.normalize(address)
+		with self.lock:
+			address_lock = self.address_locks.setdefault(address, threading.Lock())
+		with address_lock:
+			last_block, offset, done, synced_at = self.state(address)
+			if not force and time.time() - synced_at < self.ttl:
+				return 0
+			downloaded = 0
+			head_block = last_block
+			if done:
+				# Newest first : stop at the first page reaching the last indexed block. Its block is read
+				# again in case some of its transactions were not listed yet, duplicates are ignored
+				start = 0
+				while True:
+					txs = self.fetch_page(address, start, self.page_size)
+					new = [tx for tx in txs if (tx.get('block_number') or 0) >= last_block]
+					head_block = max([head_block] + [tx.get('block_number') or 0 for tx in new])
+					finished = len(new) < len(txs) or len(txs) < self.page_size
+					# The last block only moves once every new page is stored
+					downloaded += self.save(address, new, (head_block if finished else last_block, 0, 1))
+					if finished:
+						break
+					start += self.page_size
+				return downloaded
+			# Backfill, the offset is saved after every page so an interrupted backfill resumes
+			while not done:
+				txs = self.fetch_page(address, offset, self.page_size)
+				offset += len(txs)
+				done = int(len(txs) < self.page_size)
+				head_block = max([head_block] + [tx.get('block_number') or 0 for tx in txs])
+				downloaded += self.save(address, txs, (head_block, offset, done))
+			return downloaded
+
+	def rows_to_txs(self, tx_rows):
+		"""
+		:param tx_rows: List of (hash, block, timestamp, from, to)
+		:return: List of transactions with their logs, same format as the explorer
+		"""
+		if not tx_rows:
+			return list()
+		hashes = [row[0] for row in tx_rows]
+		logs = dict()
+		for i in range(0, len(hashes), 500):
+			chunk = hashes[i:i + 500]
+			rows = self.query("SELECT hash, contract, topic0, topic1, topic2, topic3, data FROM logs WHERE hash IN (" + ",".join("?" * len(chunk)) + ") ORDER BY hash, idx", chunk)
+			for tx_hash, contract, *topics, data in rows:
+				logs.setdefault(tx_hash, list()).append({'address': contract, 'topics': [t for t in topics if t is not None], 'data': data})
+		return [{'hash': tx_hash, 'block_number': block, 'timestamp': timestamp, 'from': from_address, 'to': to_address, 'logs': logs.get(tx_hash, [])}
+				for tx_hash, block, timestamp, from_address, to_address in tx_rows]
+
+	def txs(self, address):
+		"""
+		:param address: Ronin address
+		:return: All the indexed transactions of the address, newest first
+		"""
+		rows = self.query("SELECT hash, block, timestamp, from_address, to_address FROM txs WHERE address = ? ORDER BY block DESC", (self.normalize(address),))
+		return self.rows_to_txs(rows)
+
+	def find(self, address, topic0=None, token_ids=None, log_index=None):
+		"""
+		Get the indexed transactions of an address having a log matching the filters
+		:param address: Ronin address
+		:param topic0: Event signature of the log
+		:param token_ids: List of token IDs (axie IDs...) found in topic1, topic2 or topic3 of the log
+		:param log_index: Position of the log in the transaction
+		:return: List of transactions with their logs, newest first
+		"""
+		sql = "SELECT DISTINCT t.hash, t.block, t.timestamp, t.from_address, t.to_address FROM txs t JOIN logs l ON l.hash = t.hash WHERE t.address = ?"
+		params = [self.normalize(address)]
+		if topic0 is not None:
+			sql += " AND l.topic0 = ?"
+			params.append(topic(topic0))
+		if log_index is not None:
+			sql += " AND l.idx = ?"
+			params.append(log_index)
+		if token_ids is not None:
+			ids = [topic(int(i)) for i in token_ids]
+			if not ids:
+				return list()
+			marks = ",".join("?" * len(ids))
+			sql += " AND (l.topic1 IN (" + marks + ") OR l.topic2 IN (" + marks + ") OR l.topic3 IN (" + marks + "))"
+			params += ids * 3
+		return self.rows_to_txs(self.query(sql + " ORDER BY t.block DESC", params))
+
+
+tx_indexes = dict()
+tx_indexes_lock = threading.Lock()
+
+
+def get_tx_index(path, fetch_page, page_size=100, ttl=60):
+	"""
+	Get the transaction index shared by all the accounts using this file
+	:param path: Path of the SQLite file
+	:param fetch_page: Function (address, start, size) returning a page of transactions, newest first
+	:return: TxIndex object
+	"""
+	with tx_indexes_lock:
+		if path not in tx_indexes:
+			tx_indexes[path] = TxIndex(path, fetch_page, page_size, ttl)
+		return tx_indexes[path]